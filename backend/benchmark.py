@@ -0,0 +1,348 @@
+"""Benchmarks of the generation engine, reported as JSON so runs can be compared across versions
+
+    python backend/benchmark.py --rows 1000 100000 --output results.json
+    python backend/benchmark.py --baseline results.json
+    python backend/benchmark.py --benchmarks startup --startup-runs 5
+
+Every case runs in a fresh interpreter so its peak RSS is its own, and the startup benchmark sees a cold app.
+"""
+from typing import Callable, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import argparse
+import json
+import multiprocessing as mp
+import platform
+import subprocess
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlgen import Column, TableSchema
+from data_generator import (
+    SEED_BLOCK_SIZE,
+    STREAM_CHUNK_SIZE,
+    GenerationPlan,
+    _iter_chunks_multiprocessing,
+    _iter_chunks_sequential,
+    compile_plan,
+    generate_full_insert_sql,
+    generate_insert_sql,
+    iter_row_chunks,
+    schedule_rows,
+)
+from scheduler import fixed_schedule
+from worker_pool import DEFAULT_CHUNKS_PER_WORKER, get_shared_pool, get_worker_faker, start_shared_pool
+
+# Fixed seed so every run generates the same data
+BENCHMARK_SEED = 1234
+
+DEFAULT_ROW_COUNTS = [1000, 10000, 100000, 1000000]
+
+# generate_full_insert_sql holds the whole statement in memory, so it is skipped above this many rows
+FULL_SQL_MAX_ROWS = 1000000
+
+# Rows each column is generated and formatted over when measuring per-column cost
+COLUMN_COST_ROWS = 100000
+
+# Cold starts measured by the startup benchmark, and the rows of the table it previews and then generates
+DEFAULT_STARTUP_RUNS = 3
+STARTUP_PREVIEW_ROWS = 1000
+STARTUP_GENERATION_ROWS = 20000
+
+NUMERIC_TYPES = ["BIGINT", "INT", "SMALLINT", "TINYINT", "BOOLEAN", "DOUBLE", "DECIMAL(10,2)", "DATE", "TIMESTAMP"]
+STRING_NAMES = ["email", "phone", "address", "city", "first_name", "last_name", "username", "company", "job",
+                "description", "url", "uuid", "product", "category", "status", "notes"]
+
+
+def _numeric_columns(count: int) -> List[Column]:
+    return [Column(f"{NUMERIC_TYPES[index % len(NUMERIC_TYPES)].split('(')[0].lower()}_{index}",
+                   NUMERIC_TYPES[index % len(NUMERIC_TYPES)]) for index in range(count)]
+
+
+def _string_columns(count: int) -> List[Column]:
+    return [Column(f"{STRING_NAMES[index % len(STRING_NAMES)]}_{index}", "STRING") for index in range(count)]
+
+
+# Schema shapes: name -> columns after the BIGINT primary key
+SHAPES: Dict[str, Callable[[], List[Column]]] = {
+    "narrow": lambda: _numeric_columns(2) + _string_columns(2),
+    "wide": lambda: _numeric_columns(25) + _string_columns(25),
+    "numeric": lambda: _numeric_columns(20),
+    "string": lambda: _string_columns(20),
+}
+
+
+def build_schema(shape: str, rows: int) -> TableSchema:
+    columns = [Column("id", "BIGINT", nullable=False, primary_key=True)] + SHAPES[shape]()
+    return TableSchema(table_name=f"bench_{shape}", columns=columns, rows=rows, seed=BENCHMARK_SEED)
+
+
+# --- Benchmarks, each returning extra result fields; run inside the case process ---
+
+def bench_preview(schema: TableSchema) -> Dict:
+    return {"output_bytes": len(generate_insert_sql(schema)), "measured_rows": min(schema.rows, 5)}
+
+
+def bench_full_insert_sql(schema: TableSchema) -> Dict:
+    return {"output_bytes": len(generate_full_insert_sql(schema))}
+
+
+def bench_sequential(schema: TableSchema) -> Dict:
+    plan = compile_plan(schema)
+    for _ in _iter_chunks_sequential(0, schema.rows, plan, STREAM_CHUNK_SIZE, "sql"):
+        pass
+    return {}
+
+
+def bench_multiprocessing(schema: TableSchema) -> Dict:
+    plan = compile_plan(schema)
+    # The fixed split used without calibration, so every worker stays busy
+    pool = get_shared_pool()
+    processes = pool.processes if pool is not None else mp.cpu_count()
+    chunk_rows = fixed_schedule(schema.rows, processes, DEFAULT_CHUNKS_PER_WORKER, STREAM_CHUNK_SIZE, SEED_BLOCK_SIZE,
+                                threshold=0).chunk_rows
+    for _ in _iter_chunks_multiprocessing(0, schema.rows, plan, chunk_rows, "sql"):
+        pass
+    return {}
+
+
+def bench_adaptive(schema: TableSchema) -> Dict:
+    """iter_row_chunks on a running pool, as the app generates: calibration included, with the schedule it picked"""
+    schedule = schedule_rows(schema, compile_plan(schema), schema.rows)
+    for _ in iter_row_chunks(schema):
+        pass
+    return {"parallel": schedule.parallel, "workers": schedule.workers, "chunk_rows": schedule.chunk_rows,
+            "estimated_seconds": round(schedule.estimated_seconds, 4) if schedule.estimated_seconds is not None else None}
+
+
+def bench_columns(schema: TableSchema) -> Dict:
+    """Generation and SQL formatting cost of each column on its own, in nanoseconds per row"""
+    rows = min(schema.rows, COLUMN_COST_ROWS)
+    faker_instance = get_worker_faker()
+    columns = []
+    for column_plan in compile_plan(schema).columns:
+        single = GenerationPlan(columns=[column_plan], seed=BENCHMARK_SEED)
+        # Warm up value pools so their one-off build cost does not land on the first column of a kind
+        single.generate_columns(faker_instance, 0, min(rows, 1000))
+
+        started = time.perf_counter()
+        [(values, _)] = single.generate_columns(faker_instance, 0, rows)
+        generated = time.perf_counter()
+        column_plan.format_sql(values)
+        formatted = time.perf_counter()
+        columns.append({
+            "name": column_plan.column.name,
+            "type": column_plan.column.type,
+            "kind": column_plan.kind,
+            "generate_ns_per_row": round((generated - started) / rows * 1e9, 1),
+            "format_ns_per_row": round((formatted - generated) / rows * 1e9, 1),
+        })
+    return {"measured_rows": rows, "columns": columns}
+
+
+def bench_startup(case: Dict) -> Dict:
+    """Cold start of the web app, as after scale-to-zero: importing it, its lifespan (which starts the worker
+    pool), and its first health check, preview and full generation, each in seconds"""
+    from fastapi.testclient import TestClient
+
+    if case.get("processes"):
+        os.environ["GENERATOR_POOL_SIZE"] = str(case["processes"])
+    timings = {}
+    started = time.perf_counter()
+    import main
+    timings["import_seconds"] = time.perf_counter() - started
+
+    with _timed(timings, "lifespan_seconds"):
+        client = TestClient(main.app).__enter__()
+    try:
+        with _timed(timings, "first_health_seconds"):
+            client.get("/api/health").raise_for_status()
+        with _timed(timings, "first_preview_seconds"):
+            client.post("/api/preview", json={"yaml_content": _schema_yaml(case["shape"], STARTUP_PREVIEW_ROWS)}).raise_for_status()
+        # Large enough to run on the worker pool, so the workers' own start is included
+        with _timed(timings, "first_generation_seconds"):
+            client.post("/api/generate-from-yaml/stream", json={"yaml_content": _schema_yaml(case["shape"], case["rows"]), "format": "csv"}).raise_for_status()
+    finally:
+        client.__exit__(None, None, None)
+    return {"startup_seconds": round(time.perf_counter() - started, 4),
+            **{name: round(seconds, 4) for name, seconds in timings.items()}}
+
+
+def _schema_yaml(shape: str, rows: int) -> str:
+    import yaml
+
+    schema = build_schema(shape, rows)
+    return yaml.safe_dump({
+        "table_name": schema.table_name,
+        "rows": rows,
+        "seed": BENCHMARK_SEED,
+        "columns": [{"name": column.name, "type": column.type, "primary_key": column.primary_key} for column in schema.columns],
+    })
+
+
+@contextmanager
+def _timed(timings: Dict[str, float], name: str) -> Iterator[None]:
+    """Record the seconds a block took as timings[name]"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = time.perf_counter() - started
+
+
+BENCHMARKS: Dict[str, Callable[[TableSchema], Dict]] = {
+    "preview": bench_preview,
+    "full_insert_sql": bench_full_insert_sql,
+    "sequential": bench_sequential,
+    "multiprocessing": bench_multiprocessing,
+    "adaptive": bench_adaptive,
+    "columns": bench_columns,
+}
+
+
+def run_case(case: Dict) -> Dict:
+    """Run one benchmark case in this process and measure it"""
+    if case["benchmark"] == "startup":
+        return {**case, **bench_startup(case), "peak_rss_mb": _peak_rss_mb()}
+
+    # The adaptive schedule is measured against a running pool, as in the app
+    if case.get("processes") or case["benchmark"] == "adaptive":
+        start_shared_pool(case.get("processes"))
+
+    schema = build_schema(case["shape"], case["rows"])
+    started = time.perf_counter()
+    result = BENCHMARKS[case["benchmark"]](schema)
+    seconds = time.perf_counter() - started
+
+    measured_rows = result.pop("measured_rows", schema.rows)
+    return {
+        **case,
+        "columns_count": len(schema.columns),
+        "seconds": round(seconds, 4),
+        "rows_per_second": round(measured_rows / seconds, 1) if seconds > 0 else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        **result,
+    }
+
+
+def _peak_rss_mb() -> Dict[str, float]:
+    """Peak resident memory of this process and of its largest worker process"""
+    import resource
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "main": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit, 1),
+        "worker": round(resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit, 1),
+    }
+
+
+def run_isolated(case: Dict) -> Dict:
+    """Run a case in a fresh interpreter; failures are recorded instead of stopping the suite"""
+    completed = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)],
+                               capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {**case, "error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "failed"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results: List[Dict], baseline: Dict) -> None:
+    """Annotate results with the baseline's throughput for the same case and the relative change
+
+    Startup runs are compared by their mean time to the end of the first generation instead.
+    """
+    def case_key(result: Dict):
+        return result["benchmark"], result["shape"], result["rows"]
+
+    baseline_rates = {case_key(result): result.get("rows_per_second") for result in baseline.get("results", [])}
+    baseline_startups: Dict = {}
+    for result in baseline.get("results", []):
+        if result.get("startup_seconds"):
+            baseline_startups.setdefault(case_key(result), []).append(result["startup_seconds"])
+    for result in results:
+        baseline_rate = baseline_rates.get(case_key(result))
+        if baseline_rate and result.get("rows_per_second"):
+            result["baseline_rows_per_second"] = baseline_rate
+            result["change"] = round(result["rows_per_second"] / baseline_rate - 1, 3)
+        startups = baseline_startups.get(case_key(result))
+        if startups and result.get("startup_seconds"):
+            result["baseline_startup_seconds"] = round(sum(startups) / len(startups), 4)
+            result["change"] = round(result["startup_seconds"] / result["baseline_startup_seconds"] - 1, 3)
+
+
+def environment() -> Dict:
+    import faker
+    import numpy
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "faker": faker.VERSION,
+        "platform": platform.platform(),
+        "cpu_count": mp.cpu_count(),
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the data generation engine")
+    parser.add_argument("--benchmarks", nargs="+", default=list(BENCHMARKS) + ["startup"], choices=list(BENCHMARKS) + ["startup"])
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=list(SHAPES))
+    parser.add_argument("--rows", nargs="+", type=int, default=DEFAULT_ROW_COUNTS, help="Row counts to run (up to 10,000,000)")
+    parser.add_argument("--startup-runs", type=int, default=DEFAULT_STARTUP_RUNS, help="Cold starts the startup benchmark measures")
+    parser.add_argument("--processes", type=int, help="Worker processes for the multiprocessing path (default: all CPUs)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare throughput against")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return 0
+
+    results = []
+    for benchmark in args.benchmarks:
+        if benchmark == "startup":
+            for run in range(args.startup_runs):
+                case = {"benchmark": benchmark, "shape": "narrow", "rows": STARTUP_GENERATION_ROWS, "processes": args.processes, "run": run}
+                result = run_isolated(case)
+                print(f"{benchmark:>16} run {run}: {result.get('startup_seconds') or result.get('error')} s", file=sys.stderr)
+                results.append(result)
+            continue
+        for shape in args.shapes:
+            for rows in args.rows:
+                case = {"benchmark": benchmark, "shape": shape, "rows": rows, "processes": args.processes}
+                if benchmark == "full_insert_sql" and rows > FULL_SQL_MAX_ROWS:
+                    results.append({**case, "skipped": f"holds the whole statement in memory, limited to {FULL_SQL_MAX_ROWS} rows"})
+                    continue
+                result = run_isolated(case)
+                print(f"{benchmark:>16} {shape:>8} {rows:>10} rows: "
+                      f"{result.get('rows_per_second') or result.get('error')} rows/s", file=sys.stderr)
+                results.append(result)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            compare(results, json.load(baseline_file))
+
+    report = json.dumps({"environment": environment(), "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            output_file.write(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
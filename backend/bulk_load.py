@@ -0,0 +1,241 @@
+from typing import Iterator, List, Optional, Sequence, Tuple
+from dataclasses import dataclass
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import uuid
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlgen import TableSchema, build_table_name, parse_column_type, quote_sql_string
+from data_generator import iter_row_chunks
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Supported load methods
+LOAD_METHODS = ("multirow", "executemany", "copy_into")
+
+# Rows per INSERT statement / executemany call / Parquet row group
+DEFAULT_BATCH_SIZE = 1000
+
+
+@dataclass
+class LoadProgress:
+    """Progress reported after each batch of a bulk load"""
+    stage: str  # "insert", "staged" or "copy"
+    batch: int
+    rows_loaded: int
+    total_rows: int
+
+
+class DatabricksLoadConnection:
+    """Bulk load target backed by a databricks-sql-connector connection"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def table_name(self, schema: TableSchema) -> str:
+        return build_table_name(schema.catalog, schema.schema, schema.table_name)
+
+    def create_table(self, schema: TableSchema) -> None:
+        self.execute(schema.generate_create_table_sql())
+
+    def execute(self, statement: str, parameters: Optional[dict] = None) -> None:
+        with registry.span("databricks_execute"), self.connection.cursor() as cursor:
+            cursor.execute(statement, parameters)
+
+    def executemany(self, statement: str, seq_of_parameters: List[dict]) -> None:
+        with registry.span("databricks_execute"), self.connection.cursor() as cursor:
+            cursor.executemany(statement, seq_of_parameters)
+
+    def stage_file(self, local_path: str, staging_path: str) -> None:
+        """Upload a local file to a Unity Catalog volume path"""
+        from databricks.sdk import WorkspaceClient
+
+        with open(local_path, "rb") as staged_file:
+            WorkspaceClient().files.upload(staging_path, staged_file, overwrite=True)
+
+    def remove_staged_file(self, staging_path: str) -> None:
+        from databricks.sdk import WorkspaceClient
+
+        WorkspaceClient().files.delete(staging_path)
+
+    def copy_into(self, schema: TableSchema, staging_path: str) -> int:
+        """Load a staged Parquet file, casting each column to its declared type, and return the rows inserted"""
+        select_list = ", ".join(f"CAST({col.name} AS {col.type}) AS {col.name}" for col in schema.columns)
+        with registry.span("databricks_execute"), self.connection.cursor() as cursor:
+            cursor.execute(
+                f"COPY INTO {self.table_name(schema)}\n"
+                f"FROM (SELECT {select_list} FROM {quote_sql_string(staging_path)})\n"
+                f"FILEFORMAT = PARQUET"
+            )
+            # One row of counts: num_affected_rows, num_inserted_rows, num_skipped_corrupt_files
+            result = cursor.fetchone()
+            columns = [description[0] for description in cursor.description or ()]
+        if result is None or "num_inserted_rows" not in columns:
+            raise RuntimeError("COPY INTO did not report the number of rows it inserted")
+        return int(result[columns.index("num_inserted_rows")])
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class SQLiteLoadConnection:
+    """Local stand-in for DatabricksLoadConnection so bulk loads can run offline"""
+
+    def __init__(self, database: str = ":memory:"):
+        self.connection = sqlite3.connect(database, check_same_thread=False)
+
+    def table_name(self, schema: TableSchema) -> str:
+        # SQLite has no catalogs or schemas
+        return schema.table_name
+
+    def create_table(self, schema: TableSchema) -> None:
+        column_defs = ", ".join(f"{col.name} {col.type}" for col in schema.columns)
+        self.execute(f"CREATE TABLE {self.table_name(schema)} ({column_defs})")
+
+    def execute(self, statement: str, parameters: Optional[dict] = None) -> None:
+        self.connection.execute(statement, parameters or {})
+        self.connection.commit()
+
+    def executemany(self, statement: str, seq_of_parameters: List[dict]) -> None:
+        self.connection.executemany(statement, seq_of_parameters)
+        self.connection.commit()
+
+    def stage_file(self, local_path: str, staging_path: str) -> None:
+        shutil.copyfile(local_path, staging_path)
+
+    def remove_staged_file(self, staging_path: str) -> None:
+        os.remove(staging_path)
+
+    def copy_into(self, schema: TableSchema, staging_path: str) -> int:
+        """Emulate COPY INTO by reading the staged Parquet file back and inserting its rows"""
+        import pyarrow.parquet as pq
+
+        rows = pq.read_table(staging_path).to_pylist()
+        self.executemany(_parameterized_insert(self.table_name(schema), schema), [_row_parameters(row.values()) for row in rows])
+        return len(rows)
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def iter_bulk_load(schema: TableSchema, connection, method: str = "multirow", batch_size: int = DEFAULT_BATCH_SIZE,
+                   staging_path: Optional[str] = None, create_table: bool = False) -> Iterator[LoadProgress]:
+    """Generate the schema's rows on the backend and load them in batches, yielding progress per batch"""
+    if method not in LOAD_METHODS:
+        raise ValueError(f"Unsupported load method '{method}', expected one of: {', '.join(LOAD_METHODS)}")
+    if method == "copy_into" and not staging_path:
+        raise ValueError("staging_path is required for the copy_into load method")
+    if batch_size <= 0:
+        raise ValueError("batch_size must be positive")
+
+    if create_table:
+        connection.create_table(schema)
+
+    if method == "copy_into":
+        yield from _load_copy_into(schema, connection, batch_size, staging_path)
+        return
+
+    table_name = connection.table_name(schema)
+    rows_loaded = 0
+
+    if method == "multirow":
+        # One literal multi-row INSERT statement per batch
+        header = f"INSERT INTO {table_name} ({', '.join(col.name for col in schema.columns)}) VALUES\n"
+        for batch_index, batch in enumerate(_iter_batches(schema, batch_size, "sql")):
+            connection.execute(header + ",\n".join(f"({', '.join(row)})" for row in batch))
+            rows_loaded += len(batch)
+            yield LoadProgress("insert", batch_index, rows_loaded, schema.rows)
+    else:
+        # One parameterized statement executed for every row of the batch
+        statement = _parameterized_insert(table_name, schema)
+        for batch_index, batch in enumerate(_iter_batches(schema, batch_size, "python")):
+            connection.executemany(statement, [_row_parameters(row) for row in batch])
+            rows_loaded += len(batch)
+            yield LoadProgress("insert", batch_index, rows_loaded, schema.rows)
+
+
+def _load_copy_into(schema: TableSchema, connection, batch_size: int, staging_path: str) -> Iterator[LoadProgress]:
+    """Write the rows to a local Parquet file, stage it, then load it with a single COPY INTO
+
+    Each load stages its own file next to staging_path, since COPY INTO skips files it has loaded before; the
+    last progress reports the rows COPY INTO actually inserted.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_schema = pa.schema([(col.name, _arrow_type(col.type)) for col in schema.columns])
+    column_names = [col.name for col in schema.columns]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        local_path = os.path.join(temp_dir, f"{schema.table_name}.parquet")
+        rows_written = 0
+        batch_count = 0
+        with pq.ParquetWriter(local_path, arrow_schema, compression="snappy") as writer:
+            for batch in _iter_batches(schema, batch_size, "python"):
+                columns = list(zip(*batch))
+                writer.write_table(pa.table({name: columns[i] for i, name in enumerate(column_names)}, schema=arrow_schema))
+                rows_written += len(batch)
+                yield LoadProgress("staged", batch_count, rows_written, schema.rows)
+                batch_count += 1
+
+        staged_path = unique_staging_path(staging_path)
+        connection.stage_file(local_path, staged_path)
+
+    try:
+        rows_inserted = connection.copy_into(schema, staged_path)
+    finally:
+        try:
+            connection.remove_staged_file(staged_path)
+        except Exception as e:
+            # The rows are loaded either way; a leftover file is only clutter in the volume
+            logger.warning(f"Could not remove staged file {staged_path}: {e}")
+    yield LoadProgress("copy", batch_count, rows_inserted, schema.rows)
+
+
+def unique_staging_path(staging_path: str) -> str:
+    """staging_path with a random suffix before its extension, e.g. orders.parquet -> orders-3f2a....parquet"""
+    root, extension = os.path.splitext(staging_path)
+    return f"{root}-{uuid.uuid4().hex}{extension or '.parquet'}"
+
+
+def _iter_batches(schema: TableSchema, batch_size: int, row_format: str) -> Iterator[List[Tuple]]:
+    """Re-slices the generated row chunks into batches of exactly batch_size rows (the last may be shorter)"""
+    buffer: List[Tuple] = []
+    for chunk in iter_row_chunks(schema, max(batch_size, 1000), row_format=row_format):
+        buffer.extend(row_values for _, row_values in chunk)
+        offset = 0
+        while len(buffer) - offset >= batch_size:
+            yield buffer[offset:offset + batch_size]
+            offset += batch_size
+        buffer = buffer[offset:]
+    if buffer:
+        yield buffer
+
+
+def _parameterized_insert(table_name: str, schema: TableSchema) -> str:
+    """INSERT statement with one named parameter marker per column"""
+    markers = ", ".join(f":p{i}" for i in range(len(schema.columns)))
+    return f"INSERT INTO {table_name} ({', '.join(col.name for col in schema.columns)}) VALUES ({markers})"
+
+
+def _row_parameters(row: Sequence) -> dict:
+    return {f"p{i}": value for i, value in enumerate(row)}
+
+
+def _arrow_type(column_type: str):
+    """Arrow type used to stage a column in Parquet; COPY INTO casts it to the declared type"""
+    import pyarrow as pa
+
+    type_name = parse_column_type(column_type).name
+    if type_name in ("BIGINT", "INT", "SMALLINT", "TINYINT"):
+        return pa.int64()
+    if type_name == "BOOLEAN":
+        return pa.bool_()
+    if type_name in ("DECIMAL", "DOUBLE"):
+        return pa.float64()
+    return pa.string()
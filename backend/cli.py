@@ -0,0 +1,125 @@
+"""Command line generation, for splitting large datasets across worker processes or machines
+
+    python backend/cli.py generate schema.yaml --shard 0/4 --output-dir out --format parquet
+    python backend/cli.py generate schema.yaml --rows 0:1000000 --table orders --output-dir out
+    python backend/cli.py merge schema.yaml --output-dir out
+    python backend/cli.py local schema.yaml --shards 4 --output-dir out
+"""
+from typing import List, Optional
+import argparse
+import logging
+import multiprocessing as mp
+import subprocess
+import time
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from schema_yaml import load_dataset
+from datasets import DatasetSchema
+from sharding import ShardSpec, merge_manifests, parse_row_range, parse_shard, run_shard
+from writers import COMPRESSIONS, OUTPUT_WRITERS
+from worker_pool import shutdown_shared_pool, start_shared_pool
+
+logger = logging.getLogger(__name__)
+
+
+def read_dataset(args: argparse.Namespace) -> DatasetSchema:
+    with open(args.schema) as schema_file:
+        return load_dataset(schema_file.read(), seed=args.seed)
+
+
+def shard_spec(args: argparse.Namespace, dataset: DatasetSchema) -> ShardSpec:
+    if args.shard and args.rows:
+        raise ValueError("Use either --shard or --rows, not both")
+    if args.rows:
+        if args.table is None and len(dataset.tables) != 1:
+            raise ValueError("--rows needs --table when the schema has several tables")
+        table_name = args.table or dataset.tables[0].table_name
+        dataset.table(table_name)
+        return parse_row_range(args.rows, table_name)
+    return parse_shard(args.shard or "0/1")
+
+
+def generate(args: argparse.Namespace) -> None:
+    """Generate one shard; the worker pool is sized by --processes so several shards can share a machine"""
+    dataset = read_dataset(args)
+    spec = shard_spec(args, dataset)
+    start_shared_pool(args.processes)
+    try:
+        manifest = run_shard(dataset, spec, args.output_dir, args.format, args.compression)
+    finally:
+        shutdown_shared_pool()
+    rows = sum(part["end_row"] - part["start_row"] for part in manifest["parts"])
+    logger.info(f"Shard {spec.label}: wrote {rows} rows in {len(manifest['parts'])} files")
+
+
+def merge(args: argparse.Namespace) -> None:
+    manifest = merge_manifests(read_dataset(args), args.output_dir)
+    for table in manifest["tables"]:
+        logger.info(f"{table['table_name']}: {table['rows']} rows, {table['bytes']} bytes in {len(table['parts'])} files")
+
+
+def local(args: argparse.Namespace) -> None:
+    """Coordinate --shards worker processes on this machine, then merge their manifests"""
+    if args.shards < 1:
+        raise ValueError("--shards must be at least 1")
+    read_dataset(args)
+    processes = args.processes or max(1, mp.cpu_count() // args.shards)
+    command = [sys.executable, os.path.abspath(__file__), "generate", args.schema, "--output-dir", args.output_dir,
+               "--format", args.format, "--compression", args.compression, "--processes", str(processes)]
+    if args.seed is not None:
+        command += ["--seed", str(args.seed)]
+
+    started = time.perf_counter()
+    workers = [subprocess.Popen(command + ["--shard", f"{index}/{args.shards}"]) for index in range(args.shards)]
+    failed = [index for index, worker in enumerate(workers) if worker.wait() != 0]
+    if failed:
+        raise RuntimeError(f"Shards {', '.join(map(str, failed))} failed")
+
+    merge(args)
+    logger.info(f"Generated {args.shards} shards in {time.perf_counter() - started:.1f}s")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate synthetic data from a YAML schema")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("schema", help="YAML schema file")
+    common.add_argument("--output-dir", required=True, help="Directory shards write their files and manifests to")
+    common.add_argument("--seed", type=int, help="Seed to use instead of the schema's; shards only line up when seeded")
+
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--format", default="sql", choices=list(OUTPUT_WRITERS))
+    output.add_argument("--compression", default="none", choices=list(COMPRESSIONS))
+    output.add_argument("--processes", type=int, help="Generator worker processes (default: all CPUs, or CPUs / shards for local)")
+
+    command = commands.add_parser("generate", parents=[common, output], help="Generate one shard of the dataset")
+    command.add_argument("--shard", help="i/N: generate the i-th of N slices of every table (default 0/1)")
+    command.add_argument("--rows", help="START:END: generate this row range (end exclusive) of one table")
+    command.add_argument("--table", help="Table the --rows range applies to")
+    command.set_defaults(handler=generate)
+
+    command = commands.add_parser("merge", parents=[common], help="Check the shard manifests cover every row and merge them")
+    command.set_defaults(handler=merge)
+
+    command = commands.add_parser("local", parents=[common, output], help="Run N shard processes on this machine and merge them")
+    command.add_argument("--shards", type=int, default=2, help="Number of shard processes")
+    command.set_defaults(handler=local)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    args = build_parser().parse_args(argv)
+    try:
+        args.handler(args)
+    except (ValueError, RuntimeError, OSError) as e:
+        logger.error(str(e))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+from typing import List, Optional, Tuple
+from datetime import datetime
+from functools import lru_cache
+import numpy as np
+
+# Probability that a nullable column produces NULL
+NULL_PROBABILITY = 0.1
+
+# Value ranges for integer column types
+INTEGER_RANGES = {
+    "BIGINT": (-9223372036854775808, 9223372036854775807),
+    "INT": (-2147483648, 2147483647),
+    "SMALLINT": (0, 32767),
+    "TINYINT": (0, 127),
+}
+
+# Values integer column types can hold; distribution draws are clipped to these
+INTEGER_LIMITS = {
+    "BIGINT": (-9223372036854775808, 9223372036854775807),
+    "INT": (-2147483648, 2147483647),
+    "SMALLINT": (-32768, 32767),
+    "TINYINT": (-128, 127),
+}
+
+# Random dates and timestamps fall within this many days before now
+DATE_RANGE_DAYS = 730  # 2 years
+
+# Generated decimals stay below 10,000 (prices, percentages) with at most this many random fraction digits
+MAX_DECIMAL_INTEGER_DIGITS = 4
+MAX_DECIMAL_RANDOM_SCALE = 6
+
+# Largest count of a decimal's smallest unit that still rounds below 2**63, so it fits the int64 units it is held in
+MAX_DECIMAL_UNITS = float(2 ** 63) * (1 - 2 ** -50)
+
+# Seasonal cycles a time series can follow: period in seconds and when in the period its rate peaks (from the epoch)
+SEASONAL_CYCLES = {
+    "daily": (24 * 60 * 60, 13 * 60 * 60),  # Early afternoon (UTC)
+    "weekly": (7 * 24 * 60 * 60, -12 * 60 * 60),  # Wednesday noon; the epoch was a Thursday
+    "yearly": (365.2425 * 24 * 60 * 60, 182 * 24 * 60 * 60),  # Early July
+}
+
+# Rounds of the keyed Feistel network unique columns permute row indexes with
+FEISTEL_ROUNDS = 4
+
+# Units DOUBLE values are drawn in (4 decimal digits) and the largest one, matching sample_doubles
+DOUBLE_UNITS_PER_ONE = 10 ** 4
+MAX_DOUBLE_UNITS = 999999999
+
+# Time series rates are resolved per hour, or per day over spans longer than this many days
+MAX_HOURLY_SERIES_DAYS = 5 * 366
+
+
+# --- Batched samplers: one NumPy draw per column chunk ---
+
+def sample_integers(rng: np.random.Generator, size: int, low: int, high: int) -> np.ndarray:
+    """Draws integers uniformly from [low, high]"""
+    return rng.integers(low, high, size=size, dtype=np.int64, endpoint=True)
+
+
+def sample_booleans(rng: np.random.Generator, size: int) -> np.ndarray:
+    """Draws fair coin flips"""
+    return rng.random(size) < 0.5
+
+
+def sample_timestamps(rng: np.random.Generator, size: int, end_time: Optional[np.datetime64] = None) -> np.ndarray:
+    """Draws timestamps within the 2 years before end_time (default now), at second resolution"""
+    if end_time is None:
+        end_time = np.datetime64(datetime.now(), "s")
+    span_seconds = DATE_RANGE_DAYS * 24 * 60 * 60
+    offsets = rng.integers(0, span_seconds, size=size, endpoint=True)
+    return end_time - offsets.astype("timedelta64[s]")
+
+
+def sample_dates(rng: np.random.Generator, size: int, end_time: Optional[np.datetime64] = None) -> np.ndarray:
+    """Draws dates within the 2 years before end_time (default today)"""
+    end_date = np.datetime64(datetime.now().date(), "D") if end_time is None else end_time.astype("datetime64[D]")
+    offsets = rng.integers(0, DATE_RANGE_DAYS, size=size, endpoint=True)
+    return end_date - offsets.astype("timedelta64[D]")
+
+
+def sample_decimal_units(rng: np.random.Generator, size: int, precision: int, scale: int) -> np.ndarray:
+    """Draws unscaled DECIMAL(precision, scale) values as integers of the smallest random unit"""
+    integer_digits = max(0, min(precision - scale, MAX_DECIMAL_INTEGER_DIGITS))
+    random_scale = min(scale, MAX_DECIMAL_RANDOM_SCALE)
+    return rng.integers(1, 10 ** (integer_digits + random_scale) - 1, size=size, dtype=np.int64, endpoint=True)
+
+
+def sample_doubles(rng: np.random.Generator, size: int) -> np.ndarray:
+    """Draws floating point values rounded to 4 digits"""
+    return np.round(rng.uniform(0.0001, 99999.9999, size=size), 4)
+
+
+# --- Distribution samplers: shaped draws that still take one NumPy call per column chunk ---
+
+def sample_uniform(rng: np.random.Generator, size: int, low: float, high: float) -> np.ndarray:
+    return rng.uniform(low, high, size=size)
+
+
+def sample_normal(rng: np.random.Generator, size: int, mean: float, stddev: float, low: float, high: float) -> np.ndarray:
+    """Draws normally distributed values, clipped to [low, high]"""
+    return np.clip(rng.normal(mean, stddev, size=size), low, high)
+
+
+def sample_zipf(rng: np.random.Generator, size: int, low: int, count: int, exponent: float) -> np.ndarray:
+    """Draws integers from [low, low + count) with Zipf-like skew: low is the most frequent, then low + 1, ...
+
+    Ranks come from inverting the continuous power law on [1, count + 1), so the draw stays vectorized
+    whatever the count.
+    """
+    uniform = rng.random(size)
+    if abs(exponent - 1.0) < 1e-9:
+        ranks = (count + 1.0) ** uniform
+    else:
+        power = 1.0 - exponent
+        ranks = (((count + 1.0) ** power - 1.0) * uniform + 1.0) ** (1.0 / power)
+    return low + np.minimum(ranks.astype(np.int64), count) - 1
+
+
+def categorical_cdf(weights: List[float]) -> np.ndarray:
+    """Cumulative distribution of categorical weights, normalized to end at 1"""
+    cdf = np.cumsum(np.asarray(weights, dtype=np.float64))
+    return cdf / cdf[-1]
+
+
+def sample_categorical(rng: np.random.Generator, size: int, cdf: np.ndarray) -> np.ndarray:
+    """Draws category indexes with the probabilities of a categorical_cdf"""
+    return np.minimum(np.searchsorted(cdf, rng.random(size), side="right"), len(cdf) - 1)
+
+
+def sample_sequence(rng: np.random.Generator, start_row: int, size: int, start: int, step: int) -> np.ndarray:
+    """Increasing values start + row * step, each moved up by a random gap below step, so they never collide"""
+    values = start + np.arange(start_row, start_row + size, dtype=np.int64) * step
+    if step > 1:
+        values += rng.integers(0, step, size=size, dtype=np.int64)
+    return values
+
+
+def sample_timeseries(rng: np.random.Generator, start_row: int, size: int, rows: int, start: np.datetime64,
+                      end: np.datetime64, seasonality: Tuple[str, ...], amplitude: float, trend: float,
+                      first_row: int = 0) -> np.ndarray:
+    """Timestamps increasing with the row index from start to end, denser where the seasonal rate peaks
+
+    Row first_row + i sits at quantile (i + u) / rows of the rate curve, so every row range can be drawn on its own.
+    """
+    start_seconds = int(start.astype("datetime64[s]").astype(np.int64))
+    end_seconds = int(end.astype("datetime64[s]").astype(np.int64))
+    edges, cdf = _timeseries_cdf(start_seconds, end_seconds, seasonality, amplitude, trend)
+    quantiles = (np.arange(start_row - first_row, start_row - first_row + size) + rng.random(size)) / max(rows, 1)
+    seconds = np.interp(quantiles, cdf, edges)
+    return np.minimum(seconds.astype(np.int64), end_seconds).astype("datetime64[s]")
+
+
+@lru_cache(maxsize=32)
+def _timeseries_cdf(start: int, end: int, seasonality: Tuple[str, ...], amplitude: float, trend: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Bucket edges (seconds) and the cumulative share of rows up to each edge"""
+    bucket = 3600 if end - start <= MAX_HOURLY_SERIES_DAYS * 24 * 3600 else 24 * 3600
+    edges = np.append(np.arange(start, end, bucket, dtype=np.float64), float(end))
+    middles = (edges[:-1] + edges[1:]) / 2
+    rate = 1.0 + trend * (middles - start) / max(end - start, 1)
+    for cycle in seasonality:
+        period, peak = SEASONAL_CYCLES[cycle]
+        rate *= 1.0 + amplitude * np.cos(2 * np.pi * (middles - peak) / period)
+    cdf = np.concatenate([[0.0], np.cumsum(rate * np.diff(edges))])
+    return edges, cdf / cdf[-1]
+
+
+# --- Unique samplers: each row's value is a keyed permutation of its index, so no two rows can collide ---
+
+def permute_indexes(indexes: np.ndarray, size: int, key: Tuple[int, ...]) -> np.ndarray:
+    """Maps distinct indexes in [0, size) to distinct, scattered indexes in [0, size), as uint64
+
+    A Feistel network is a bijection on [0, 4**half_bits); values it maps past size are mapped again (cycle
+    walking) until they land below it, which keeps it a bijection on [0, size). The domain is at most four times
+    size, so a value needs few passes, and nothing has to be remembered between chunks or processes.
+    """
+    half_bits = max(1, ((size - 1).bit_length() + 1) // 2)
+    values = indexes.astype(np.uint64)
+    if size >= 1 << 64:
+        return _feistel(values, half_bits, key)
+    limit = np.uint64(size)
+    pending = np.arange(len(values))
+    while pending.size:
+        values[pending] = _feistel(values[pending], half_bits, key)
+        pending = pending[values[pending] >= limit]
+    return values
+
+
+def feistel_key(column_key: np.ndarray) -> Tuple[int, ...]:
+    """Round keys of a column's permutation, derived from its Philox key"""
+    return tuple(int(word) for word in np.random.SeedSequence(column_key.tolist()).generate_state(FEISTEL_ROUNDS, dtype=np.uint64))
+
+
+def _feistel(values: np.ndarray, half_bits: int, key: Tuple[int, ...]) -> np.ndarray:
+    mask = np.uint64((1 << half_bits) - 1)
+    shift = np.uint64(half_bits)
+    left, right = values >> shift, values & mask
+    for round_key in key:
+        left, right = right, left ^ (_mix(right ^ np.uint64(round_key)) & mask)
+    return (left << shift) | right
+
+
+def _mix(values: np.ndarray) -> np.ndarray:
+    # SplitMix64 finalizer; uint64 arithmetic on arrays wraps around
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def value_bounds(type_name: str, precision: Optional[int] = None, scale: Optional[int] = None) -> Tuple[float, float]:
+    """Smallest and largest value a numeric column of the type can hold"""
+    if type_name in INTEGER_LIMITS:
+        return INTEGER_LIMITS[type_name]
+    if type_name == "DECIMAL":
+        unit = 10 ** min(scale, MAX_DECIMAL_RANDOM_SCALE)
+        # Values are held as int64 counts of their smallest unit
+        limit = min(10.0 ** (precision - scale) - 1 / unit, MAX_DECIMAL_UNITS / unit)
+        return -limit, limit
+    return -np.inf, np.inf
+
+
+def unique_value_count(type_name: str, precision: Optional[int] = None, scale: Optional[int] = None) -> Optional[int]:
+    """Distinct values a unique column of the type can take, or None when it is unbounded (strings)"""
+    if type_name in INTEGER_RANGES:
+        low, high = INTEGER_RANGES[type_name]
+        return high - low + 1
+    if type_name == "DECIMAL":
+        integer_digits = max(0, min(precision - scale, MAX_DECIMAL_INTEGER_DIGITS))
+        return 10 ** (integer_digits + min(scale, MAX_DECIMAL_RANDOM_SCALE)) - 1
+    if type_name == "DOUBLE":
+        return MAX_DOUBLE_UNITS
+    if type_name == "DATE":
+        return DATE_RANGE_DAYS + 1
+    if type_name == "TIMESTAMP":
+        return DATE_RANGE_DAYS * 24 * 60 * 60 + 1
+    return None
+
+
+def sample_unique_integers(start_row: int, size: int, low: int, high: int, key: Tuple[int, ...]) -> np.ndarray:
+    """Distinct integers from [low, high] for rows [start_row, start_row + size)"""
+    offsets = permute_indexes(np.arange(start_row, start_row + size, dtype=np.uint64), high - low + 1, key)
+    # Added modulo 2**64 so the full BIGINT range maps onto int64 too
+    return (offsets + np.uint64(low % (1 << 64))).view(np.int64)
+
+
+def sample_unique_doubles(start_row: int, size: int, key: Tuple[int, ...]) -> np.ndarray:
+    """Distinct values with 4 decimal digits, in the range of sample_doubles"""
+    return sample_unique_integers(start_row, size, 1, MAX_DOUBLE_UNITS, key) / DOUBLE_UNITS_PER_ONE
+
+
+def sample_unique_timestamps(start_row: int, size: int, key: Tuple[int, ...], end_time: np.datetime64) -> np.ndarray:
+    """Distinct timestamps within the 2 years before end_time"""
+    offsets = sample_unique_integers(start_row, size, 0, DATE_RANGE_DAYS * 24 * 60 * 60, key)
+    return end_time - offsets.astype("timedelta64[s]")
+
+
+def sample_unique_dates(start_row: int, size: int, key: Tuple[int, ...], end_time: np.datetime64) -> np.ndarray:
+    """Distinct dates within the 2 years before end_time"""
+    offsets = sample_unique_integers(start_row, size, 0, DATE_RANGE_DAYS, key)
+    return end_time.astype("datetime64[D]") - offsets.astype("timedelta64[D]")
+
+
+def unique_uuids(rng: np.random.Generator, start_row: int, size: int, key: Tuple[int, ...]) -> List[str]:
+    """Version 4 UUIDs that cannot repeat: the 62 bits after the variant hold a permutation of the row index"""
+    high = (rng.integers(0, 1 << 64, size=size, dtype=np.uint64) & np.uint64(0xFFFFFFFFFFFF0FFF)) | np.uint64(0x4000)
+    low = permute_indexes(np.arange(start_row, start_row + size, dtype=np.uint64), 1 << 62, key) | np.uint64(0x8000000000000000)
+    return [f"{h[:8]}-{h[8:12]}-{h[12:]}-{l[:4]}-{l[4:]}"
+            for h, l in zip((f"{value:016x}" for value in high.tolist()), (f"{value:016x}" for value in low.tolist()))]
+
+
+# --- Bulk formatters: convert a sampled chunk to SQL literal strings ---
+
+def format_integers(values: np.ndarray) -> List[str]:
+    return list(map(str, values.tolist()))
+
+
+def format_booleans(values: np.ndarray) -> List[str]:
+    return np.where(values, "true", "false").tolist()
+
+
+def format_timestamps(values: np.ndarray) -> List[str]:
+    return [f"'{value}'" for value in timestamps_to_python(values)]
+
+
+def format_dates(values: np.ndarray) -> List[str]:
+    return [f"'{value}'" for value in dates_to_python(values)]
+
+
+def format_decimals(values: np.ndarray, scale: int) -> List[str]:
+    random_scale = min(scale, MAX_DECIMAL_RANDOM_SCALE)
+    if random_scale == 0:
+        return format_integers(values)
+
+    # Split the unscaled units into integer and fraction digits, padding beyond the random scale with zeros
+    divisor = 10 ** random_scale
+    padding = "0" * (scale - random_scale)
+    if values.size and values.min() < 0:
+        # Only distributions draw negative decimals; the sign goes in front of the absolute value
+        return [f"{'-' if units < 0 else ''}{abs(units) // divisor}.{abs(units) % divisor:0{random_scale}d}{padding}"
+                for units in values.tolist()]
+    return [f"{units // divisor}.{units % divisor:0{random_scale}d}{padding}" for units in values.tolist()]
+
+
+def format_doubles(values: np.ndarray) -> List[str]:
+    return ["%.4f" % value for value in values.tolist()]
+
+
+# --- Conversions of a sampled chunk to plain Python values (JSON and other non-SQL outputs) ---
+
+def timestamps_to_python(values: np.ndarray) -> List[str]:
+    return [f"{value[:10]} {value[11:]}" for value in np.datetime_as_string(values, unit="s").tolist()]
+
+
+def dates_to_python(values: np.ndarray) -> List[str]:
+    return np.datetime_as_string(values, unit="D").tolist()
+
+
+def decimals_to_python(values: np.ndarray, scale: int) -> list:
+    random_scale = min(scale, MAX_DECIMAL_RANDOM_SCALE)
+    if random_scale == 0:
+        return values.tolist()
+    return (values / 10 ** random_scale).tolist()
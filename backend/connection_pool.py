@@ -0,0 +1,187 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+from contextlib import contextmanager
+from dataclasses import dataclass
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Default pool limits
+DEFAULT_MAX_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 300.0  # Seconds an unused connection is kept open
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0  # Idle seconds after which a connection is checked before reuse
+
+# Exception types, or a function returning them that is called on first use so the driver can be imported lazily
+ErrorTypes = Tuple[Type[BaseException], ...]
+LazyErrorTypes = Union[ErrorTypes, Callable[[], ErrorTypes]]
+
+
+@dataclass
+class _IdleConnection:
+    connection: Any
+    idle_since: float
+
+
+class ConnectionPool:
+    """Thread-safe pool of reusable DB-API connections with idle expiry, health checks and reconnects"""
+
+    def __init__(self, connect: Callable[[], Any], max_size: int = DEFAULT_MAX_SIZE,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT, health_check_interval: float = DEFAULT_HEALTH_CHECK_INTERVAL,
+                 discard_on: LazyErrorTypes = (), retry_on: LazyErrorTypes = ()):
+        self.connect = connect
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self._discard_on = discard_on  # Errors that mean the connection is broken and must not be reused
+        self._retry_on = retry_on  # Broken-connection errors raised before the statement ran, safe to retry once
+        self._idle: List[_IdleConnection] = []
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._created = 0
+        self._reconnects = 0
+        self._closed = False
+
+    @property
+    def discard_on(self) -> ErrorTypes:
+        if callable(self._discard_on):
+            self._discard_on = self._discard_on()
+        return self._discard_on
+
+    @property
+    def retry_on(self) -> ErrorTypes:
+        if callable(self._retry_on):
+            self._retry_on = self._retry_on()
+        return self._retry_on
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Take a healthy connection from the pool, opening a new one when none is idle"""
+        if not self._slots.acquire(timeout=timeout if timeout is not None else -1):
+            raise TimeoutError(f"No database connection available within {timeout} seconds")
+
+        try:
+            connection = self._take_idle()
+            if connection is None:
+                connection = self.connect()
+                with self._lock:
+                    self._created += 1
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._in_use += 1
+        return connection
+
+    def release(self, connection: Any, discard: bool = False) -> None:
+        """Return a connection to the pool, or close it if it is broken or the pool is closed"""
+        with self._lock:
+            self._in_use -= 1
+            keep = not discard and not self._closed
+            if keep:
+                self._idle.append(_IdleConnection(connection, time.monotonic()))
+        if not keep:
+            self._close_quietly(connection)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        """Borrow a connection for the duration of a with block"""
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        except self.discard_on:
+            self.release(connection, discard=True)
+            raise
+        except BaseException:
+            self.release(connection)
+            raise
+        else:
+            self.release(connection)
+
+    def execute(self, query: str, parameters: Optional[dict] = None) -> None:
+        """Execute a statement on a pooled connection, reconnecting once if the session had gone stale"""
+        self._execute(query, parameters)
+
+    def fetch_one(self, query: str, parameters: Optional[dict] = None) -> Optional[Tuple]:
+        """Run a query on a pooled connection and return its first row (None when it has none), like execute"""
+        return self._execute(query, parameters, fetch=True)
+
+    def close(self) -> None:
+        """Close all idle connections; connections still in use are closed when released"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._close_quietly(entry.connection)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "created": self._created,
+                "reconnects": self._reconnects,
+            }
+
+    def _execute(self, query: str, parameters: Optional[dict], fetch: bool = False) -> Optional[Tuple]:
+        try:
+            return self._execute_once(query, parameters, fetch)
+        except self.retry_on as e:
+            logger.warning(f"Database connection lost ({e}), reconnecting")
+            with self._lock:
+                self._reconnects += 1
+            return self._execute_once(query, parameters, fetch)
+
+    def _execute_once(self, query: str, parameters: Optional[dict], fetch: bool) -> Optional[Tuple]:
+        with self.connection() as connection:
+            with connection.cursor() as cursor:
+                if parameters is None:
+                    cursor.execute(query)
+                else:
+                    cursor.execute(query, parameters)
+                if fetch:
+                    row = cursor.fetchone()
+                    return tuple(row) if row is not None else None
+                return None
+
+    def _take_idle(self) -> Optional[Any]:
+        """Pop the most recently used idle connection that is still fresh and healthy"""
+        while True:
+            # Close everything that sat idle past the timeout before picking a connection
+            with self._lock:
+                now = time.monotonic()
+                expired = [entry for entry in self._idle if now - entry.idle_since > self.idle_timeout]
+                self._idle = [entry for entry in self._idle if now - entry.idle_since <= self.idle_timeout]
+                entry = self._idle.pop() if self._idle else None
+            for stale in expired:
+                self._close_quietly(stale.connection)
+
+            if entry is None:
+                return None
+            if now - entry.idle_since > self.health_check_interval and not self._is_healthy(entry.connection):
+                logger.info("Discarding unhealthy pooled database connection")
+                with self._lock:
+                    self._reconnects += 1
+                self._close_quietly(entry.connection)
+                continue
+            return entry.connection
+
+    @staticmethod
+    def _is_healthy(connection: Any) -> bool:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
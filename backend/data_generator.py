@@ -1,159 +1,841 @@
-from typing import Dict, List, Tuple
-import random
-from datetime import datetime, timedelta
-from faker import Faker
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import json
+import math
+import multiprocessing as mp
+import pickle
+import threading
+import time
+import zlib
+import numpy as np
 import sys
 import os
-import multiprocessing as mp
 from functools import partial
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlgen import TableSchema, build_table_name
+from sqlgen import Column, ColumnType, ForeignKey, TableSchema, build_table_name, format_sql_strings, parse_column_type
+from worker_pool import DEFAULT_CHUNKS_PER_WORKER, GeneratorPool, get_shared_pool, get_worker_faker
+from value_pools import DEFAULT_POOL_SIZE, value_pool_cache
+from metrics import ColumnStats, column_stats, registry
+from shared_chunks import PublishedChunk, collect_chunk, discard_chunk, publish_chunk
+from scheduler import ADAPTIVE_SCHEDULING, CALIBRATION_ROWS, RowCost, Schedule, calibration_cache, choose_schedule, fixed_schedule
+if TYPE_CHECKING:
+    from faker import Faker
+from columnar import (
+    INTEGER_LIMITS,
+    INTEGER_RANGES,
+    MAX_DECIMAL_INTEGER_DIGITS,
+    MAX_DECIMAL_RANDOM_SCALE,
+    NULL_PROBABILITY,
+    categorical_cdf,
+    feistel_key,
+    dates_to_python,
+    decimals_to_python,
+    format_booleans,
+    format_dates,
+    format_decimals,
+    format_doubles,
+    format_integers,
+    format_timestamps,
+    sample_booleans,
+    sample_categorical,
+    sample_dates,
+    sample_decimal_units,
+    sample_doubles,
+    sample_integers,
+    sample_normal,
+    sample_sequence,
+    sample_timeseries,
+    sample_timestamps,
+    sample_uniform,
+    sample_unique_dates,
+    sample_unique_doubles,
+    sample_unique_integers,
+    sample_unique_timestamps,
+    sample_zipf,
+    timestamps_to_python,
+    unique_uuids,
+    unique_value_count,
+    value_bounds,
+)
 
-# Initialize Faker instance
-fake = Faker()
+# Requests below this many rows are generated in this process without calibrating; at or above it, the measured
+# cost of the rows decides (or, with ADAPTIVE_SCHEDULING off, they always go to the worker pool)
+MULTIPROCESSING_THRESHOLD = 1000
 
-def generate_row_chunk(args: Tuple[int, int, List, Dict[str, int]]) -> List[Tuple[int, List[str]]]:
-    """Generate a chunk of rows for multiprocessing - must be top-level function for pickling"""
-    start_row, end_row, columns, pk_start_values = args
-    
-    # Initialize a new Faker instance for this process
-    process_fake = Faker()
-    process_fake.seed_instance(start_row + random.randint(0, 1000))  # Unique seed per chunk
-    
-    chunk_results = []
-    
-    for row_index in range(start_row, end_row):
-        row_values = []
-        
-        # Generate value for each column
-        for col in columns:
-            if col.primary_key:
-                # Calculate primary key value based on row index and starting value
-                pk_value = pk_start_values[col.name] + row_index
-                value = generate_primary_key_value(col.type, pk_value)
+# Maximum rows held in memory per chunk when streaming generated data
+STREAM_CHUNK_SIZE = 10000
+
+# Full INSERT output is split into several statements of at most this many rows and bytes, so each stays small
+# enough for the warehouse to parse; 0 disables a limit
+INSERT_MAX_ROWS = int(os.getenv("SQL_INSERT_MAX_ROWS", "10000"))
+INSERT_MAX_BYTES = int(os.getenv("SQL_INSERT_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Ends one INSERT statement before the header of the next; string literals are escaped, so it never occurs in a value
+STATEMENT_BREAK = "\n;\n\n"
+
+# Separates the VALUES rows of a statement
+ROW_SEPARATOR = ",\n"
+
+# A chunk of generated rows as (row_index, row_values) pairs
+RowChunk = List[Tuple[int, Tuple]]
+
+# First value of sequential primary keys
+PRIMARY_KEY_START = 1
+
+# Appended rows of a time column spread over the run's reference time back to the watermark; when the watermark
+# is not before it, they spread over this span after the watermark instead
+APPEND_MIN_SPAN = np.timedelta64(1, "D")
+
+# Rows covered by one counter-based RNG block; every (column, block) pair draws from its own streams,
+# so the generated values do not depend on how rows are split into chunks or across workers
+SEED_BLOCK_SIZE = 1000
+
+# Independent streams drawn per (column, block)
+VALUE_STREAM = 0
+NULL_STREAM = 1
+FAKER_STREAM = 2
+DOMAIN_STREAM = 3  # Drawn once per column, from block 0, for the values a column with a cardinality repeats
+
+# Value domains of columns with a cardinality each process keeps before the least recently used is rebuilt
+MAX_VALUE_DOMAINS = 32
+
+# Contextual kinds that are always generated per cell because pooled values would repeat
+UNIQUE_KINDS = {"uuid"}
+
+PRODUCTS = ["Laptop", "Smartphone", "Headphones", "Tablet", "Monitor", "Keyboard", "Mouse", "Speaker", "Camera", "Watch"]
+CATEGORIES = ["Electronics", "Clothing", "Books", "Home & Garden", "Sports", "Automotive", "Health", "Beauty", "Food", "Toys"]
+STATUSES = ["active", "inactive", "pending", "completed", "cancelled"]
+
+
+@dataclass
+class ColumnPlan:
+    """A column resolved once to its bound sampler and formatters"""
+    column: Column
+    kind: str
+    nullable: bool
+    sample: Callable[["Faker", np.random.Generator, int, int], Sequence]  # (faker, rng, start_row, size) -> raw values
+    format_sql: Callable[[Sequence], List[str]]  # raw values -> SQL literals
+    to_python: Callable[[Sequence], list]  # raw values -> JSON-compatible Python values
+    to_arrow: Optional[Callable[[Sequence], list]] = None  # raw values -> values Arrow casts exactly; to_python if None
+
+
+@dataclass
+class GenerationPlan:
+    """Per-column generators compiled once from a TableSchema; picklable so it can be sent to workers"""
+    columns: List[ColumnPlan]
+    seed: int
+    row_offset: int = 0  # Rows of an appended table that already exist; generated rows continue after them
+    column_keys: List[np.ndarray] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Philox key of each column's streams, derived from the seed and the column position
+        self.column_keys = [_column_key(self.seed, column_index) for column_index in range(len(self.columns))]
+
+    @property
+    def column_names(self) -> List[str]:
+        return [plan.column.name for plan in self.columns]
+
+    def generate_columns(self, faker_instance: "Faker", start_row: int, end_row: int) -> List[Tuple[Sequence, Optional[np.ndarray]]]:
+        """Generate raw values and a NULL mask for every column over [start_row, end_row)
+
+        Values are drawn block by block from counter-based streams keyed by (column, block), so any
+        row range can be regenerated on its own and comes out identical however the rows are chunked.
+        """
+        # Rows of an appended table are drawn at their place after the existing rows, so keys, sequences and
+        # unique values carry on from them
+        start_row, end_row = start_row + self.row_offset, end_row + self.row_offset
+        first_block = start_row // SEED_BLOCK_SIZE
+        column_values = []
+        for plan, column_key in zip(self.columns, self.column_keys):
+            started = time.perf_counter()
+            value_parts, null_parts = [], []
+            for block in range(first_block, (end_row - 1) // SEED_BLOCK_SIZE + 1):
+                block_start = block * SEED_BLOCK_SIZE
+                # Always draw from the start of the block so a range beginning mid-block sees the same values
+                size = min(block_start + SEED_BLOCK_SIZE, end_row) - block_start
+                skip = max(start_row - block_start, 0)
+                
+                faker_instance.seed_instance(int(_block_rng(column_key, FAKER_STREAM, block).integers(2 ** 63)))
+                values = plan.sample(faker_instance, _block_rng(column_key, VALUE_STREAM, block), block_start, size)
+                value_parts.append(values[skip:])
+                
+                # Sometimes generate NULL for nullable columns, drawn as one mask per block
+                if plan.nullable:
+                    null_parts.append((_block_rng(column_key, NULL_STREAM, block).random(size) < NULL_PROBABILITY)[skip:])
+            
+            nulls = np.concatenate(null_parts) if plan.nullable else None
+            column_values.append((_concatenate(value_parts), nulls))
+            column_stats.record(plan.kind, end_row - start_row, generate_seconds=time.perf_counter() - started)
+        return column_values
+
+    def render_rows(self, faker_instance: "Faker", start_row: int, end_row: int, row_format: str = "sql") -> RowChunk:
+        """Generate rows over [start_row, end_row) rendered as SQL literals, Python values or values for Arrow"""
+        rendered_columns = []
+        for plan, (values, nulls) in zip(self.columns, self.generate_columns(faker_instance, start_row, end_row)):
+            started = time.perf_counter()
+            if row_format == "sql":
+                cells, null_value = plan.format_sql(values), "NULL"
+            elif row_format == "arrow":
+                cells, null_value = (plan.to_arrow or plan.to_python)(values), None
             else:
-                # Generate random value for non-primary key columns
-                value = generate_random_value_mp(process_fake, col.name, col.type, col.nullable)
-            row_values.append(value)
+                cells, null_value = plan.to_python(values), None
+            
+            if nulls is not None:
+                for index in np.flatnonzero(nulls).tolist():
+                    cells[index] = null_value
+            rendered_columns.append(cells)
+            column_stats.record(plan.kind, 0, format_seconds=time.perf_counter() - started)
         
-        chunk_results.append((row_index, row_values))
-    
-    return chunk_results
+        # Transpose the columns back into rows
+        return list(zip(range(start_row, end_row), zip(*rendered_columns)))
+
+
+class ChunkEncoder:
+    """Encodes a rendered chunk of rows to output bytes
+
+    Encoders run in the worker that generated the chunk, so they must be picklable.
+    """
+    row_format = "sql"  # Row values the encoder consumes: "sql" literals, JSON-compatible "python" values or "arrow" values
+    stage = "encoding"  # Metrics stage the encoding time is recorded under
+
+    def __call__(self, chunk: RowChunk) -> bytes:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class InsertValuesEncoder(ChunkEncoder):
+    """Rows as the VALUES lines of INSERT statements, starting a new statement every statement_rows rows
+
+    Every row but the first of a statement is preceded by its separator, so a chunk never ends in a dangling
+    comma and the statement can still be ended after its last row.
+    """
+    first_row_index: int  # Row that starts the first statement
+    header: str  # INSERT INTO ... VALUES header repeated at each new statement
+    statement_rows: int = 0  # Rows per statement; 0 keeps every row in one statement
+    stage = "sql_assembly"
+
+    def __call__(self, chunk: RowChunk) -> bytes:
+        row_lines = ["    (" + ", ".join(row_values) + ")" for _, row_values in chunk]
+        if not self.statement_rows:
+            return self._join(chunk[0][0], row_lines).encode("utf-8")
+        
+        # Rows of each statement are joined in one call; only statement boundaries are handled per row
+        pieces = []
+        chunk_start = chunk[0][0]
+        offset = 0
+        while offset < len(row_lines):
+            row_index = chunk_start + offset
+            statement_end = row_index + self.statement_rows - (row_index - self.first_row_index) % self.statement_rows
+            end_offset = min(statement_end - chunk_start, len(row_lines))
+            pieces.append(self._join(row_index, row_lines[offset:end_offset]))
+            offset = end_offset
+        return "".join(pieces).encode("utf-8")
 
-def generate_random_value_mp(faker_instance: Faker, column_name: str, column_type: str, nullable: bool) -> str:
-    """Multiprocessing-safe version of generate_random_value"""
-    # Sometimes generate NULL for nullable columns (10% chance)
-    if nullable and random.random() < 0.1:
-        return "NULL"
+    def _join(self, row_index: int, row_lines: List[str]) -> str:
+        """Rows continuing the statement that row_index falls in"""
+        rows = ROW_SEPARATOR.join(row_lines)
+        if row_index == self.first_row_index:
+            return rows
+        if self.statement_rows and (row_index - self.first_row_index) % self.statement_rows == 0:
+            return STATEMENT_BREAK + self.header + "\n" + rows
+        return ROW_SEPARATOR + rows
+
+
+@dataclass(frozen=True)
+class NDJSONEncoder(ChunkEncoder):
+    """Rows as newline-delimited JSON objects"""
+    column_names: Tuple[str, ...]
+    row_format = "python"
+    stage = "ndjson_encoding"
+
+    def __call__(self, chunk: RowChunk) -> bytes:
+        lines = [json.dumps(dict(zip(self.column_names, row_values))) for _, row_values in chunk]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def compile_plan(schema: TableSchema, primary_key_starts: Optional[Dict[str, int]] = None, value_pool_size: int = DEFAULT_POOL_SIZE) -> GenerationPlan:
+    """Resolve every column of the schema to its generator once, before any rows are generated"""
+    if primary_key_starts is None:
+        primary_key_starts = _primary_key_starts(schema.columns)
     
-    # Handle different data types with realistic data
-    if "BIGINT" in column_type:
-        return str(faker_instance.random_int(min=-9223372036854775808, max=9223372036854775807))
+    # Pools only pay off when the table has more rows than a pool holds
+    pool_size = value_pool_size if schema.rows > value_pool_size else None
     
-    elif "INT" in column_type:
-        return str(faker_instance.random_int(min=-2147483648, max=2147483647))
+    # Unseeded schemas still get one seed for the whole run, so every chunk draws from distinct streams
+    seed = schema.seed if schema.seed is not None else np.random.SeedSequence().entropy
     
-    elif "SMALLINT" in column_type:
-        return str(faker_instance.random_int(min=0, max=32767))
+    # Dates and timestamps count back from one reference time fixed for the run; seeded runs use
+    # midnight (UTC) so the same seed reproduces the same data all day, on any machine
+    if schema.seed is not None:
+        reference_time = np.datetime64(datetime.now(timezone.utc).date(), "s")
+    else:
+        reference_time = np.datetime64(datetime.now(), "s")
+    
+    row_offset = append_row_offset(schema)
+    if row_offset:
+        validate_row_ranges(schema)
+    columns = [
+        _compile_column(col, primary_key_starts.get(col.name, PRIMARY_KEY_START), pool_size, reference_time,
+                        schema.foreign_keys.get(col.name), schema.rows, _column_key(seed, column_index), row_offset)
+        for column_index, col in enumerate(schema.columns)
+    ]
+    watermark = schema.append
+    if watermark is not None and watermark.time_column is not None and watermark.max_time is not None:
+        time_plan = next(plan for plan in columns if plan.column.name == watermark.time_column)
+        time_plan.sample = _watermark_sampler(parse_column_type(time_plan.column.type), watermark.max_time,
+                                              reference_time, schema.rows, row_offset)
+    return GenerationPlan(columns=columns, seed=seed, row_offset=row_offset)
+
+
+def append_row_offset(schema: TableSchema) -> int:
+    """Rows an appended table already holds, counted from its largest primary key"""
+    if schema.append is None or schema.append.max_key is None:
+        return 0
+    return max(schema.append.max_key - PRIMARY_KEY_START + 1, 0)
+
+
+def validate_row_ranges(schema: TableSchema) -> None:
+    """Check that unique columns have distinct values, and sequences stay in their type, for all the table's rows
+
+    Rows appended to a table take the indexes after its existing rows, so those count too.
+    """
+    rows = append_row_offset(schema) + schema.rows
+    for col in schema.columns:
+        if col.unique and not col.primary_key:
+            validate_unique_capacity(col, rows)
+        if col.distribution is not None and col.distribution["type"] == "sequence":
+            validate_sequence_range(col, rows)
+
+
+def validate_sequence_range(col: Column, rows: int) -> None:
+    """Check that a sequence column's values for rows row indexes fit its type, rather than piling up at its limit"""
+    start, step = col.distribution["start"], col.distribution["step"]
+    # Each value may be moved up by a random gap below step
+    last = start + max(rows - 1, 0) * step + step - 1
+    column_type = parse_column_type(col.type)
+    low, high = value_bounds(column_type.name, column_type.precision, column_type.scale)
+    if start < low or last > high:
+        raise ValueError(f"Column {col.name}: a sequence from {start} in steps of {step} reaches {last:,} over "
+                         f"{rows:,} rows, outside the {col.type} range of {low:g} to {high:g}")
+
+
+def validate_unique_capacity(col: Column, rows: int) -> None:
+    """Check that a unique column has a distinct value for each of the row indexes below rows"""
+    column_type = parse_column_type(col.type)
+    value_count = unique_value_count(column_type.name, column_type.precision, column_type.scale)
+    if value_count is not None and rows > value_count:
+        raise ValueError(f"Column {col.name}: {col.type} has {value_count:,} distinct values, fewer than the {rows:,} rows")
+    # Unique strings end in -<row number>, which has to fit the column's length
+    if value_count is None and column_type.length is not None and len(str(rows)) + 1 > column_type.length:
+        raise ValueError(f"Column {col.name}: {col.type} is too short for {rows:,} unique values")
+
+
+def _watermark_sampler(column_type: ColumnType, max_time: str, reference_time: np.datetime64, rows: int,
+                       row_offset: int) -> Callable:
+    """Sampler of an appended table's time column: values increasing with the row index, all after max_time"""
+    if column_type.name == "DATE":
+        start = (np.datetime64(max_time, "D") + 1).astype("datetime64[s]")
+        end = reference_time.astype("datetime64[D]").astype("datetime64[s]")
+    else:
+        start = np.datetime64(max_time, "s") + 1
+        end = reference_time
+    if end <= start:
+        end = start + APPEND_MIN_SPAN
+    return partial(_sample_rows, sampler=sample_timeseries, to_raw=_raw_converter(column_type), rows=rows,
+                   start=start, end=end, seasonality=(), amplitude=0.0, trend=0.0, first_row=row_offset)
+
+
+def _compile_column(col: Column, primary_key_start: int, pool_size: Optional[int] = None,
+                    reference_time: Optional[np.datetime64] = None, foreign_key: Optional[ForeignKey] = None,
+                    rows: int = 0, column_key: Optional[np.ndarray] = None, row_offset: int = 0) -> ColumnPlan:
+    """Resolve a single column's type, name and value distribution to its sampler and formatters"""
+    column_type = parse_column_type(col.type)
+    type_name = column_type.name
+    nullable = col.nullable and not col.primary_key
     
-    elif "TINYINT" in column_type:
-        return str(faker_instance.random_int(min=0, max=255))
+    if col.primary_key:
+        # Primary keys are sequential, based on row index and starting value
+        sample = partial(_sample_primary_keys, start=primary_key_start)
+        if type_name == "STRING":
+            return ColumnPlan(col, "primary_key", nullable, sample, _format_string_keys, _string_keys_to_python)
+        return ColumnPlan(col, "primary_key", nullable, sample, format_integers, _to_list)
     
-    elif "STRING" in column_type or "VARCHAR" in column_type:
-        # Generate contextual fake data based on column name
-        return f"'{generate_contextual_value_mp(faker_instance, column_name)}'"
+    if foreign_key is not None:
+        # Foreign keys are drawn uniformly from the parent's key range, so the parent never has to be generated
+        last_key = foreign_key.start + foreign_key.rows - 1
+        sample = partial(_sample_columnar, sampler=sample_integers, low=foreign_key.start, high=last_key)
+        if foreign_key.string_keys:
+            return ColumnPlan(col, "foreign_key", nullable, sample, _format_string_keys, _string_keys_to_python)
+        return ColumnPlan(col, "foreign_key", nullable, sample, format_integers, _to_list)
     
-    elif "BOOLEAN" in column_type:
-        return str(faker_instance.boolean()).lower()
+    typed_plan = _compile_typed_column(col, column_type, nullable, reference_time)
+    if typed_plan is not None:
+        if col.unique:
+            typed_plan.sample = _unique_sampler(column_type, feistel_key(column_key), reference_time)
+        if col.distribution is not None:
+            typed_plan.sample = _distribution_sampler(col.distribution, column_type, rows, row_offset)
+        if col.cardinality is not None and col.cardinality < rows:
+            # Rows repeat a domain of at most cardinality values, drawn once with the column's own sampler
+            domain_key = (column_key.tobytes(), col.type, json.dumps(col.distribution, sort_keys=True), col.cardinality)
+            typed_plan.sample = partial(_sample_domain, sample=typed_plan.sample, column_key=column_key,
+                                        cardinality=col.cardinality, domain_key=domain_key)
+        return typed_plan
     
-    elif "TIMESTAMP" in column_type:
-        # Generate random timestamp within the last 2 years
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=730)  # 2 years ago
-        random_time = faker_instance.date_time_between(start_date=start_date, end_date=end_date)
-        return f"'{random_time.strftime('%Y-%m-%d %H:%M:%S')}'"
+    if type_name == "STRING":
+        # Generate contextual fake data based on column name
+        kind = resolve_contextual_kind(col.name)
+    else:
+        # Default to realistic string data for unknown types
+        kind = "word"
     
-    elif "DATE" in column_type:
-        # Generate random date within the last 2 years
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=730)  # 2 years ago
-        random_date = faker_instance.date_between(start_date=start_date, end_date=end_date)
-        return f"'{random_date.strftime('%Y-%m-%d')}'"
+    if col.unique and kind in UNIQUE_KINDS and (column_type.length is None or column_type.length >= 36):
+        # Unique UUIDs carry a permutation of the row index in their random bits
+        return ColumnPlan(col, kind, nullable, partial(_sample_unique_uuids, key=feistel_key(column_key)), format_sql_strings, list)
     
-    elif "DECIMAL" in column_type:
-        # Generate realistic decimal values (e.g., for prices, percentages)
-        return f"{faker_instance.pyfloat(min_value=0.01, max_value=9999.99, right_digits=2)}"
+    distribution = col.distribution or {}
+    if distribution.get("type") == "categorical":
+        sample = partial(_sample_categories, categories=np.array(distribution["values"], dtype=object),
+                         cdf=_categorical_cdf(distribution), to_raw=_to_list)
+        return ColumnPlan(col, kind, nullable, sample, format_sql_strings, list)
     
-    elif "DOUBLE" in column_type or "FLOAT" in column_type:
-        return f"{faker_instance.pyfloat(min_value=0.0001, max_value=99999.9999, right_digits=4)}"
+    # Sample from a pre-generated pool unless the column needs distinct values
+    if col.value_mode == "unique" or kind in UNIQUE_KINDS:
+        pool_size = None
+    if col.cardinality is not None and col.cardinality < rows:
+        # The pool is the column's whole domain
+        pool_size = col.cardinality
+    elif distribution.get("type") == "zipf":
+        # Skew needs a pool to rank, even for tables smaller than one
+        pool_size = pool_size or DEFAULT_POOL_SIZE
+    # Pools are built from a fixed Faker state, so every process builds the same pool and one pool serves every
+    # seed; the seed only decides which pool values are drawn
+    pool_seed = _pool_seed(kind) if pool_size else None
+    sample = partial(_sample_contextual, kind=kind, max_length=column_type.length, pool_size=pool_size, pool_seed=pool_seed,
+                     skew=distribution.get("exponent"), unique=col.unique)
+    return ColumnPlan(col, kind, nullable, sample, format_sql_strings, list)
+
+
+def _compile_typed_column(col: Column, column_type: ColumnType, nullable: bool,
+                          reference_time: Optional[np.datetime64]) -> Optional[ColumnPlan]:
+    """Plan of a numeric, boolean or date column with its default sampler; None for string columns"""
+    type_name = column_type.name
+    if type_name in INTEGER_RANGES:
+        low, high = INTEGER_RANGES[type_name]
+        sample = partial(_sample_columnar, sampler=sample_integers, low=low, high=high)
+        return ColumnPlan(col, type_name, nullable, sample, format_integers, _to_list)
+    if type_name == "BOOLEAN":
+        return ColumnPlan(col, type_name, nullable, partial(_sample_columnar, sampler=sample_booleans), format_booleans, _to_list)
+    if type_name == "TIMESTAMP":
+        return ColumnPlan(col, type_name, nullable, partial(_sample_columnar, sampler=sample_timestamps, end_time=reference_time), format_timestamps, timestamps_to_python)
+    if type_name == "DATE":
+        return ColumnPlan(col, type_name, nullable, partial(_sample_columnar, sampler=sample_dates, end_time=reference_time), format_dates, dates_to_python)
+    if type_name == "DECIMAL":
+        sample = partial(_sample_columnar, sampler=sample_decimal_units, precision=column_type.precision, scale=column_type.scale)
+        # Arrow parses the decimal text exactly, where the floats of to_python would round the last digits
+        return ColumnPlan(col, type_name, nullable, sample, partial(format_decimals, scale=column_type.scale),
+                          partial(decimals_to_python, scale=column_type.scale), partial(format_decimals, scale=column_type.scale))
+    if type_name == "DOUBLE":
+        return ColumnPlan(col, type_name, nullable, partial(_sample_columnar, sampler=sample_doubles), format_doubles, _to_list)
+    return None
+
+
+def _unique_sampler(column_type: ColumnType, key: Tuple[int, ...], reference_time: np.datetime64) -> Callable:
+    """Sampler giving every row of a typed column its own value, from a keyed permutation of the row index"""
+    type_name = column_type.name
+    if type_name in INTEGER_RANGES:
+        low, high = INTEGER_RANGES[type_name]
+        return partial(_sample_unique, sampler=sample_unique_integers, low=low, high=high, key=key)
+    if type_name == "DECIMAL":
+        high = unique_value_count(type_name, column_type.precision, column_type.scale)
+        return partial(_sample_unique, sampler=sample_unique_integers, low=1, high=high, key=key)
+    if type_name == "DOUBLE":
+        return partial(_sample_unique, sampler=sample_unique_doubles, key=key)
+    if type_name == "DATE":
+        return partial(_sample_unique, sampler=sample_unique_dates, key=key, end_time=reference_time)
+    return partial(_sample_unique, sampler=sample_unique_timestamps, key=key, end_time=reference_time)
+
+
+def _distribution_sampler(distribution: Dict, column_type: ColumnType, rows: int, row_offset: int = 0) -> Callable:
+    """Sampler drawing a typed column's raw values from its declared distribution
+
+    Time series of an appended table span their start and end over the generated rows, after row_offset.
+    """
+    kind = distribution["type"]
+    to_raw = _raw_converter(column_type)
+    if kind == "categorical":
+        categories = to_raw(np.array(distribution["values"], dtype=_natural_dtype(column_type)))
+        return partial(_sample_categories, categories=categories, cdf=_categorical_cdf(distribution), to_raw=None)
+    if kind == "timeseries":
+        return partial(_sample_rows, sampler=sample_timeseries, to_raw=to_raw, rows=rows,
+                       start=np.datetime64(distribution["start"], "s"), end=np.datetime64(distribution["end"], "s"),
+                       seasonality=tuple(distribution["seasonality"]), amplitude=distribution["amplitude"],
+                       trend=distribution["trend"], first_row=row_offset)
+    if kind == "sequence":
+        return partial(_sample_rows, sampler=sample_sequence, to_raw=to_raw, start=distribution["start"], step=distribution["step"])
     
-    else:
-        # Default to realistic string data for unknown types
-        return f"'{faker_instance.word()}'"
+    if kind == "zipf":
+        return partial(_sample_columnar, sampler=sample_zipf, to_raw=to_raw, low=distribution["min"],
+                       count=distribution["max"] - distribution["min"] + 1, exponent=distribution["exponent"])
+    low, high = _value_bounds(column_type)
+    if kind == "normal":
+        return partial(_sample_columnar, sampler=sample_normal, to_raw=to_raw, mean=distribution["mean"],
+                       stddev=distribution["stddev"], low=_first(distribution["min"], low), high=_first(distribution["max"], high))
+    # Uniform over the given bounds, or the range the type's default sampler covers
+    default_low, default_high = _uniform_defaults(column_type)
+    if column_type.name in INTEGER_RANGES:
+        # Whole numbers drawn directly, so the bounds are as likely as any value between them
+        low = max(math.ceil(_first(distribution["min"], default_low)), low)
+        high = max(low, min(math.floor(_first(distribution["max"], default_high)), high))
+        return partial(_sample_columnar, sampler=sample_integers, low=low, high=high)
+    return partial(_sample_columnar, sampler=sample_uniform, to_raw=to_raw,
+                   low=_first(distribution["min"], default_low), high=_first(distribution["max"], default_high))
+
+
+def _value_bounds(column_type: ColumnType) -> Tuple[float, float]:
+    """Smallest and largest value a numeric column can hold"""
+    return value_bounds(column_type.name, column_type.precision, column_type.scale)
+
 
-def generate_contextual_value_mp(faker_instance: Faker, column_name: str) -> str:
-    """Multiprocessing-safe version of generate_contextual_value"""
+def _uniform_defaults(column_type: ColumnType) -> Tuple[float, float]:
+    if column_type.name in INTEGER_RANGES:
+        return INTEGER_RANGES[column_type.name]
+    if column_type.name == "DECIMAL":
+        return 0.0, 10.0 ** max(0, min(column_type.precision - column_type.scale, MAX_DECIMAL_INTEGER_DIGITS))
+    return 0.0, 100000.0
+
+
+def _natural_dtype(column_type: ColumnType) -> str:
+    """NumPy type of a typed column's values as written in a schema"""
+    return {"BOOLEAN": "bool", "DATE": "datetime64[D]", "TIMESTAMP": "datetime64[s]"}.get(column_type.name, "float64")
+
+
+def _raw_converter(column_type: ColumnType) -> Callable[[np.ndarray], np.ndarray]:
+    """Conversion of distribution draws to the raw values the column's formatters take"""
+    type_name = column_type.name
+    if type_name in INTEGER_RANGES:
+        low, high = INTEGER_LIMITS[type_name]
+        return partial(_to_integers, low=low, high=high)
+    if type_name == "DECIMAL":
+        low, high = _value_bounds(column_type)
+        return partial(_to_decimal_units, low=low, high=high, unit=10 ** min(column_type.scale, MAX_DECIMAL_RANDOM_SCALE))
+    if type_name == "DOUBLE":
+        return _to_doubles
+    if type_name == "DATE":
+        return _to_dates
+    return _unchanged
+
+
+def resolve_contextual_kind(column_name: str) -> str:
+    """Resolves the kind of contextual fake data for a string column from common column name patterns"""
     lower_name = column_name.lower()
     
-    # Generate contextual data based on common column name patterns
     if "email" in lower_name:
-        return faker_instance.email()
+        return "email"
     elif "phone" in lower_name:
-        return faker_instance.phone_number()
+        return "phone"
     elif "address" in lower_name:
-        return faker_instance.address().replace('\n', ', ')
+        return "address"
     elif "city" in lower_name:
-        return faker_instance.city()
+        return "city"
     elif "state" in lower_name:
-        return faker_instance.state()
+        return "state"
     elif "country" in lower_name:
-        return faker_instance.country()
+        return "country"
     elif "zip" in lower_name or "postal" in lower_name:
-        return faker_instance.zipcode()
+        return "zipcode"
     elif "first" in lower_name and "name" in lower_name:
-        return faker_instance.first_name()
+        return "first_name"
     elif "last" in lower_name and "name" in lower_name:
-        return faker_instance.last_name()
+        return "last_name"
     elif "name" in lower_name or "username" in lower_name:
-        return faker_instance.user_name()
+        return "username"
     elif "company" in lower_name:
-        return faker_instance.company()
+        return "company"
     elif "job" in lower_name or "title" in lower_name:
-        return faker_instance.job()
+        return "job"
     elif "description" in lower_name:
-        return faker_instance.sentence(nb_words=random.randint(5, 15))
+        return "description"
     elif "url" in lower_name or "website" in lower_name:
-        return faker_instance.url()
+        return "url"
     elif "uuid" in lower_name or "guid" in lower_name:
-        return str(faker_instance.uuid4())
+        return "uuid"
     elif "price" in lower_name or "cost" in lower_name:
-        return f"{faker_instance.pyfloat(min_value=1.00, max_value=999.99, right_digits=2)}"
+        return "price"
     elif "product" in lower_name:
-        products = ["Laptop", "Smartphone", "Headphones", "Tablet", "Monitor", "Keyboard", "Mouse", "Speaker", "Camera", "Watch"]
-        return faker_instance.random_element(products)
+        return "product"
     elif "category" in lower_name:
-        categories = ["Electronics", "Clothing", "Books", "Home & Garden", "Sports", "Automotive", "Health", "Beauty", "Food", "Toys"]
-        return faker_instance.random_element(categories)
+        return "category"
     elif "color" in lower_name:
-        return faker_instance.color_name()
+        return "color"
     elif "status" in lower_name:
-        statuses = ["active", "inactive", "pending", "completed", "cancelled"]
-        return faker_instance.random_element(statuses)
+        return "status"
+    else:
+        return "mixed"
+
+
+# Providers the fallback picks from for varied realistic data
+MIXED_PROVIDERS: List[Callable[["Faker"], str]] = [
+    lambda f: f.first_name(),
+    lambda f: f.last_name(),
+    lambda f: f.company(),
+    lambda f: f.job(),
+    lambda f: f.city(),
+    lambda f: f.word(),
+    lambda f: f.sentence(nb_words=f.random_int(3, 8)),
+]
+
+
+def _mixed_value(faker_instance: "Faker") -> str:
+    """Fallback to varied realistic data, calling only the provider that was picked"""
+    return faker_instance.random_element(MIXED_PROVIDERS)(faker_instance)
+
+
+# Faker provider for each contextual kind
+CONTEXTUAL_PROVIDERS: Dict[str, Callable[["Faker"], str]] = {
+    "email": lambda f: f.email(),
+    "phone": lambda f: f.phone_number(),
+    "address": lambda f: f.address().replace('\n', ', '),
+    "city": lambda f: f.city(),
+    "state": lambda f: f.state(),
+    "country": lambda f: f.country(),
+    "zipcode": lambda f: f.zipcode(),
+    "first_name": lambda f: f.first_name(),
+    "last_name": lambda f: f.last_name(),
+    "username": lambda f: f.user_name(),
+    "company": lambda f: f.company(),
+    "job": lambda f: f.job(),
+    "description": lambda f: f.sentence(nb_words=f.random_int(5, 15)),
+    "url": lambda f: f.url(),
+    "uuid": lambda f: str(f.uuid4()),
+    "price": lambda f: f"{f.pyfloat(min_value=1.00, max_value=999.99, right_digits=2)}",
+    "product": lambda f: f.random_element(PRODUCTS),
+    "category": lambda f: f.random_element(CATEGORIES),
+    "color": lambda f: f.color_name(),
+    "status": lambda f: f.random_element(STATUSES),
+    "mixed": _mixed_value,
+    "word": lambda f: f.word(),
+}
+
+
+# --- Bound samplers and formatters referenced by ColumnPlan (top-level so plans can be pickled) ---
+
+def _sample_primary_keys(faker_instance: "Faker", rng: np.random.Generator, start_row: int, size: int, start: int) -> np.ndarray:
+    return np.arange(start + start_row, start + start_row + size, dtype=np.int64)
+
+
+def _sample_columnar(faker_instance: "Faker", rng: np.random.Generator, start_row: int, size: int, sampler: Callable,
+                     to_raw: Optional[Callable] = None, **params) -> np.ndarray:
+    # Fill the whole column chunk with one NumPy draw
+    values = sampler(rng, size, **params)
+    return to_raw(values) if to_raw is not None else values
+
+
+def _sample_rows(faker_instance: "Faker", rng: np.random.Generator, start_row: int, size: int, sampler: Callable,
+                 to_raw: Callable, **params) -> np.ndarray:
+    # Samplers whose values depend on the row index, such as sequences and time series
+    return to_raw(sampler(rng, start_row, size, **params))
+
+
+def _sample_categories(faker_instance: "Faker", rng: np.random.Generator, start_row: int, size: int, categories: np.ndarray,
+                       cdf: np.ndarray, to_raw: Optional[Callable] = None) -> Sequence:
+    values = categories[sample_categorical(rng, size, cdf)]
+    return to_raw(values) if to_raw is not None else values
+
+
+def _sample_domain(faker_instance: "Faker", rng: np.random.Generator, start_row: int, size: int, sample: Callable,
+                   column_key: np.ndarray, cardinality: int, domain_key: Tuple) -> np.ndarray:
+    # Rows pick uniformly from the column's domain, built once per process from the domain stream
+    domain = _value_domain(domain_key, lambda: sample(faker_instance, _block_rng(column_key, DOMAIN_STREAM, 0), 0, cardinality))
+    return domain[rng.integers(0, len(domain), size=size)]
+
+
+def _sample_unique(faker_instance: "Faker", rng: np.random.Generator, start_row: int, size: int, sampler: Callable, **params) -> np.ndarray:
+    # Unique values depend only on the row index, so workers never need to know what the others produced
+    return sampler(start_row, size, **params)
+
+
+def _sample_unique_uuids(faker_instance: "Faker", rng: np.random.Generator, start_row: int, size: int, key: Tuple[int, ...]) -> List[str]:
+    return unique_uuids(rng, start_row, size, key)
+
+
+def _sample_contextual(faker_instance: "Faker", rng: np.random.Generator, start_row: int, size: int, kind: str, max_length: Optional[int],
+                       pool_size: Optional[int] = None, pool_seed: Optional[int] = None, skew: Optional[float] = None,
+                       unique: bool = False) -> List[str]:
+    provider = CONTEXTUAL_PROVIDERS[kind]
+    if pool_size:
+        # Draw from this process's pre-generated pool for the kind and locale; a skewed column favours the
+        # first pool values
+        pool = _value_pool(faker_instance, kind, pool_size, pool_seed)
+        if skew is not None:
+            indexes = sample_zipf(rng, size, 0, len(pool), skew)
+        else:
+            indexes = rng.integers(0, len(pool), size=size)
+        values = pool[indexes].tolist()
     else:
-        # Fallback to varied realistic data
-        options = [
-            faker_instance.first_name(),
-            faker_instance.last_name(),
-            faker_instance.company(),
-            faker_instance.job(),
-            faker_instance.city(),
-            faker_instance.word(),
-            faker_instance.sentence(nb_words=random.randint(3, 8)),
-        ]
-        return faker_instance.random_element(options)
+        values = [provider(faker_instance) for _ in range(size)]
+    if unique:
+        return _with_row_suffixes(values, kind, start_row, max_length)
+    if max_length is not None:
+        values = [value[:max_length] for value in values]
+    return values
+
+
+def _with_row_suffixes(values: List[str], kind: str, start_row: int, max_length: Optional[int]) -> List[str]:
+    """Make string values unique by ending each with its row number
+
+    The number follows the last separator, where no other value can have the same one, so values stay distinct
+    whatever they started as. Emails keep their domain; values too long for the column lose their end first.
+    """
+    suffixed = []
+    for row, value in enumerate(values, start_row + 1):
+        if kind == "email" and "@" in value:
+            local, domain = value.rsplit("@", 1)
+            email = f"{local}.{row}@{domain}"
+            if max_length is None or len(email) <= max_length:
+                suffixed.append(email)
+                continue
+        suffix = f"-{row}"
+        suffixed.append(value[:max_length - len(suffix)] + suffix if max_length is not None else value + suffix)
+    return suffixed
+
+
+def _value_pool(faker_instance: "Faker", kind: str, pool_size: int, pool_seed: Optional[int]) -> np.ndarray:
+    pool_key = (tuple(faker_instance.locales), kind, pool_size, pool_seed)
+    if pool_seed is not None:
+        faker_instance.seed_instance(pool_seed)
+    return value_pool_cache.get(pool_key, pool_size, partial(CONTEXTUAL_PROVIDERS[kind], faker_instance))
+
+
+def warm_value_pools(pool_size: int = DEFAULT_POOL_SIZE) -> None:
+    """Build this process's pool of every pooled kind up front, so the first preview of a large table
+    does not pay for them"""
+    faker_instance = get_worker_faker()
+    for kind in CONTEXTUAL_PROVIDERS:
+        if kind not in UNIQUE_KINDS:
+            _value_pool(faker_instance, kind, pool_size, _pool_seed(kind))
+
+
+# Value domains of this process, most recently used last
+_value_domains: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+_value_domains_lock = threading.Lock()
+
+
+def _value_domain(domain_key: Tuple, build: Callable[[], np.ndarray]) -> np.ndarray:
+    with _value_domains_lock:
+        domain = _value_domains.get(domain_key)
+        if domain is not None:
+            _value_domains.move_to_end(domain_key)
+            return domain
+    domain = build()
+    with _value_domains_lock:
+        _value_domains[domain_key] = domain
+        while len(_value_domains) > MAX_VALUE_DOMAINS:
+            _value_domains.popitem(last=False)
+    return domain
+
+
+def _categorical_cdf(distribution: Dict) -> np.ndarray:
+    return categorical_cdf(distribution["weights"] or [1.0] * len(distribution["values"]))
+
+
+def _to_integers(values: np.ndarray, low: int, high: int) -> np.ndarray:
+    if values.dtype.kind in "iu":
+        return np.clip(values, low, high).astype(np.int64)
+    # Rounded and clipped as floats; float64 cannot hold the largest BIGINT, which saturates instead of wrapping
+    rounded = np.rint(np.clip(values, float(low), float(high)))
+    overflow = rounded >= 2.0 ** 63
+    integers = np.where(overflow, 0.0, rounded).astype(np.int64)
+    integers[overflow] = high
+    return integers
+
+
+def _to_decimal_units(values: np.ndarray, low: float, high: float, unit: int) -> np.ndarray:
+    return np.rint(np.clip(values, low, high) * unit).astype(np.int64)
+
+
+def _to_doubles(values: np.ndarray) -> np.ndarray:
+    return np.round(values.astype(np.float64), 4)
+
+
+def _to_dates(values: np.ndarray) -> np.ndarray:
+    return values.astype("datetime64[D]")
+
+
+def _unchanged(values: np.ndarray) -> np.ndarray:
+    return values
+
+
+def _first(value, default):
+    return default if value is None else value
+
+
+def _format_string_keys(values: np.ndarray) -> List[str]:
+    # For string primary keys, create a pattern like "ID_001", "ID_002", etc.
+    return [f"'ID_{counter:03d}'" for counter in values.tolist()]
+
+
+def _string_keys_to_python(values: np.ndarray) -> List[str]:
+    return [f"ID_{counter:03d}" for counter in values.tolist()]
+
+
+def _to_list(values: np.ndarray) -> list:
+    return values.tolist()
+
+
+def _block_rng(column_key: np.ndarray, stream: int, block: int) -> np.random.Generator:
+    """Counter-based generator for one stream of one column block; the block sits in the high counter words
+    so the draws of neighbouring blocks never overlap"""
+    return np.random.Generator(np.random.Philox(key=column_key, counter=[0, 0, stream, block]))
+
+
+def _column_key(seed: int, column_index: int) -> np.ndarray:
+    """Philox key of a column's streams, derived from the seed and the column position"""
+    return np.random.SeedSequence([seed, column_index]).generate_state(2, dtype=np.uint64)
+
+
+def _pool_seed(kind: str) -> int:
+    """Faker seed a value pool is built from, shared by every column and schema of the same kind"""
+    return zlib.crc32(kind.encode())
+
+
+def _concatenate(parts: List[Sequence]) -> Sequence:
+    """Joins per-block column values, which are NumPy arrays or lists depending on the sampler"""
+    if len(parts) == 1:
+        return parts[0]
+    if isinstance(parts[0], np.ndarray):
+        return np.concatenate(parts)
+    return [value for part in parts for value in part]
+
+
+def generate_row_chunk(args: Tuple[int, int, GenerationPlan, str]) -> Tuple[RowChunk, ColumnStats]:
+    """Generate a chunk of rows for multiprocessing - must be top-level function for pickling
+
+    The worker's column timings travel back with the chunk so the parent process can count them.
+    """
+    start_row, end_row, plan, row_format = args
+    
+    # Reuse the Faker instance built once per worker process; the plan reseeds it per column block
+    chunk = plan.render_rows(get_worker_faker(), start_row, end_row, row_format)
+    return chunk, column_stats.drain()
+
+
+def generate_encoded_chunk(args: Tuple[int, int, GenerationPlan, ChunkEncoder]) -> Tuple[int, PublishedChunk, ColumnStats, float]:
+    """Generate and encode a chunk in a worker, handing the encoded buffer back through shared memory
 
+    Returns the chunk's end row, the published buffer, the worker's column timings and the encoding time.
+    """
+    start_row, end_row, plan, encoder = args
+    chunk = plan.render_rows(get_worker_faker(), start_row, end_row, encoder.row_format)
+    started = time.perf_counter()
+    data = encoder(chunk)
+    return end_row, publish_chunk(data), column_stats.drain(), time.perf_counter() - started
 
+
+@registry.timed("insert_preview")
 def generate_insert_sql(schema: TableSchema) -> str:
     """Generates Databricks SQL INSERT statements with random data (limited to 5 rows for display)"""
     if schema.rows <= 0:
@@ -165,52 +847,12 @@ def generate_insert_sql(schema: TableSchema) -> str:
     # Build the table name with optional catalog and schema
     table_name = build_table_name(schema.catalog, schema.schema, schema.table_name)
     
-    # Build column names for INSERT statement
-    column_names = [col.name for col in schema.columns]
-    
     # Start INSERT statement
-    sql_parts = [f"INSERT INTO {table_name} ("]
-    
-    # Add column names with proper formatting
-    for i, col_name in enumerate(column_names):
-        indent = "    "
-        col_line = f"{indent}{col_name}"
-        if i < len(column_names) - 1:
-            col_line += ","
-        sql_parts.append(col_line)
-    
-    sql_parts.append(")")
-    sql_parts.append("VALUES")
-    
-    # Initialize primary key counters
-    primary_key_counters: Dict[str, int] = {}
-    for col in schema.columns:
-        if col.primary_key:
-            primary_key_counters[col.name] = 1  # Start from 1 for primary keys
+    sql_parts = [_build_insert_header(table_name, [col.name for col in schema.columns])]
     
     # Generate random data for each row (limited to display_rows)
-    for row_index in range(display_rows):
-        row_values = []
-        
-        # Generate value for each column
-        for col in schema.columns:
-            if col.primary_key:
-                # Generate incremental value for primary key
-                value = generate_primary_key_value(col.type, primary_key_counters[col.name])
-                primary_key_counters[col.name] += 1
-            else:
-                # Generate random value for non-primary key columns
-                value = generate_random_value(col.name, col.type, col.nullable)
-            row_values.append(value)
-        
-        # Format row values with proper indentation
-        row_sql = f"    ({', '.join(row_values)})"
-        
-        # Add comma if not last row
-        if row_index < display_rows - 1:
-            row_sql += ","
-        
-        sql_parts.append(row_sql)
+    row_results = _generate_rows_sequential(0, display_rows, compile_plan(schema))
+    sql_parts.append(InsertValuesEncoder(first_row_index=0, header=sql_parts[0])(row_results).decode("utf-8"))
     
     # Add comment if we're showing fewer rows than requested
     if schema.rows > 5:
@@ -225,233 +867,364 @@ def generate_full_insert_sql(schema: TableSchema) -> str:
     if schema.rows <= 0:
         return ""
     
-    # Build the table name with optional catalog and schema
-    table_name = build_table_name(schema.catalog, schema.schema, schema.table_name)
-    
-    # Build column names for INSERT statement
-    column_names = [col.name for col in schema.columns]
+    return "".join(iter_insert_sql(schema))
+
+
+def iter_insert_sql(schema: TableSchema, chunk_size: int = STREAM_CHUNK_SIZE, progress: Optional[Callable[[int], None]] = None,
+                    start_row: int = 0, end_row: Optional[int] = None) -> Iterator[str]:
+    """Yields the complete INSERT statement piece by piece, one chunk of rows at a time"""
+    for piece in iter_insert_sql_bytes(schema, chunk_size, progress, start_row, end_row):
+        yield piece.decode("utf-8")
+
+
+def iter_insert_sql_bytes(schema: TableSchema, chunk_size: int = STREAM_CHUNK_SIZE, progress: Optional[Callable[[int], None]] = None,
+                          start_row: int = 0, end_row: Optional[int] = None, max_rows: Optional[int] = None,
+                          max_bytes: Optional[int] = None) -> Iterator[bytes]:
+    """iter_insert_sql encoded as UTF-8, without decoding the chunks the workers already encoded
+
+    Workers start a new statement every max_rows rows; statements that would still grow past max_bytes are
+    split here, at the last row that fits.
+    """
+    if end_row is None:
+        end_row = schema.rows
+    if end_row <= start_row:
+        return
+    if max_rows is None:
+        max_rows = INSERT_MAX_ROWS
+    if max_bytes is None:
+        max_bytes = INSERT_MAX_BYTES
     
-    # Start INSERT statement
-    sql_parts = [f"INSERT INTO {table_name} ("]
+    table_name = build_table_name(schema.catalog, schema.schema, schema.table_name)
+    header = _build_insert_header(table_name, [col.name for col in schema.columns])
+    encoder = InsertValuesEncoder(first_row_index=start_row, header=header, statement_rows=max_rows)
+    pieces = iter_encoded_chunks(schema, encoder, chunk_size, progress, start_row, end_row)
+    yield (header + "\n").encode("utf-8")
+    if max_bytes:
+        pieces = _split_statements(pieces, (header + "\n").encode("utf-8"), max_bytes)
+    yield from pieces
+    yield b"\n;"
+
+
+def _split_statements(pieces: Iterator[bytes], header: bytes, max_bytes: int) -> Iterator[bytes]:
+    """Starts a new statement wherever the current one would grow past max_bytes, header and ";" included
+
+    Chunks are passed through as they are unless they have to be split.
+    """
+    statement_break = STATEMENT_BREAK.encode("utf-8")
+    row_separator = ROW_SEPARATOR.encode("utf-8")
+    size = len(header)  # Bytes of the statement still open
+    try:
+        for piece in pieces:
+            splits, size = _statement_splits(piece, size, len(header), max_bytes)
+            if not splits:
+                yield piece
+                continue
+            position = 0
+            for split in splits:
+                if split > position:
+                    yield piece[position:split]
+                yield statement_break + header
+                position = split + len(row_separator)
+            if position < len(piece):
+                yield piece[position:]
+    finally:
+        close = getattr(pieces, "close", None)
+        if close is not None:
+            close()
+
+
+def _statement_splits(piece: bytes, size: int, header_size: int, max_bytes: int) -> Tuple[List[int], int]:
+    """Row separators of piece where a new statement has to start, and the size of the statement left open after it"""
+    statement_break = STATEMENT_BREAK.encode("utf-8")
+    row_separator = ROW_SEPARATOR.encode("utf-8")
+    end_size = len(b"\n;")
+    if size + len(piece) + end_size <= max_bytes and statement_break not in piece:
+        return [], size + len(piece)
     
-    # Add column names with proper formatting
-    for i, col_name in enumerate(column_names):
-        indent = "    "
-        col_line = f"{indent}{col_name}"
-        if i < len(column_names) - 1:
-            col_line += ","
-        sql_parts.append(col_line)
+    splits = []
+    position = 0
+    while True:
+        # Rows up to the next statement the workers started belong to the open statement
+        next_break = piece.find(statement_break, position)
+        rows_end = next_break if next_break >= 0 else len(piece)
+        while size + rows_end - position + end_size > max_bytes:
+            # The last row separator that keeps the statement within max_bytes
+            window_end = min(position + max_bytes - size - end_size + len(row_separator), rows_end)
+            split = piece.rfind(row_separator, position, window_end) if window_end > position else -1
+            if split < 0:
+                # Not even one more row fits; a statement still gets at least one row
+                split = piece.find(row_separator, position if size > header_size else position + 1, rows_end)
+                if split < 0:
+                    break
+            splits.append(split)
+            size = header_size
+            position = split + len(row_separator)
+        if next_break < 0:
+            return splits, size + len(piece) - position
+        position = next_break + len(statement_break) + header_size
+        size = header_size
+
+
+def iter_ndjson(schema: TableSchema, chunk_size: int = STREAM_CHUNK_SIZE, progress: Optional[Callable[[int], None]] = None,
+                start_row: int = 0, end_row: Optional[int] = None) -> Iterator[str]:
+    """Yields generated rows as newline-delimited JSON objects, one chunk of rows at a time"""
+    for piece in iter_ndjson_bytes(schema, chunk_size, progress, start_row, end_row):
+        yield piece.decode("utf-8")
+
+
+def iter_ndjson_bytes(schema: TableSchema, chunk_size: int = STREAM_CHUNK_SIZE, progress: Optional[Callable[[int], None]] = None,
+                      start_row: int = 0, end_row: Optional[int] = None) -> Iterator[bytes]:
+    """iter_ndjson encoded as UTF-8"""
+    encoder = NDJSONEncoder(column_names=tuple(col.name for col in schema.columns))
+    return iter_encoded_chunks(schema, encoder, chunk_size, progress, start_row, end_row)
+
+
+def iter_encoded_chunks(schema: TableSchema, encoder: ChunkEncoder, chunk_size: int = STREAM_CHUNK_SIZE,
+                        progress: Optional[Callable[[int], None]] = None, start_row: int = 0,
+                        end_row: Optional[int] = None) -> Iterator[bytes]:
+    """Yields generated rows already encoded by encoder, one buffer per chunk in row order
+
+    On the worker pool each chunk is encoded where it is generated and comes back as one shared memory
+    buffer, so no per-cell Python objects are pickled back to this process.
+    """
+    if end_row is None:
+        end_row = schema.rows
+    if end_row <= start_row:
+        return
     
-    sql_parts.append(")")
-    sql_parts.append("VALUES")
+    plan = compile_plan(schema)
+    schedule = schedule_rows(schema, plan, end_row - start_row, chunk_size, encoder.row_format, encoder)
+    if schedule.parallel:
+        pieces = _iter_encoded_multiprocessing(start_row, end_row, plan, schedule.chunk_rows, encoder)
+    else:
+        pieces = _iter_encoded_sequential(start_row, end_row, plan, schedule.chunk_rows, encoder)
     
-    # Initialize primary key starting values
-    primary_key_starts: Dict[str, int] = {}
-    for col in schema.columns:
-        if col.primary_key:
-            primary_key_starts[col.name] = 1  # Start from 1 for primary keys
+    for chunk_end, data in pieces:
+        yield data
+        if progress is not None:
+            progress(chunk_end - start_row)
+
+
+def iter_row_chunks(schema: TableSchema, chunk_size: int = STREAM_CHUNK_SIZE, row_format: str = "sql",
+                    progress: Optional[Callable[[int], None]] = None, start_row: int = 0,
+                    end_row: Optional[int] = None) -> Iterator[RowChunk]:
+    """Yields generated rows in row order, at most chunk_size rows at a time
+
+    With a seeded schema any [start_row, end_row) range comes out identical to the same rows of a full run.
+    progress, when given, is called with the number of rows handed out so far after each chunk is consumed.
+    """
+    if end_row is None:
+        end_row = schema.rows
+    if end_row <= start_row:
+        return
     
-    # Use multiprocessing for large datasets (≥1000 rows), sequential for small ones
-    # Multiprocessing provides significant performance benefits for CPU-intensive fake data generation
-    MULTIPROCESSING_THRESHOLD = 1000
+    # Resolve every column to its generator once for the whole request
+    plan = compile_plan(schema)
     
-    if schema.rows >= MULTIPROCESSING_THRESHOLD:
-        # Use multiprocessing for large datasets - bypasses GIL for better CPU utilization
-        row_results = _generate_rows_multiprocessing(schema.rows, schema.columns, primary_key_starts)
+    # The worker pool bypasses the GIL but costs a round trip per chunk; the measured cost of the rows decides
+    schedule = schedule_rows(schema, plan, end_row - start_row, chunk_size, row_format)
+    if schedule.parallel:
+        chunks = _iter_chunks_multiprocessing(start_row, end_row, plan, schedule.chunk_rows, row_format)
     else:
-        # Use sequential processing for small datasets to avoid multiprocessing overhead
-        row_results = _generate_rows_sequential(schema.rows, schema.columns, primary_key_starts)
+        chunks = _iter_chunks_sequential(start_row, end_row, plan, schedule.chunk_rows, row_format)
     
-    # Sort results by row index to maintain proper order
-    row_results.sort(key=lambda x: x[0])
+    for chunk in chunks:
+        yield chunk
+        if progress is not None:
+            progress(chunk[-1][0] + 1 - start_row)
+
+
+@contextmanager
+def _generator_pool() -> Iterator[GeneratorPool]:
+    """Reuse the app-wide pool when it is running, otherwise start one just for this request"""
+    shared_pool = get_shared_pool()
+    pool = shared_pool if shared_pool is not None else GeneratorPool().start()
+    try:
+        yield pool
+    finally:
+        if pool is not shared_pool:
+            pool.shutdown()
+
+
+def schedule_rows(schema: TableSchema, plan: GenerationPlan, rows: int, chunk_size: int = STREAM_CHUNK_SIZE,
+                  row_format: str = "sql", encoder: Optional[ChunkEncoder] = None) -> Schedule:
+    """Whether rows of a schema are generated here or on the worker pool, and in chunks of how many rows
+
+    chunk_size caps the rows held in memory per chunk. Requests of MULTIPROCESSING_THRESHOLD rows or more are
+    scheduled from the measured cost of the schema's rows, calibrated once per schema shape.
+    """
+    shared_pool = get_shared_pool()
+    processes = shared_pool.processes if shared_pool is not None else mp.cpu_count()
+    chunks_per_worker = shared_pool.chunks_per_worker if shared_pool is not None else DEFAULT_CHUNKS_PER_WORKER
+    if not ADAPTIVE_SCHEDULING:
+        return fixed_schedule(rows, processes, chunks_per_worker, chunk_size, SEED_BLOCK_SIZE, MULTIPROCESSING_THRESHOLD)
     
-    # Format row results into SQL
-    for i, (row_index, row_values) in enumerate(row_results):
-        # Format row values with proper indentation
-        row_sql = f"    ({', '.join(row_values)})"
-        
-        # Add comma if not last row
-        if i < len(row_results) - 1:
-            row_sql += ","
-        
-        sql_parts.append(row_sql)
+    # Workers beyond the CPU count only take turns, so a single CPU gains nothing from the pool
+    processes = min(processes, mp.cpu_count())
+    if rows < MULTIPROCESSING_THRESHOLD or processes < 2:
+        return Schedule(parallel=False, workers=1, chunk_rows=chunk_size)
     
-    sql_parts.append(";")
-    return "\n".join(sql_parts)
+    cost = _row_cost(schema, plan, row_format, encoder)
+    schedule = choose_schedule(rows, cost, processes, chunks_per_worker, chunk_size, SEED_BLOCK_SIZE,
+                               pool_running=shared_pool is not None)
+    registry.increment("schedules_total", help_text="Generation requests scheduled from calibrated row costs, by mode",
+                       mode="parallel" if schedule.parallel else "sequential")
+    return schedule
 
-def _generate_rows_multiprocessing(total_rows: int, columns: List, primary_key_starts: Dict[str, int]) -> List[Tuple[int, List[str]]]:
-    """Generate rows using multiprocessing for better CPU utilization"""
-    try:
-        # Determine optimal chunk size and number of processes
-        cpu_count = mp.cpu_count()
-        chunk_size = max(1000, total_rows // (cpu_count * 2))  # At least 1000 rows per chunk
+
+def _row_cost(schema: TableSchema, plan: GenerationPlan, row_format: str = "sql",
+              encoder: Optional[ChunkEncoder] = None) -> RowCost:
+    """Measured cost of one row of the schema, calibrated on first use of its shape in this process"""
+    shape = _schema_shape(schema, plan, row_format, encoder)
+    cost = calibration_cache.get(shape)
+    if cost is None:
+        cost = _calibrate(plan, row_format, encoder)
+        calibration_cache.put(shape, cost)
+    return cost
+
+
+def _schema_shape(schema: TableSchema, plan: GenerationPlan, row_format: str, encoder: Optional[ChunkEncoder]) -> Tuple:
+    """What the cost of a row depends on: every column's generator, type and options, and how rows are output"""
+    columns = tuple(
+        (column_plan.kind, column_plan.column.type, column_plan.nullable, column_plan.column.value_mode,
+         column_plan.column.unique, column_plan.column.cardinality, (column_plan.column.distribution or {}).get("type"))
+        for column_plan in plan.columns
+    )
+    # Columns sample from value pools only when the table is larger than a pool, and call Faker per cell otherwise
+    pooled = schema.rows > DEFAULT_POOL_SIZE
+    return columns, pooled, row_format, type(encoder).__name__ if encoder is not None else None
+
+
+def _calibrate(plan: GenerationPlan, row_format: str, encoder: Optional[ChunkEncoder]) -> RowCost:
+    """Time CALIBRATION_ROWS rows through the plan's generators (and the encoder), and receiving them from a worker"""
+    # Stats recorded so far belong to real generation; the calibration rows' own stats are discarded below
+    registry.add_column_stats(column_stats.drain())
+    with registry.span("calibration"):
+        faker_instance = get_worker_faker()
+        # A first row builds the value pools and domains the columns draw from, which the timed rows must not pay for
+        plan.render_rows(faker_instance, 0, 1, row_format)
         
-        # Create chunks for multiprocessing
-        chunks = []
-        for start_row in range(0, total_rows, chunk_size):
-            end_row = min(start_row + chunk_size, total_rows)
-            chunks.append((start_row, end_row, columns, primary_key_starts))
+        started = time.perf_counter()
+        chunk = plan.render_rows(faker_instance, 0, CALIBRATION_ROWS, row_format)
+        data = encoder(chunk) if encoder is not None else None
+        generate_seconds = (time.perf_counter() - started) / CALIBRATION_ROWS
         
-        # Process chunks in parallel
-        row_results = []
-        with mp.Pool(processes=cpu_count) as pool:
-            chunk_results = pool.map(generate_row_chunk, chunks)
+        # Rendered rows come back from a worker pickled; encoded chunks come back as one buffer to copy
+        pickled = pickle.dumps(chunk, pickle.HIGHEST_PROTOCOL) if data is None else None
+        started = time.perf_counter()
+        if pickled is not None:
+            pickle.loads(pickled)
+        else:
+            bytes(memoryview(data))
+        transfer_seconds = (time.perf_counter() - started) / CALIBRATION_ROWS
+    column_stats.drain()
+    return RowCost(generate_seconds=generate_seconds, transfer_seconds=transfer_seconds)
+
+
+def _pool_chunk_ranges(start_row: int, end_row: int, chunk_rows: int) -> Iterator[Tuple[int, int]]:
+    """[start, end) row ranges of the chunks a pool generates"""
+    for chunk_start in range(start_row, end_row, chunk_rows):
+        yield chunk_start, min(chunk_start + chunk_rows, end_row)
+
+
+def _iter_chunks_multiprocessing(start_row: int, end_row: int, plan: GenerationPlan, chunk_size: int, row_format: str) -> Iterator[RowChunk]:
+    """Generate row chunks of chunk_size rows (a multiple of SEED_BLOCK_SIZE) over [start_row, end_row) on the
+    warm worker pool, in row order"""
+    next_row = start_row
+    try:
+        with _generator_pool() as pool:
+            tasks = (
+                (chunk_start, chunk_end, plan, row_format)
+                for chunk_start, chunk_end in _pool_chunk_ranges(start_row, end_row, chunk_size)
+            )
             
-            # Flatten the results
-            for chunk_result in chunk_results:
-                row_results.extend(chunk_result)
-        
-        return row_results
+            # imap hands back chunks in submission order, so no sorting is needed
+            for chunk, worker_stats in pool.imap(generate_row_chunk, tasks):
+                registry.add_column_stats(worker_stats)
+                next_row = chunk[-1][0] + 1
+                yield chunk
     
     except Exception as e:
-        # Fallback to sequential processing if multiprocessing fails
+        # Fallback to sequential processing for the rows not yet produced if multiprocessing fails
         print(f"Warning: Multiprocessing failed ({e}), falling back to sequential processing")
-        return _generate_rows_sequential(total_rows, columns, primary_key_starts)
+        yield from _iter_chunks_sequential(next_row, end_row, plan, chunk_size, row_format)
 
-def _generate_rows_sequential(total_rows: int, columns: List, primary_key_starts: Dict[str, int]) -> List[Tuple[int, List[str]]]:
-    """Generate rows sequentially for small datasets"""
-    # Initialize primary key counters
-    primary_key_counters: Dict[str, int] = primary_key_starts.copy()
-    
-    row_results = []
-    for row_index in range(total_rows):
-        row_values = []
-        
-        # Generate value for each column
-        for col in columns:
-            if col.primary_key:
-                # Generate incremental value for primary key
-                value = generate_primary_key_value(col.type, primary_key_counters[col.name])
-                primary_key_counters[col.name] += 1
-            else:
-                # Generate random value for non-primary key columns
-                value = generate_random_value(col.name, col.type, col.nullable)
-            row_values.append(value)
-        
-        row_results.append((row_index, row_values))
+
+def _iter_encoded_multiprocessing(start_row: int, end_row: int, plan: GenerationPlan, chunk_size: int,
+                                  encoder: ChunkEncoder) -> Iterator[Tuple[int, bytes]]:
+    """Generate and encode chunks on the worker pool, yielding (chunk end row, encoded bytes) in row order"""
+    next_row = start_row
+    try:
+        with _generator_pool() as pool:
+            tasks = (
+                (chunk_start, chunk_end, plan, encoder)
+                for chunk_start, chunk_end in _pool_chunk_ranges(start_row, end_row, chunk_size)
+            )
+            # Chunks still in flight when the consumer stops are drained so their segments are freed
+            results = pool.imap(generate_encoded_chunk, tasks, discard=_discard_encoded_chunk)
+            try:
+                for chunk_end, published, worker_stats, encode_seconds in results:
+                    data = collect_chunk(published)
+                    registry.add_column_stats(worker_stats)
+                    registry.record_stage(encoder.stage, encode_seconds)
+                    next_row = chunk_end
+                    yield chunk_end, data
+            finally:
+                results.close()
     
-    return row_results
+    except Exception as e:
+        # Fallback to sequential processing for the rows not yet produced if multiprocessing fails
+        print(f"Warning: Multiprocessing failed ({e}), falling back to sequential processing")
+        yield from _iter_encoded_sequential(next_row, end_row, plan, chunk_size, encoder)
 
 
-def generate_primary_key_value(column_type: str, counter: int) -> str:
-    """Creates incremental values for primary key columns"""
-    if "STRING" in column_type or "VARCHAR" in column_type:
-        # For string primary keys, create a pattern like "ID_001", "ID_002", etc.
-        return f"'ID_{counter:03d}'"
-    else:
-        # For all integer types (BIGINT, INT, SMALLINT, TINYINT) and others, use incremental numbers
-        return str(counter)
+def _iter_encoded_sequential(start_row: int, end_row: int, plan: GenerationPlan, chunk_size: int,
+                             encoder: ChunkEncoder) -> Iterator[Tuple[int, bytes]]:
+    """Generate and encode chunks in the current process"""
+    for chunk in _iter_chunks_sequential(start_row, end_row, plan, chunk_size, encoder.row_format):
+        with registry.span(encoder.stage):
+            data = encoder(chunk)
+        yield chunk[-1][0] + 1, data
 
 
-def generate_random_value(column_name: str, column_type: str, nullable: bool) -> str:
-    """Creates random data based on column type using faker"""
-    # Sometimes generate NULL for nullable columns (10% chance)
-    if nullable and random.random() < 0.1:
-        return "NULL"
-    
-    # Handle different data types with realistic data
-    if "BIGINT" in column_type:
-        return str(fake.random_int(min=-9223372036854775808, max=9223372036854775807))
-    
-    elif "INT" in column_type:
-        return str(fake.random_int(min=-2147483648, max=2147483647))
-    
-    elif "SMALLINT" in column_type:
-        return str(fake.random_int(min=0, max=32767))
-    
-    elif "TINYINT" in column_type:
-        return str(fake.random_int(min=0, max=255))
-    
-    elif "STRING" in column_type or "VARCHAR" in column_type:
-        # Generate contextual fake data based on column name
-        return f"'{generate_contextual_value(column_name)}'"
-    
-    elif "BOOLEAN" in column_type:
-        return str(fake.boolean()).lower()
-    
-    elif "TIMESTAMP" in column_type:
-        # Generate random timestamp within the last 2 years
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=730)  # 2 years ago
-        random_time = fake.date_time_between(start_date=start_date, end_date=end_date)
-        return f"'{random_time.strftime('%Y-%m-%d %H:%M:%S')}'"
-    
-    elif "DATE" in column_type:
-        # Generate random date within the last 2 years
-        end_date = datetime.now().date()
-        start_date = end_date - timedelta(days=730)  # 2 years ago
-        random_date = fake.date_between(start_date=start_date, end_date=end_date)
-        return f"'{random_date.strftime('%Y-%m-%d')}'"
-    
-    elif "DECIMAL" in column_type:
-        # Generate realistic decimal values (e.g., for prices, percentages)
-        return f"{fake.pyfloat(min_value=0.01, max_value=9999.99, right_digits=2)}"
-    
-    elif "DOUBLE" in column_type or "FLOAT" in column_type:
-        return f"{fake.pyfloat(min_value=0.0001, max_value=99999.9999, right_digits=4)}"
-    
-    else:
-        # Default to realistic string data for unknown types
-        return f"'{fake.word()}'"
+def _discard_encoded_chunk(result: Tuple[int, PublishedChunk, ColumnStats, float]) -> None:
+    discard_chunk(result[1])
 
 
-def generate_contextual_value(column_name: str) -> str:
-    """Creates contextual fake data based on column name patterns"""
-    lower_name = column_name.lower()
+def _iter_chunks_sequential(start_row: int, end_row: int, plan: GenerationPlan, chunk_size: int, row_format: str) -> Iterator[RowChunk]:
+    """Generate row chunks sequentially in the current process"""
+    for chunk_start in range(start_row, end_row, chunk_size):
+        yield _generate_rows_sequential(chunk_start, min(chunk_start + chunk_size, end_row), plan, row_format)
+
+
+def _generate_rows_sequential(start_row: int, end_row: int, plan: GenerationPlan, row_format: str = "sql") -> RowChunk:
+    """Generate rows sequentially for small datasets"""
+    chunk = plan.render_rows(get_worker_faker(), start_row, end_row, row_format)
+    registry.add_column_stats(column_stats.drain())
+    return chunk
+
+
+def _primary_key_starts(columns: List) -> Dict[str, int]:
+    """Initialize primary key starting values"""
+    primary_key_starts: Dict[str, int] = {}
+    for col in columns:
+        if col.primary_key:
+            primary_key_starts[col.name] = PRIMARY_KEY_START
+    return primary_key_starts
+
+
+def _build_insert_header(table_name: str, column_names: List[str]) -> str:
+    """Builds the INSERT INTO ... VALUES header with one column per line"""
+    sql_parts = [f"INSERT INTO {table_name} ("]
     
-    # Generate contextual data based on common column name patterns
-    if "email" in lower_name:
-        return fake.email()
-    elif "phone" in lower_name:
-        return fake.phone_number()
-    elif "address" in lower_name:
-        return fake.address().replace('\n', ', ')
-    elif "city" in lower_name:
-        return fake.city()
-    elif "state" in lower_name:
-        return fake.state()
-    elif "country" in lower_name:
-        return fake.country()
-    elif "zip" in lower_name or "postal" in lower_name:
-        return fake.zipcode()
-    elif "first" in lower_name and "name" in lower_name:
-        return fake.first_name()
-    elif "last" in lower_name and "name" in lower_name:
-        return fake.last_name()
-    elif "name" in lower_name or "username" in lower_name:
-        return fake.user_name()
-    elif "company" in lower_name:
-        return fake.company()
-    elif "job" in lower_name or "title" in lower_name:
-        return fake.job()
-    elif "description" in lower_name:
-        return fake.sentence(nb_words=random.randint(5, 15))
-    elif "url" in lower_name or "website" in lower_name:
-        return fake.url()
-    elif "uuid" in lower_name or "guid" in lower_name:
-        return str(fake.uuid4())
-    elif "price" in lower_name or "cost" in lower_name:
-        return f"{fake.pyfloat(min_value=1.00, max_value=999.99, right_digits=2)}"
-    elif "product" in lower_name:
-        products = ["Laptop", "Smartphone", "Headphones", "Tablet", "Monitor", "Keyboard", "Mouse", "Speaker", "Camera", "Watch"]
-        return fake.random_element(products)
-    elif "category" in lower_name:
-        categories = ["Electronics", "Clothing", "Books", "Home & Garden", "Sports", "Automotive", "Health", "Beauty", "Food", "Toys"]
-        return fake.random_element(categories)
-    elif "color" in lower_name:
-        return fake.color_name()
-    elif "status" in lower_name:
-        statuses = ["active", "inactive", "pending", "completed", "cancelled"]
-        return fake.random_element(statuses)
-    else:
-        # Fallback to varied realistic data
-        options = [
-            fake.first_name(),
-            fake.last_name(),
-            fake.company(),
-            fake.job(),
-            fake.city(),
-            fake.word(),
-            fake.sentence(nb_words=random.randint(3, 8)),
-        ]
-        return fake.random_element(options) 
\ No newline at end of file
+    # Add column names with proper formatting
+    for i, col_name in enumerate(column_names):
+        indent = "    "
+        col_line = f"{indent}{col_name}"
+        if i < len(column_names) - 1:
+            col_line += ","
+        sql_parts.append(col_line)
+    
+    sql_parts.append(")")
+    sql_parts.append("VALUES")
+    return "\n".join(sql_parts)
@@ -0,0 +1,147 @@
+from typing import Callable, Dict, Iterator, List, Optional, Set
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import os
+import zlib
+import numpy as np
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlgen import ForeignKey, TableSchema, build_table_name, parse_column_type
+from data_generator import PRIMARY_KEY_START, STREAM_CHUNK_SIZE, append_row_offset, generate_insert_sql, iter_insert_sql
+from metrics import registry
+
+# Tables of a dataset generated at the same time; each one still spreads its chunks over the worker pool
+DEFAULT_MAX_PARALLEL_TABLES = int(os.getenv("DATASET_MAX_PARALLEL_TABLES", "2"))
+
+
+@dataclass
+class DatasetSchema:
+    """Several tables generated together, linked by foreign key references"""
+    tables: List[TableSchema]
+    seed: Optional[int] = None  # Dataset-wide seed; each table without its own seed derives one from it
+
+    def table(self, table_name: str) -> TableSchema:
+        for table in self.tables:
+            if table.table_name == table_name:
+                return table
+        raise ValueError(f"Unknown table '{table_name}'")
+
+    def parents(self, table: TableSchema) -> Set[str]:
+        """Names of the other tables this table references"""
+        return {col.references.split(".", 1)[0] for col in table.columns if col.references} - {table.table_name}
+
+    def resolve(self) -> "DatasetSchema":
+        """Validate the references, resolve them to parent key ranges and derive per-table seeds"""
+        table_names = [table.table_name for table in self.tables]
+        duplicates = sorted({name for name in table_names if table_names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate table names: {', '.join(duplicates)}")
+
+        for table in self.tables:
+            table.foreign_keys = {
+                col.name: self._resolve_reference(table, col.name, col.references, col.type)
+                for col in table.columns if col.references
+            }
+            if table.seed is None and self.seed is not None:
+                # Tables get distinct seeds so same-position columns of different tables do not repeat each other
+                table.seed = int(np.random.SeedSequence([self.seed, zlib.crc32(table.table_name.encode())]).generate_state(1, dtype=np.uint64)[0])
+
+        # Fails on reference cycles
+        self.generation_levels()
+        return self
+
+    def generation_levels(self) -> List[List[TableSchema]]:
+        """Tables grouped so every table comes after the tables it references; tables in a level are independent"""
+        remaining = {table.table_name: self.parents(table) for table in self.tables}
+        levels = []
+        while remaining:
+            ready = [name for name, parents in remaining.items() if not parents]
+            if not ready:
+                raise ValueError(f"Tables reference each other in a cycle: {', '.join(sorted(remaining))}")
+            levels.append([self.table(name) for name in ready])
+            for name in ready:
+                del remaining[name]
+            for parents in remaining.values():
+                parents.difference_update(ready)
+        return levels
+
+    def fingerprint(self) -> str:
+        """Stable hash of every table definition, seeds included; equal fingerprints generate the same data"""
+        definition = json.dumps([asdict(table) for table in self.tables], sort_keys=True)
+        return hashlib.sha256(definition.encode()).hexdigest()
+
+    def ordered_tables(self) -> List[TableSchema]:
+        """Tables in generation order, parents before the tables that reference them"""
+        return [table for level in self.generation_levels() for table in level]
+
+    def _resolve_reference(self, table: TableSchema, column_name: str, reference: str, column_type: str) -> ForeignKey:
+        parent_name, _, parent_column_name = reference.partition(".")
+        if not parent_name or not parent_column_name:
+            raise ValueError(f"Column {table.table_name}.{column_name}: references must look like table.column")
+
+        parent = next((candidate for candidate in self.tables if candidate.table_name == parent_name), None)
+        if parent is None:
+            raise ValueError(f"Column {table.table_name}.{column_name} references unknown table '{parent_name}'")
+        parent_column = next((col for col in parent.columns if col.name == parent_column_name), None)
+        if parent_column is None:
+            raise ValueError(f"Column {table.table_name}.{column_name} references unknown column '{reference}'")
+        if not parent_column.primary_key:
+            raise ValueError(f"Column {table.table_name}.{column_name} must reference a primary key column, '{reference}' is not one")
+        if append_row_offset(parent) + parent.rows <= 0:
+            raise ValueError(f"Column {table.table_name}.{column_name} references '{parent_name}', which has no rows")
+
+        string_keys = parse_column_type(parent_column.type).name == "STRING"
+        if string_keys != (parse_column_type(column_type).name == "STRING"):
+            raise ValueError(f"Column {table.table_name}.{column_name} must have the same kind of type as '{reference}'")
+
+        return ForeignKey(
+            table_name=build_table_name(parent.catalog, parent.schema, parent.table_name),
+            column=parent_column_name,
+            start=PRIMARY_KEY_START,
+            # Rows appended to a table can reference its existing keys as well as the new ones
+            rows=append_row_offset(parent) + parent.rows,
+            string_keys=string_keys,
+        )
+
+
+def run_dataset(dataset: DatasetSchema, generate_table: Callable[[TableSchema], None],
+                max_parallel: int = DEFAULT_MAX_PARALLEL_TABLES) -> None:
+    """Run generate_table for every table as a DAG: a table starts once the tables it references are done,
+    and independent tables run concurrently. The first failure is raised once running tables finish."""
+    remaining = {table.table_name: dataset.parents(table) for table in dataset.tables}
+    with ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="dataset") as executor:
+        running: Dict = {}
+        while remaining or running:
+            ready = [name for name, parents in remaining.items() if not parents]
+            for name in ready:
+                running[executor.submit(generate_table, dataset.table(name))] = name
+                del remaining[name]
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                finished_name = running.pop(future)
+                future.result()
+                for parents in remaining.values():
+                    parents.discard(finished_name)
+
+
+@registry.timed("create_table_sql")
+def generate_dataset_create_sql(dataset: DatasetSchema) -> List[str]:
+    """CREATE TABLE statements in generation order"""
+    return [table.generate_create_table_sql() for table in dataset.ordered_tables()]
+
+
+def generate_dataset_insert_sql(dataset: DatasetSchema) -> str:
+    """Preview INSERT statements of every table, in generation order"""
+    return "\n\n".join(generate_insert_sql(table) for table in dataset.ordered_tables())
+
+
+def iter_dataset_insert_sql(dataset: DatasetSchema, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[str]:
+    """Yields the full INSERT statements of every table one after the other, parents first"""
+    for index, table in enumerate(dataset.ordered_tables()):
+        if index:
+            yield "\n\n"
+        yield from iter_insert_sql(table, chunk_size)
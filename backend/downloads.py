@@ -0,0 +1,195 @@
+from typing import BinaryIO, Iterator, Optional, Tuple
+from email.utils import formatdate
+from urllib.parse import quote
+import os
+import re
+import uuid
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+
+from writers import COMPRESSION_SUFFIXES, compress_stream
+from metrics import registry
+
+# Size of the pieces files are read and sent in
+READ_CHUNK_SIZE = 1024 * 1024
+
+# The single byte range form resumed downloads ask for: "bytes=start-end", "bytes=start-" or "bytes=-suffix"
+RANGE_PATTERN = re.compile(r"^\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*$")
+
+
+class RangeNotSatisfiable(Exception):
+    """The requested byte range starts past the end of the file"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """[start, end] (inclusive) of a Range header, or None to send the whole file
+
+    Headers that are malformed or ask for several ranges are ignored, which HTTP allows.
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header)
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # The last N bytes
+        suffix = int(last)
+        if suffix == 0:
+            raise RangeNotSatisfiable()
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if end < start:
+        return None
+    return start, end
+
+
+def file_response(request: Request, path: str, media_type: str, filename: str, etag: Optional[str] = None) -> Response:
+    """Send a file as an attachment with its Content-Length, answering Range requests with the part asked for
+
+    The ETag identifies the file's contents, so a client resuming a download with If-Range gets the whole file
+    again when it changed in between. The file is opened before the response is returned, so it can be deleted
+    any time after without cutting the download short; FileNotFoundError is raised when it is already gone.
+    """
+    source = open(path, "rb")
+    stat = os.fstat(source.fileno())
+    size = stat.st_size
+    etag = etag or _etag(stat)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Content-Disposition": content_disposition(filename),
+    }
+
+    if_range = request.headers.get("if-range")
+    try:
+        byte_range = parse_range(request.headers.get("range"), size) if if_range in (None, etag) else None
+    except RangeNotSatisfiable:
+        source.close()
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        _count_download(media_type, partial=False)
+        return StreamingResponse(iter_file(source), media_type=media_type, headers={**headers, "Content-Length": str(size)})
+    start, end = byte_range
+    _count_download(media_type, partial=True)
+    return StreamingResponse(
+        iter_file(source, start, end + 1 - start),
+        status_code=206,
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(end + 1 - start), "Content-Range": f"bytes {start}-{end}/{size}"},
+    )
+
+
+async def compressed_file_response(request: Request, path: str, compression: str, filename: str) -> Response:
+    """Send a gzip or zstd copy of a file, compressing it on the fly the first time it is asked for
+
+    The first full download streams as it is compressed (without a Content-Length, which is not known yet) and
+    keeps the result next to the file. Later downloads, and any request for a byte range, are served from that
+    copy, with Content-Length and ranges; a range asked for before the copy exists waits for it to be written.
+    Compression is deterministic, so both forms share one ETag and a download started on the fly can be resumed.
+    """
+    suffix, media_type = COMPRESSION_SUFFIXES[compression]
+    compressed_path = f"{path}.{suffix}"
+    source = open(path, "rb")
+    # Derived from the original file, so the streamed form and the copy share it
+    etag = _etag(os.fstat(source.fileno()), f"-{compression}")
+    filename = f"{filename}.{suffix}"
+
+    if os.path.exists(compressed_path):
+        source.close()
+    else:
+        if request.headers.get("range") is None:
+            _count_download(media_type, partial=False)
+            return StreamingResponse(
+                _compress_to(source, compressed_path, compression),
+                media_type=media_type,
+                headers={
+                    "Accept-Ranges": "bytes",
+                    "ETag": etag,
+                    "Content-Disposition": content_disposition(filename),
+                },
+            )
+        await run_in_threadpool(_write_compressed, source, compressed_path, compression)
+
+    return file_response(request, compressed_path, media_type, filename, etag)
+
+
+def iter_file(source: BinaryIO, start: int = 0, length: Optional[int] = None) -> Iterator[bytes]:
+    """Read length bytes of an open file from start (to the end by default) in pieces, closing it when done; the
+    file stays readable if it is deleted while being sent"""
+    with source:
+        source.seek(start)
+        remaining = length
+        while remaining is None or remaining > 0:
+            piece = source.read(READ_CHUNK_SIZE if remaining is None else min(READ_CHUNK_SIZE, remaining))
+            if not piece:
+                return
+            if remaining is not None:
+                remaining -= len(piece)
+            yield piece
+
+
+def _etag(stat: os.stat_result, suffix: str = "") -> str:
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}{suffix}"'
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
+def _compress_to(source: BinaryIO, compressed_path: str, compression: str) -> Iterator[bytes]:
+    """Compress an open file piece by piece, yielding each piece and writing the copy once every piece was sent"""
+    partial_path = f"{compressed_path}.{uuid.uuid4().hex}.partial"
+    completed = False
+    try:
+        with open(partial_path, "wb") as partial_file:
+            for piece in compress_stream(iter_file(source), compression):
+                partial_file.write(piece)
+                yield piece
+        completed = True
+    finally:
+        if completed:
+            _publish(partial_path, compressed_path)
+        else:
+            # Client gone part way: the copy is incomplete
+            _remove(partial_path)
+
+
+def _write_compressed(source: BinaryIO, compressed_path: str, compression: str) -> None:
+    for _ in _compress_to(source, compressed_path, compression):
+        pass
+
+
+def _publish(partial_path: str, compressed_path: str) -> None:
+    # Concurrent first downloads each write a copy; they are identical, so the last rename wins harmlessly
+    try:
+        os.replace(partial_path, compressed_path)
+    except OSError:
+        # The job's output was deleted meanwhile
+        _remove(partial_path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _count_download(media_type: str, partial: bool) -> None:
+    registry.increment("downloads_total", help_text="Generated files sent, by media type and whether a byte range was asked for",
+                       media_type=media_type, partial=str(partial).lower())
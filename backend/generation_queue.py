@@ -0,0 +1,178 @@
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, TypeVar, Union
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+
+# Default limits for heavy generation work
+DEFAULT_MAX_CONCURRENT = 2  # Generation jobs running at the same time
+DEFAULT_MAX_QUEUED = 8  # Jobs allowed to wait for a free slot before new ones are rejected
+
+# Seconds between client disconnect checks while a job waits or runs
+DISCONNECT_POLL_INTERVAL = 0.5
+
+T = TypeVar("T")
+
+
+class QueueFullError(Exception):
+    """Raised when the admission queue has no room for another generation job"""
+
+
+class GenerationCancelled(Exception):
+    """Raised when a generation job is abandoned because its client disconnected"""
+
+
+def collect_until_cancelled(pieces: Iterator[str], cancel_event: threading.Event) -> str:
+    """Join generated pieces, stopping between chunks once cancel_event is set"""
+    parts = []
+    try:
+        for piece in pieces:
+            if cancel_event.is_set():
+                raise GenerationCancelled("Generation cancelled")
+            parts.append(piece)
+    finally:
+        pieces.close()
+    return "".join(parts)
+
+
+class GenerationQueue:
+    """Runs CPU-bound generation on its own thread executor behind a bounded admission queue"""
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT, max_queued: int = DEFAULT_MAX_QUEUED):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="generation")
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._admitted = 0  # Jobs running or waiting for a slot
+        self._running = 0
+
+    async def run(self, func: Callable[[threading.Event], T], is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> T:
+        """Run func(cancel_event) on the generation executor, cancelling it if the client disconnects"""
+        self._admit()
+        return await self._run_admitted(func, is_disconnected)
+
+    def submit(self, func: Callable[[threading.Event], T], is_cancelled: Optional[Callable[[], Awaitable[bool]]] = None) -> "asyncio.Task[T]":
+        """Admit a background job now and run it as a task, cancelling it once is_cancelled returns True"""
+        self._admit()
+        return asyncio.create_task(self._run_admitted(func, is_cancelled))
+
+    async def _run_admitted(self, func: Callable[[threading.Event], T], is_disconnected: Optional[Callable[[], Awaitable[bool]]]) -> T:
+        try:
+            await self._acquire_slot(is_disconnected)
+            try:
+                cancel_event = threading.Event()
+                future = asyncio.get_running_loop().run_in_executor(self.executor, func, cancel_event)
+                while True:
+                    done, _ = await asyncio.wait({future}, timeout=DISCONNECT_POLL_INTERVAL)
+                    if done:
+                        return future.result()
+                    if is_disconnected is not None and await is_disconnected():
+                        # Stop the worker thread between chunks and wait for it so the slot is really free
+                        cancel_event.set()
+                        await asyncio.wait({future})
+                        future.exception()  # The worker's own GenerationCancelled is expected here
+                        raise GenerationCancelled("Client disconnected")
+            finally:
+                self._release_slot()
+        finally:
+            self._admitted -= 1
+
+    def stream(self, iterator: Iterator[Union[str, bytes]]) -> "AdmittedStream":
+        """Admit a streaming job now and return an async iterator that pulls each chunk on the generation executor
+
+        The admission is given back when the stream finishes, or when it is closed or dropped before its first
+        chunk was asked for (the client left, or the response was never sent).
+        """
+        self._admit()
+        return AdmittedStream(self, iterator)
+
+    async def _stream(self, iterator: Iterator[Union[str, bytes]]) -> AsyncIterator[Union[str, bytes]]:
+        try:
+            await self._acquire_slot()
+            loop = asyncio.get_running_loop()
+            pending = None
+            try:
+                while True:
+                    pending = loop.run_in_executor(self.executor, next, iterator, None)
+                    piece = await pending
+                    pending = None
+                    if piece is None:
+                        return
+                    yield piece
+            finally:
+                # When the client disconnects the response task is cancelled mid-chunk; let that chunk
+                # finish before closing the generator so the rows not yet generated are never produced
+                if pending is not None:
+                    await asyncio.wait({pending})
+                await loop.run_in_executor(self.executor, iterator.close)
+                self._release_slot()
+        finally:
+            self._admitted -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "running": self._running,
+            "queued": self._admitted - self._running,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+        }
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _admit(self) -> None:
+        if self._admitted >= self.max_concurrent + self.max_queued:
+            raise QueueFullError("Generation queue is full, try again later")
+        self._admitted += 1
+
+    async def _acquire_slot(self, is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None) -> None:
+        """Wait for a free slot, giving up if the client disconnects while queued"""
+        while True:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=DISCONNECT_POLL_INTERVAL)
+                break
+            except asyncio.TimeoutError:
+                if is_disconnected is not None and await is_disconnected():
+                    raise GenerationCancelled("Client disconnected while queued")
+        self._running += 1
+
+    def _release_slot(self) -> None:
+        self._running -= 1
+        self._slots.release()
+
+
+class AdmittedStream:
+    """Chunks of a streaming job admitted to a GenerationQueue; generation starts with the first chunk asked for"""
+
+    def __init__(self, queue: GenerationQueue, iterator: Iterator[Union[str, bytes]]):
+        self._queue = queue
+        self._iterator = iterator
+        self._chunks: Optional[AsyncIterator[Union[str, bytes]]] = None
+        self._abandoned = False
+
+    def __aiter__(self) -> "AdmittedStream":
+        return self
+
+    async def __anext__(self) -> Union[str, bytes]:
+        if self._chunks is None:
+            if self._abandoned:
+                raise StopAsyncIteration
+            # Once started, the stream gives its admission back itself when it ends
+            self._chunks = self._queue._stream(self._iterator)
+        return await self._chunks.__anext__()
+
+    async def aclose(self) -> None:
+        if self._chunks is not None:
+            await self._chunks.aclose()
+        else:
+            self._abandon()
+
+    def __del__(self):
+        if self._chunks is None:
+            self._abandon()
+
+    def _abandon(self) -> None:
+        if self._abandoned:
+            return
+        self._abandoned = True
+        self._queue._admitted -= 1
+        self._iterator.close()
@@ -0,0 +1,288 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlgen import TableSchema
+from datasets import DatasetSchema, run_dataset
+from generation_queue import GenerationCancelled, GenerationQueue
+from result_cache import ResultCache, cache_key
+
+logger = logging.getLogger(__name__)
+
+# Directory generated job output is written to
+DEFAULT_OUTPUT_DIR = os.getenv("JOBS_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "data-generator-jobs"))
+
+# Finished jobs kept (with their output files) before the oldest is deleted
+DEFAULT_MAX_RETAINED = int(os.getenv("JOBS_MAX_RETAINED", "50"))
+
+# Job lifecycle states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# States whose output a request for the same data can share
+REUSABLE_STATES = (JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED)
+
+# Encodes a schema's output piece by piece, calling progress(rows_done) after each chunk
+JobWriter = Callable[[TableSchema, Callable[[int], None]], Iterator[bytes]]
+
+
+@dataclass
+class TableOutput:
+    """One table of a job and the file its rows are written to"""
+    schema: TableSchema
+    output_path: str
+    rows_done: int = 0
+
+    def record_progress(self, rows_done: int) -> None:
+        self.rows_done = rows_done
+
+    def output_bytes(self) -> int:
+        try:
+            return os.path.getsize(self.output_path)
+        except OSError:
+            return 0
+
+
+@dataclass
+class GenerationJob:
+    """A background generation run writing one output file per table to local disk"""
+    job_id: str
+    dataset: DatasetSchema
+    tables: List[TableOutput]
+    format: str
+    compression: str
+    output_dir: str
+    status: str = JOB_QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    cancel_requested: bool = False
+    cache_key: Optional[Tuple] = None  # Set for seeded datasets; jobs with equal keys write the same files
+
+    @property
+    def rows_done(self) -> int:
+        return sum(table.rows_done for table in self.tables)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(table.schema.rows for table in self.tables)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def table(self, table_name: Optional[str] = None) -> Optional[TableOutput]:
+        """The output of table_name, or of the only table when no name is given"""
+        if table_name is None:
+            return self.tables[0] if len(self.tables) == 1 else None
+        return next((table for table in self.tables if table.schema.table_name == table_name), None)
+
+    def rows_per_second(self) -> Optional[float]:
+        if self.started_at is None:
+            return None
+        elapsed = (self.finished_at or time.time()) - self.started_at
+        return self.rows_done / elapsed if elapsed > 0 else None
+
+    def eta_seconds(self) -> Optional[float]:
+        if self.status == JOB_COMPLETED:
+            return 0.0
+        rate = self.rows_per_second()
+        if self.finished or not rate:
+            return None
+        return (self.total_rows - self.rows_done) / rate
+
+    def to_status(self) -> Dict:
+        rate = self.rows_per_second()
+        eta = self.eta_seconds()
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "format": self.format,
+            "compression": self.compression,
+            "rows_done": self.rows_done,
+            "total_rows": self.total_rows,
+            "rows_per_second": round(rate, 1) if rate is not None else None,
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "output_bytes": sum(table.output_bytes() for table in self.tables),
+            "error": self.error,
+            "tables": [
+                {
+                    "table_name": table.schema.table_name,
+                    "rows_done": table.rows_done,
+                    "total_rows": table.schema.rows,
+                    "output_bytes": table.output_bytes(),
+                }
+                for table in self.tables
+            ],
+        }
+
+
+class JobManager:
+    """Runs generation jobs in the background through the generation queue and tracks their progress"""
+
+    def __init__(self, generation_queue: GenerationQueue, output_dir: str = DEFAULT_OUTPUT_DIR,
+                 max_retained: int = DEFAULT_MAX_RETAINED, result_cache: Optional[ResultCache] = None):
+        self.generation_queue = generation_queue
+        self.result_cache = result_cache
+        self.output_dir = output_dir
+        self.max_retained = max_retained
+        self._jobs: "OrderedDict[str, GenerationJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def submit(self, dataset: DatasetSchema, output_format: str, compression: str, writer: JobWriter, extension: str) -> GenerationJob:
+        """Queue a job and return it immediately; raises QueueFullError when the generation queue is full
+
+        A seeded dataset already queued, running or completed in the same format is not generated again:
+        the existing job is returned instead.
+        """
+        cache_key = self._cache_key(dataset, output_format, compression)
+        cached = self._find_cached(cache_key)
+        if cached is not None:
+            # Reused jobs are evicted last
+            self._jobs.move_to_end(cached.job_id)
+            return cached
+
+        job_id = uuid.uuid4().hex
+        job_dir = os.path.join(self.output_dir, job_id)
+        job = GenerationJob(
+            job_id=job_id,
+            dataset=dataset,
+            tables=[
+                TableOutput(table, os.path.join(job_dir, f"{table.table_name}.{extension}"))
+                for table in dataset.ordered_tables()
+            ],
+            format=output_format,
+            compression=compression,
+            output_dir=job_dir,
+            cache_key=cache_key,
+        )
+
+        task = self.generation_queue.submit(lambda cancel_event: self._generate(job, writer, cancel_event), self._cancel_check(job))
+        task.add_done_callback(lambda finished_task: self._on_task_done(job, finished_task))
+
+        self._jobs[job_id] = job
+        self._tasks[job_id] = task
+        self._evict_finished()
+        return job
+
+    @staticmethod
+    def _cache_key(dataset: DatasetSchema, output_format: str, compression: str) -> Optional[Tuple]:
+        if any(table.seed is None for table in dataset.tables):
+            return None
+        # Seeded dates and timestamps count back from midnight UTC, so the same seed only repeats within a day
+        return dataset.fingerprint(), output_format, compression, datetime.now(timezone.utc).date().isoformat()
+
+    def _find_cached(self, cache_key: Optional[Tuple]) -> Optional[GenerationJob]:
+        if cache_key is None:
+            return None
+        for job in self._jobs.values():
+            if job.cache_key == cache_key and job.status in REUSABLE_STATES and not job.cancel_requested:
+                return job
+        return None
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[GenerationJob]:
+        """Ask a queued or running job to stop between chunks"""
+        job = self._jobs.get(job_id)
+        if job is not None and not job.finished:
+            job.cancel_requested = True
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        counts = {state: 0 for state in (JOB_QUEUED, JOB_RUNNING) + FINISHED_STATES}
+        for job in self._jobs.values():
+            counts[job.status] += 1
+        return counts
+
+    def shutdown(self) -> None:
+        """Cancel unfinished jobs and delete all job output; jobs only live as long as the process"""
+        for job in self._jobs.values():
+            job.cancel_requested = True
+            self._remove_output(job)
+        for task in self._tasks.values():
+            task.cancel()
+
+    def _generate(self, job: GenerationJob, writer: JobWriter, cancel_event: threading.Event) -> None:
+        """Runs on the generation executor: write every table's file chunk by chunk, following the table DAG"""
+        job.status = JOB_RUNNING
+        job.started_at = time.time()
+        os.makedirs(job.output_dir, exist_ok=True)
+        outputs = {table.schema.table_name: table for table in job.tables}
+
+        def write_table(schema: TableSchema) -> None:
+            output = outputs[schema.table_name]
+            pieces = self._table_pieces(job, schema, lambda: writer(schema, output.record_progress))
+            try:
+                with open(output.output_path, "wb") as output_file:
+                    for piece in pieces:
+                        if cancel_event.is_set() or job.cancel_requested:
+                            raise GenerationCancelled("Job cancelled")
+                        output_file.write(piece)
+            finally:
+                pieces.close()
+            output.rows_done = schema.rows
+
+        run_dataset(job.dataset, write_table)
+
+    def _table_pieces(self, job: GenerationJob, schema: TableSchema, generate: Callable[[], Iterator[bytes]]) -> Iterator[bytes]:
+        """A table's output from the result cache, or generated and added to it"""
+        if self.result_cache is None:
+            return generate()
+        key = cache_key(schema, job.format, job.compression)
+        cached = self.result_cache.open(key)
+        if cached is not None:
+            logger.info(f"Generation job {job.job_id}: {schema.table_name} served from the result cache")
+            return cached
+        return self.result_cache.store(key, generate())
+
+    @staticmethod
+    def _cancel_check(job: GenerationJob) -> Callable:
+        async def is_cancelled() -> bool:
+            return job.cancel_requested
+        return is_cancelled
+
+    def _on_task_done(self, job: GenerationJob, task: asyncio.Task) -> None:
+        self._tasks.pop(job.job_id, None)
+        job.finished_at = time.time()
+        if task.cancelled():
+            job.status = JOB_CANCELLED
+        elif isinstance(task.exception(), GenerationCancelled):
+            job.status = JOB_CANCELLED
+        elif task.exception() is not None:
+            logger.error(f"Generation job {job.job_id} failed: {task.exception()}")
+            job.status = JOB_FAILED
+            job.error = str(task.exception())
+        else:
+            job.status = JOB_COMPLETED
+
+        if job.status != JOB_COMPLETED:
+            self._remove_output(job)
+
+    def _evict_finished(self) -> None:
+        """Drop the oldest finished jobs and their output files beyond max_retained"""
+        finished = [job for job in self._jobs.values() if job.finished]
+        for job in finished[:max(len(finished) - self.max_retained, 0)]:
+            del self._jobs[job.job_id]
+            self._remove_output(job)
+
+    @staticmethod
+    def _remove_output(job: GenerationJob) -> None:
+        shutil.rmtree(job.output_dir, ignore_errors=True)
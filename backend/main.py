@@ -1,18 +1,43 @@
 import os
+import json
 import logging
+import threading
+from contextlib import asynccontextmanager
+from dataclasses import asdict
+from functools import partial
+from typing import List, Optional
 import yaml
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
-from databricks import sql
-from databricks.sdk.core import Config
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from sqlgen import TableSchema, Column
-from data_generator import generate_insert_sql, generate_full_insert_sql
+from sqlgen import TableSchema
+from schema_yaml import YAML_LOADER, parse_yaml_to_dataset, random_seed
+from data_generator import validate_row_ranges, warm_value_pools
+from datasets import DatasetSchema, generate_dataset_create_sql, generate_dataset_insert_sql, iter_dataset_insert_sql
+from generation_queue import (
+    DEFAULT_MAX_CONCURRENT,
+    DEFAULT_MAX_QUEUED,
+    GenerationCancelled,
+    GenerationQueue,
+    QueueFullError,
+    collect_until_cancelled,
+)
+from connection_pool import DEFAULT_IDLE_TIMEOUT, DEFAULT_MAX_SIZE, ConnectionPool
+from bulk_load import DEFAULT_BATCH_SIZE, LOAD_METHODS, DatabricksLoadConnection, iter_bulk_load
+from jobs import JOB_COMPLETED, GenerationJob, JobManager
+from result_cache import CACHE_ENABLED, ResultCache, cache_key
+from writers import COMPRESSION_SUFFIXES, get_writer, iter_output, output_file_info
+from downloads import compressed_file_response, file_response
+from worker_pool import DEFAULT_CHUNKS_PER_WORKER, get_shared_pool, start_shared_pool, shutdown_shared_pool
+from scheduler import calibration_cache
+from metrics import registry
+from profiling import ProfilingMiddleware, profile_store, summarize
 
 # --- Pydantic Models ---
 class SQLQueryRequest(BaseModel):
@@ -26,6 +51,19 @@ class SQLQueryResponse(BaseModel):
 class GenerateFromYAMLRequest(BaseModel):
     yaml_content: str
 
+class GenerateStreamRequest(BaseModel):
+    yaml_content: str
+    format: str = "sql"
+    compression: str = "none"
+
+class BulkLoadRequest(BaseModel):
+    yaml_content: str
+    method: str = "multirow"
+    batch_size: int = DEFAULT_BATCH_SIZE
+    staging_path: Optional[str] = None
+    create_table: bool = False
+    seed: Optional[int] = None  # Seeds YAML without its own seed, e.g. the seed a preview returned
+
 class GenerateFromYAMLResponse(BaseModel):
     success: bool
     create_sql: str = None
@@ -33,6 +71,52 @@ class GenerateFromYAMLResponse(BaseModel):
     full_insert_sql: str = None
     error: str = None
 
+class PreviewRequest(BaseModel):
+    yaml_content: str
+
+class PreviewResponse(BaseModel):
+    success: bool
+    create_sql: str = None
+    create_statements: List[str] = None
+    insert_sql: str = None
+    seed: Optional[int] = None  # Seed of tables the YAML leaves unseeded; pass it to /api/jobs to get the previewed data
+    error: str = None
+
+class CreateJobRequest(BaseModel):
+    yaml_content: str
+    format: str = "sql"
+    compression: str = "none"
+    seed: Optional[int] = None  # Used only when the YAML has no top-level seed
+
+class JobTableStatus(BaseModel):
+    table_name: str
+    rows_done: int
+    total_rows: int
+    output_bytes: int
+    result_url: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    format: str
+    compression: str
+    rows_done: int
+    total_rows: int
+    rows_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    output_bytes: int
+    error: Optional[str] = None
+    result_url: Optional[str] = None  # Only for single-table jobs; multi-table results are per table
+    tables: List[JobTableStatus]
+
+class CreateJobResponse(BaseModel):
+    success: bool
+    create_sql: str = None
+    create_statements: List[str] = None
+    insert_sql: str = None
+    job: Optional[JobStatusResponse] = None
+    error: str = None
+
 # --- Environment Check ---
 # assert os.getenv('DATABRICKS_WAREHOUSE_ID'), "DATABRICKS_WAREHOUSE_ID must be set in app.yaml."
 
@@ -43,26 +127,130 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Simple FastAPI + React App")
+# --- SQL Connection Pool ---
+def open_connection():
+    """Open a connection to the configured Databricks SQL warehouse."""
+    # The connector and the SDK take over a second to import, so they are only loaded once a connection is needed
+    from databricks import sql
+    from databricks.sdk.core import Config
+
+    cfg = Config()  # Pull environment variables for auth
+    return sql.connect(
+        server_hostname=cfg.host,
+        http_path=f"/sql/1.0/warehouses/{os.getenv('DATABRICKS_WAREHOUSE_ID')}",
+        credentials_provider=lambda: cfg.authenticate
+    )
+
+def broken_connection_errors():
+    """Connector errors after which a connection must not be reused"""
+    from databricks.sql.exc import InterfaceError, OperationalError
+    return (OperationalError, InterfaceError)
+
+def stale_session_errors():
+    """Connector errors raised before a statement ran on a connection that had gone stale"""
+    from databricks.sql.exc import CursorAlreadyClosedError, InterfaceError, SessionAlreadyClosedError
+    return (SessionAlreadyClosedError, CursorAlreadyClosedError, InterfaceError)
+
+# Connections are opened lazily on first use and reused across requests until the app shuts down
+connection_pool = ConnectionPool(
+    open_connection,
+    max_size=int(os.getenv("DATABRICKS_POOL_SIZE", str(DEFAULT_MAX_SIZE))),
+    idle_timeout=float(os.getenv("DATABRICKS_POOL_IDLE_TIMEOUT", str(DEFAULT_IDLE_TIMEOUT))),
+    discard_on=broken_connection_errors,
+    retry_on=stale_session_errors
+)
+
+# --- Generation Queue ---
+# Heavy generation runs on its own executor so the event loop, health checks and previews stay responsive
+generation_queue = GenerationQueue(
+    max_concurrent=int(os.getenv("GENERATION_MAX_CONCURRENT", str(DEFAULT_MAX_CONCURRENT))),
+    max_queued=int(os.getenv("GENERATION_MAX_QUEUED", str(DEFAULT_MAX_QUEUED)))
+)
+
+# --- Result Cache ---
+# Outputs of seeded schemas are kept by content address, so regenerating the same fixture is served from the cache
+result_cache = ResultCache() if CACHE_ENABLED else None
+
+# --- Generation Jobs ---
+# Long generations run as background jobs that write to local disk, so no request has to outlive a proxy timeout
+job_manager = JobManager(generation_queue, result_cache=result_cache)
+
+# --- App Lifespan ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the warm generator worker pool on startup; stop it and close pooled connections on shutdown"""
+    pool_size = int(os.getenv("GENERATOR_POOL_SIZE", "0")) or None  # Defaults to the CPU count
+    chunks_per_worker = int(os.getenv("GENERATOR_CHUNKS_PER_WORKER", str(DEFAULT_CHUNKS_PER_WORKER)))
+    pool = start_shared_pool(pool_size, chunks_per_worker)
+    logger.info(f"Generator pool started with {pool.processes} workers")
+    if os.getenv("VALUE_POOL_WARMUP", "true").lower() in ("1", "true", "yes"):
+        # Previews sample in this process; building its value pools in the background keeps them fast
+        threading.Thread(target=warm_value_pools, name="value-pool-warmup", daemon=True).start()
+    try:
+        yield
+    finally:
+        job_manager.shutdown()
+        if result_cache is not None:
+            result_cache.close()
+        generation_queue.shutdown()
+        shutdown_shared_pool()
+        connection_pool.close()
+        logger.info("Generator pool stopped and database connections closed")
+
+app = FastAPI(title="Simple FastAPI + React App", lifespan=lifespan)
+
+# Requests sent with an X-Profile: sample|cprofile header are profiled; see /api/metrics/profiles/{id}
+app.add_middleware(ProfilingMiddleware)
 
 # --- SQL Query Function ---
 def sqlQuery(query: str) -> bool:
-    """Execute a SQL DDL/DML query (CREATE TABLE, INSERT) and return success status."""
+    """Execute a SQL DDL/DML query (CREATE TABLE, INSERT) on a pooled connection and return success status."""
     try:
-        cfg = Config()  # Pull environment variables for auth
-        with sql.connect(
-            server_hostname=cfg.host,
-            http_path=f"/sql/1.0/warehouses/{os.getenv('DATABRICKS_WAREHOUSE_ID')}",
-            credentials_provider=lambda: cfg.authenticate
-        ) as connection:
-            with connection.cursor() as cursor:
-                cursor.execute(query)
-                # No need to fetch for DDL/DML operations
-                return True
+        with registry.span("databricks_execute"):
+            connection_pool.execute(query)
+        # No need to fetch for DDL/DML operations
+        return True
     except Exception as e:
+        registry.increment("databricks_errors_total", help_text="Failed Databricks statements")
         logger.error(f"SQL query failed: {str(e)}")
         raise e
 
+def sqlFetchOne(query: str) -> Optional[tuple]:
+    """Execute a SQL query on a pooled connection and return its first row, or None when it returns no rows."""
+    try:
+        with registry.span("databricks_execute"):
+            return connection_pool.fetch_one(query)
+    except Exception as e:
+        registry.increment("databricks_errors_total", help_text="Failed Databricks statements")
+        logger.error(f"SQL query failed: {str(e)}")
+        raise e
+
+async def read_watermarks(dataset: DatasetSchema) -> DatasetSchema:
+    """Fill in the append watermarks the YAML leaves out from the tables being appended to
+
+    References to those tables are resolved again, so child rows can point at the appended keys too.
+    """
+    tables = [table for table in dataset.tables if table.append is not None and table.append.needs_lookup(table)]
+    if not tables:
+        return dataset
+    for table in tables:
+        try:
+            row = await run_in_threadpool(sqlFetchOne, table.generate_watermark_sql())
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Could not read the append watermark of {table.table_name}: {str(e)}"
+            )
+        table.append = table.read_watermark(row)
+        try:
+            validate_row_ranges(table)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=str(e)
+            )
+    return dataset.resolve()
+
 # --- API Routes ---
 @app.get("/api/hello")
 async def hello():
@@ -74,12 +262,38 @@ async def health_check():
     logger.info("Health check at /api/health")
     return {"status": "healthy"}
 
+@app.get("/api/metrics")
+async def get_metrics() -> PlainTextResponse:
+    """Stage timings, per-column-kind generation counters and queue/pool gauges in the Prometheus text format"""
+    gauges = {}
+    for prefix, stats in (
+        ("generation_queue", generation_queue.stats()),
+        ("connection_pool", connection_pool.stats()),
+        ("jobs", job_manager.stats()),
+        ("result_cache", result_cache.stats() if result_cache is not None else {}),
+        ("generator_pool", get_shared_pool().stats() if get_shared_pool() is not None else {}),
+        ("calibration_cache", calibration_cache.stats()),
+    ):
+        gauges.update({f"{prefix}_{name}": value for name, value in stats.items()})
+    return PlainTextResponse(registry.render(gauges), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/metrics/profiles/{profile_id}")
+async def get_profile(profile_id: str):
+    """Summary of a profiled request; finished is false while its response is still being sent"""
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Profile {profile_id} not found"
+        )
+    return summarize(profile)
+
 
 
 @app.post("/api/execute-sql")
 async def execute_sql(request: SQLQueryRequest) -> SQLQueryResponse:
     """Execute SQL DDL/DML query (CREATE TABLE, INSERT) endpoint"""
-    
+
     try:
         # Validate query
         if not request.query or not isinstance(request.query, str):
@@ -87,14 +301,14 @@ async def execute_sql(request: SQLQueryRequest) -> SQLQueryResponse:
                 status_code=400,
                 detail="Query must be a non-empty string"
             )
-        
+
         query = request.query.strip()
         if not query:
             raise HTTPException(
                 status_code=400,
                 detail="Query cannot be empty"
             )
-        
+
         # Log query type for monitoring
         query_upper = query.upper().strip()
         if query_upper.startswith('CREATE'):
@@ -103,70 +317,83 @@ async def execute_sql(request: SQLQueryRequest) -> SQLQueryResponse:
             operation_type = "INSERT"
         else:
             operation_type = "DDL/DML"
-        
-        
-        # Execute the query
-        sqlQuery(query)
-        
+
+
+        # Execute the query on the threadpool so the blocking connector doesn't stall the event loop
+        await run_in_threadpool(sqlQuery, query)
+
         return SQLQueryResponse(
             success=True,
             message=f"{operation_type} operation completed successfully"
         )
-        
+
     except HTTPException:
         # Re-raise HTTPExceptions as-is
         raise
     except Exception as e:
         error_msg = f"SQL query execution failed: {str(e)}"
         logger.error(error_msg)
-        
+
         return SQLQueryResponse(
             success=False,
             message="Query execution failed",
             error=error_msg
         )
 
+@app.post("/api/preview")
+async def preview(request: PreviewRequest) -> PreviewResponse:
+    """Return CREATE TABLE SQL and a few sample rows without generating the full data
+
+    The full data is generated by /api/jobs only when it is downloaded or executed. Unseeded YAML is pinned to a
+    random seed, returned in the response, so that job reproduces the previewed rows and is shared by later requests.
+    """
+    try:
+        seed = random_seed()
+        dataset = await read_watermarks(load_dataset_from_yaml(request.yaml_content, default_seed=seed))
+
+        create_statements = generate_dataset_create_sql(dataset)
+        insert_sql = await run_in_threadpool(generate_dataset_insert_sql, dataset)
+
+        return PreviewResponse(
+            success=True,
+            create_sql="\n\n".join(create_statements),
+            create_statements=create_statements,
+            insert_sql=insert_sql,
+            seed=seed
+        )
+
+    except HTTPException:
+        # Re-raise HTTPExceptions as-is
+        raise
+    except Exception as e:
+        error_msg = f"Preview failed: {str(e)}"
+        logger.error(error_msg)
+
+        return PreviewResponse(
+            success=False,
+            error=error_msg
+        )
+
 @app.post("/api/generate-from-yaml")
-async def generate_from_yaml(request: GenerateFromYAMLRequest) -> GenerateFromYAMLResponse:
+async def generate_from_yaml(request: GenerateFromYAMLRequest, http_request: Request) -> GenerateFromYAMLResponse:
     """Generate CREATE and INSERT SQL statements from YAML schema definition"""
     logger.info("YAML to SQL generation requested")
-    
+
     try:
-        # Validate YAML content
-        if not request.yaml_content or not isinstance(request.yaml_content, str):
-            raise HTTPException(
-                status_code=400,
-                detail="YAML content must be a non-empty string"
-            )
-        
-        yaml_content = request.yaml_content.strip()
-        if not yaml_content:
-            raise HTTPException(
-                status_code=400,
-                detail="YAML content cannot be empty"
-            )
-        
-        # Parse YAML
-        try:
-            yaml_data = yaml.safe_load(yaml_content)
-        except yaml.YAMLError as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid YAML format: {str(e)}"
-            )
-        
-        # Convert YAML to TableSchema
-        schema = parse_yaml_to_schema(yaml_data)
-        
-        # Generate CREATE TABLE SQL
-        create_sql = schema.generate_create_table_sql()
-        
-        # Generate INSERT SQL (limited for display)
-        insert_sql = generate_insert_sql(schema)
-        
-        # Generate full INSERT SQL (for execution)
-        full_insert_sql = generate_full_insert_sql(schema)
-        
+        dataset = await read_watermarks(load_dataset_from_yaml(request.yaml_content))
+
+        # Generate CREATE TABLE SQL, parent tables first
+        create_sql = "\n\n".join(generate_dataset_create_sql(dataset))
+
+        # Generate INSERT SQL (limited for display) on the shared threadpool, outside the generation queue
+        insert_sql = await run_in_threadpool(generate_dataset_insert_sql, dataset)
+
+        # Generate full INSERT SQL (for execution) on the generation queue; abandoned if the client disconnects
+        full_insert_sql = await generation_queue.run(
+            partial(collect_until_cancelled, iter_dataset_insert_sql(dataset)),
+            http_request.is_disconnected
+        )
+
         logger.info("SQL generation completed successfully")
         return GenerateFromYAMLResponse(
             success=True,
@@ -174,64 +401,307 @@ async def generate_from_yaml(request: GenerateFromYAMLRequest) -> GenerateFromYA
             insert_sql=insert_sql,
             full_insert_sql=full_insert_sql
         )
-        
+
     except HTTPException:
         # Re-raise HTTPExceptions as-is
         raise
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e)
+        )
+    except GenerationCancelled:
+        logger.info("SQL generation cancelled, client disconnected")
+        return GenerateFromYAMLResponse(
+            success=False,
+            error="Generation cancelled"
+        )
     except Exception as e:
         error_msg = f"SQL generation failed: {str(e)}"
         logger.error(error_msg)
-        
+
         return GenerateFromYAMLResponse(
             success=False,
             error=error_msg
         )
 
-def parse_yaml_to_schema(yaml_data) -> TableSchema:
-    """Convert YAML data to TableSchema object"""
-    if not isinstance(yaml_data, dict):
-        raise ValueError("YAML must contain a dictionary/object")
-    
-    # Extract required fields
-    table_name = yaml_data.get('table_name')
-    if not table_name:
-        raise ValueError("table_name is required")
-    
-    columns_data = yaml_data.get('columns', [])
-    if not columns_data:
-        raise ValueError("columns are required")
-    
-    # Convert columns
-    columns = []
-    for col_data in columns_data:
-        if not isinstance(col_data, dict):
-            raise ValueError("Each column must be a dictionary")
-        
-        name = col_data.get('name')
-        col_type = col_data.get('type')
-        
-        if not name or not col_type:
-            raise ValueError("Column name and type are required")
-        
-        column = Column(
-            name=name,
-            type=col_type,
-            nullable=col_data.get('nullable', True),
-            comment=col_data.get('comment'),
-            primary_key=col_data.get('primary_key', False)
-        )
-        columns.append(column)
-    
-    # Create TableSchema
-    schema = TableSchema(
-        table_name=table_name,
-        catalog=yaml_data.get('catalog', ''),
-        schema=yaml_data.get('schema', ''),
-        columns=columns,
-        rows=yaml_data.get('rows', 10)  # Default to 10 rows if not specified
+@app.post("/api/generate-from-yaml/stream")
+async def generate_from_yaml_stream(request: GenerateStreamRequest) -> StreamingResponse:
+    """Stream all generated rows as INSERT SQL, CSV, NDJSON or Parquet, chunk by chunk in row order"""
+    logger.info(f"Streaming {request.format} generation requested ({request.compression} compression)")
+
+    try:
+        extension, media_type = output_file_info(request.format, request.compression)
+        schema = load_schema_from_yaml(request.yaml_content)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    schema = (await read_watermarks(DatasetSchema(tables=[schema]))).tables[0]
+
+    # Cache hits are read back without taking a generation slot
+    key = cache_key(schema, request.format, request.compression) if result_cache is not None else None
+    cached = result_cache.open(key) if key is not None else None
+
+    # The writer encodes rows lazily, so memory is bounded by the chunk size rather than the row count
+    try:
+        if cached is not None:
+            body = cached
+        else:
+            pieces = iter_output(schema, request.format, request.compression)
+            body = generation_queue.stream(result_cache.store(key, pieces) if key is not None else pieces)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e)
+        )
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{schema.table_name}.{extension}"'}
     )
-    
-    return schema
+
+@app.post("/api/bulk-load")
+async def bulk_load(request: BulkLoadRequest) -> StreamingResponse:
+    """Generate rows on the backend and load them into Databricks in batches, streaming progress as NDJSON
+
+    Multi-table YAML is loaded table by table, parents first; each progress line names its table.
+    """
+    logger.info(f"Bulk load requested ({request.method}, batch size {request.batch_size})")
+
+    if request.method not in LOAD_METHODS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported load method '{request.method}', expected one of: {', '.join(LOAD_METHODS)}"
+        )
+    if request.batch_size <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail="batch_size must be positive"
+        )
+    if request.method == "copy_into" and not request.staging_path:
+        raise HTTPException(
+            status_code=400,
+            detail="staging_path is required for the copy_into load method"
+        )
+
+    try:
+        dataset = load_dataset_from_yaml(request.yaml_content, default_seed=request.seed)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    dataset = await read_watermarks(dataset)
+
+    def progress_stream():
+        try:
+            rows_loaded = 0
+            with connection_pool.connection() as pooled_connection:
+                connection = DatabricksLoadConnection(pooled_connection)
+                # Tables load one after the other, parents first, so foreign keys point at loaded rows
+                for schema in dataset.ordered_tables():
+                    table_rows = 0
+                    for progress in iter_bulk_load(schema, connection, request.method, request.batch_size,
+                                                   request.staging_path, request.create_table):
+                        table_rows = progress.rows_loaded
+                        yield json.dumps({"table_name": schema.table_name, **asdict(progress)}) + "\n"
+                    rows_loaded += table_rows
+            logger.info(f"Bulk load of {rows_loaded} rows completed successfully")
+            yield json.dumps({"success": True, "rows_loaded": rows_loaded}) + "\n"
+        except Exception as e:
+            error_msg = f"Bulk load failed: {str(e)}"
+            logger.error(error_msg)
+            yield json.dumps({"success": False, "error": error_msg}) + "\n"
+
+    try:
+        body = generation_queue.stream(progress_stream())
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e)
+        )
+    return StreamingResponse(body, media_type="application/x-ndjson")
+
+@app.post("/api/jobs")
+async def create_job(request: CreateJobRequest) -> CreateJobResponse:
+    """Start a background generation job and return its CREATE TABLE and preview SQL right away"""
+    logger.info(f"Generation job requested ({request.format}, {request.compression} compression)")
+
+    try:
+        extension, _ = output_file_info(request.format, request.compression)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+
+    try:
+        dataset = await read_watermarks(load_dataset_from_yaml(request.yaml_content, default_seed=request.seed))
+
+        create_statements = generate_dataset_create_sql(dataset)
+        insert_sql = await run_in_threadpool(generate_dataset_insert_sql, dataset)
+
+        # Tables are written to one file each; independent tables generate concurrently
+        job = job_manager.submit(
+            dataset,
+            request.format,
+            request.compression,
+            lambda job_schema, progress: iter_output(job_schema, request.format, request.compression, progress=progress),
+            extension
+        )
+
+        logger.info(f"Generation job {job.job_id} queued for {job.total_rows} rows in {len(job.tables)} tables")
+        return CreateJobResponse(
+            success=True,
+            create_sql="\n\n".join(create_statements),
+            create_statements=create_statements,
+            insert_sql=insert_sql,
+            job=job_status_response(job)
+        )
+
+    except HTTPException:
+        # Re-raise HTTPExceptions as-is
+        raise
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e)
+        )
+    except Exception as e:
+        error_msg = f"Generation job failed to start: {str(e)}"
+        logger.error(error_msg)
+
+        return CreateJobResponse(
+            success=False,
+            error=error_msg
+        )
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str) -> JobStatusResponse:
+    """Report a job's progress: rows done, rows per second and estimated seconds remaining"""
+    return job_status_response(find_job(job_id))
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str) -> JobStatusResponse:
+    """Ask a queued or running job to stop; its partial output is discarded"""
+    find_job(job_id)
+    return job_status_response(job_manager.cancel(job_id))
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str, request: Request, table: Optional[str] = None, compression: Optional[str] = None):
+    """Download the output file of a completed job; multi-table jobs need the table name
+
+    Byte ranges are supported so interrupted downloads can resume. compression=gzip or zstd sends a compressed
+    copy of an uncompressed output, made on the fly the first time it is asked for.
+    """
+    job = find_job(job_id)
+    if job.status != JOB_COMPLETED:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job {job_id} is {job.status}, its result is only available once completed"
+        )
+
+    output = job.table(table)
+    if output is None:
+        raise HTTPException(
+            status_code=404 if table else 400,
+            detail=f"Job {job_id} has no table '{table}'" if table else "table is required for multi-table jobs"
+        )
+
+    extension, media_type = output_file_info(job.format, job.compression)
+    filename = f"{output.schema.table_name}.{extension}"
+    if compression in (None, "none", job.compression):
+        try:
+            return file_response(request, output.output_path, media_type, filename)
+        except FileNotFoundError:
+            raise output_gone(job_id)
+
+    if compression not in COMPRESSION_SUFFIXES or job.compression != "none" or get_writer(job.format).compresses_internally:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Job {job_id} output ({job.format}, {job.compression} compression) cannot be sent with {compression} compression"
+        )
+    try:
+        get_writer(job.format, compression)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=str(e)
+        )
+    try:
+        return await compressed_file_response(request, output.output_path, compression, filename)
+    except FileNotFoundError:
+        raise output_gone(job_id)
+
+def output_gone(job_id: str) -> HTTPException:
+    """The job's output was evicted after the job was looked up"""
+    return HTTPException(
+        status_code=404,
+        detail=f"Job {job_id} not found"
+    )
+
+def find_job(job_id: str) -> GenerationJob:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job {job_id} not found"
+        )
+    return job
+
+def job_status_response(job: GenerationJob) -> JobStatusResponse:
+    status = job.to_status()
+    result_url = f"/api/jobs/{job.job_id}/result"
+    for table_status in status["tables"]:
+        table_status["result_url"] = f"{result_url}?table={table_status['table_name']}"
+    return JobStatusResponse(
+        **status,
+        result_url=result_url if len(job.tables) == 1 else None
+    )
+
+def load_schema_from_yaml(yaml_content: str) -> TableSchema:
+    """Validate and parse raw YAML content describing a single table into a TableSchema"""
+    dataset = load_dataset_from_yaml(yaml_content)
+    if len(dataset.tables) != 1:
+        raise ValueError("This endpoint generates a single table, use /api/jobs for multi-table YAML")
+    return dataset.tables[0]
+
+def load_dataset_from_yaml(yaml_content: str, default_seed: Optional[int] = None) -> DatasetSchema:
+    """Validate and parse raw YAML content into a DatasetSchema with its references resolved
+
+    default_seed seeds the dataset when the YAML does not set a top-level seed itself.
+    """
+    # Validate YAML content
+    if not yaml_content or not isinstance(yaml_content, str):
+        raise HTTPException(
+            status_code=400,
+            detail="YAML content must be a non-empty string"
+        )
+
+    yaml_content = yaml_content.strip()
+    if not yaml_content:
+        raise HTTPException(
+            status_code=400,
+            detail="YAML content cannot be empty"
+        )
+
+    with registry.span("yaml_parse"):
+        # Parse YAML
+        try:
+            yaml_data = yaml.load(yaml_content, Loader=YAML_LOADER)
+        except yaml.YAMLError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid YAML format: {str(e)}"
+            )
+
+        if default_seed is not None and isinstance(yaml_data, dict):
+            yaml_data.setdefault("seed", default_seed)
+
+        # Convert YAML to DatasetSchema
+        return parse_yaml_to_dataset(yaml_data)
 
 # --- Static Files Setup ---
 static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
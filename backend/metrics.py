@@ -0,0 +1,131 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+import threading
+import time
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "datagen"
+
+# Per-kind column totals: [rows, generate seconds, format seconds]
+ColumnStats = Dict[str, List[float]]
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Thread-safe counters exported in the Prometheus text format
+
+    Counters only ever grow; point-in-time values (queue depth, pool sizes) are passed to render() as gauges.
+    """
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, Labels], float] = defaultdict(float)
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, value: float = 1.0, help_text: str = "", **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] += value
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time a block of work as one call of a pipeline stage"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - started)
+
+    def timed(self, stage: str) -> Callable:
+        """Decorator form of span"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record_stage(self, stage: str, seconds: float, calls: int = 1) -> None:
+        self.increment("stage_seconds_total", seconds, "Seconds spent in each pipeline stage", stage=stage)
+        self.increment("stage_calls_total", calls, "Calls of each pipeline stage", stage=stage)
+
+    def add_column_stats(self, stats: ColumnStats) -> None:
+        """Fold per-kind column generation totals, from this process or a worker, into the counters"""
+        for kind, (rows, generate_seconds, format_seconds) in stats.items():
+            self.increment("column_rows_total", rows, "Column values generated, by column kind", kind=kind)
+            self.increment("column_generate_seconds_total", generate_seconds, "Seconds spent sampling column values, by column kind", kind=kind)
+            self.increment("column_format_seconds_total", format_seconds, "Seconds spent rendering column values, by column kind", kind=kind)
+
+    def snapshot(self) -> Dict[str, Dict[Labels, float]]:
+        with self._lock:
+            counters: Dict[str, Dict[Labels, float]] = defaultdict(dict)
+            for (name, labels), value in self._counters.items():
+                counters[name][labels] = value
+            return dict(counters)
+
+    def render(self, gauges: Optional[Dict[str, float]] = None) -> str:
+        """Counters and the given gauges in the Prometheus text exposition format"""
+        lines = []
+        for name, series in sorted(self.snapshot().items()):
+            full_name = f"{METRIC_PREFIX}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full_name} {self._help[name]}")
+            lines.append(f"# TYPE {full_name} counter")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+        for name, value in sorted((gauges or {}).items()):
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# TYPE {full_name} gauge")
+            lines.append(f"{full_name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class ColumnStatsBuffer:
+    """Per-process column generation totals not yet folded into a registry
+
+    Worker processes drain theirs into every chunk they return so the parent can count work done anywhere.
+    """
+
+    def __init__(self):
+        self._stats: ColumnStats = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, rows: int, generate_seconds: float = 0.0, format_seconds: float = 0.0) -> None:
+        with self._lock:
+            totals = self._stats.setdefault(kind, [0, 0.0, 0.0])
+            totals[0] += rows
+            totals[1] += generate_seconds
+            totals[2] += format_seconds
+
+    def drain(self) -> ColumnStats:
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        return stats
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{key}="{_escape_label(value)}"' for key, value in labels)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+# Registry of this process, exported by /api/metrics
+registry = MetricsRegistry()
+
+# Column totals of this process waiting to be folded into a registry
+column_stats = ColumnStatsBuffer()
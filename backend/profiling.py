@@ -0,0 +1,225 @@
+from typing import Dict, Optional
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import traceback
+import uuid
+
+# Request header that turns on profiling for one request, and the modes it accepts
+PROFILE_HEADER = "X-Profile"
+PROFILE_MODES = ("sample", "cprofile")
+
+# Profiling can be switched off entirely, e.g. on shared deployments
+PROFILING_ENABLED = os.getenv("REQUEST_PROFILING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Seconds between stack samples of the sampling profiler
+SAMPLE_INTERVAL = 0.005
+
+# Finished profiles kept for retrieval before the oldest is dropped
+MAX_PROFILES = 20
+
+# Lines of each summary (functions or stacks) reported
+SUMMARY_LIMIT = 30
+
+
+@dataclass
+class RequestProfile:
+    """Profile of one request, filled in once the response body has been sent"""
+    profile_id: str
+    mode: str
+    path: str
+    started_at: float = field(default_factory=time.time)
+    seconds: Optional[float] = None
+    summary: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.summary is not None
+
+
+class StackSampler:
+    """Samples the stacks of every thread at a fixed interval, so work on executor threads is profiled too
+
+    Worker processes are not sampled; their cost shows up as time waiting on the pool.
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._functions: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stop.set()
+        self._thread.join()
+        return self.summary()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            sampled_functions = set()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = tuple(f"{summary.name} ({os.path.basename(summary.filename)}:{summary.lineno})"
+                              for summary in traceback.extract_stack(frame))
+                # Idle threads (waiting on a lock or a queue) dominate otherwise
+                if not stack or _is_idle(stack[-1]):
+                    continue
+                self._stacks[stack[-4:]] += 1
+                sampled_functions.update(stack)
+            # Functions count once per sample, however many threads run them
+            self._functions.update(sampled_functions)
+
+    def summary(self) -> str:
+        lines = [f"{self.samples} samples every {self.interval * 1000:.0f} ms", "", "Functions on stack (% of samples):"]
+        for function, count in self._functions.most_common(SUMMARY_LIMIT):
+            lines.append(f"  {100 * count / max(self.samples, 1):6.1f}%  {function}")
+        lines += ["", "Hottest stacks (innermost last):"]
+        for stack, count in self._stacks.most_common(SUMMARY_LIMIT // 3):
+            lines.append(f"  {count} samples")
+            lines.extend(f"      {function}" for function in stack)
+        return "\n".join(lines)
+
+
+# Innermost frames of threads that are blocked rather than working, including multiprocessing.Pool's handler threads
+IDLE_FUNCTIONS = ("wait ", "_wait_for_tstate_lock ", "select ", "get ", "_recv ", "_handle_tasks ", "_handle_results ",
+                  "_handle_workers ")
+
+
+def _is_idle(function: str) -> bool:
+    return function.startswith(IDLE_FUNCTIONS)
+
+
+class ProfileStore:
+    """Profiles of recent requests, retrievable by id"""
+
+    def __init__(self, max_profiles: int = MAX_PROFILES):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, mode: str, path: str) -> RequestProfile:
+        profile = RequestProfile(profile_id=uuid.uuid4().hex, mode=mode, path=path)
+        with self._lock:
+            self._profiles[profile.profile_id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        return profile
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+# Held while a request is profiled with cProfile
+_cprofile_lock = threading.Lock()
+
+
+class RequestProfiler:
+    """Runs one profiler from the start of a request until its response body has been sent"""
+
+    def __init__(self, profile: RequestProfile):
+        self.profile = profile
+        self._started = time.perf_counter()
+        self._sampler: Optional[StackSampler] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        # cProfile only sees the thread it is enabled on, here the event loop, and only one can run there at a
+        # time; concurrent requests asking for it are sampled instead
+        if profile.mode == "cprofile" and _cprofile_lock.acquire(blocking=False):
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            profile.mode = "sample"
+            self._sampler = StackSampler()
+            self._sampler.start()
+
+    def finish(self) -> None:
+        if self.profile.finished:
+            return
+        if self._profiler is not None:
+            self._profiler.disable()
+            _cprofile_lock.release()
+            output = io.StringIO()
+            pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(SUMMARY_LIMIT)
+            summary = output.getvalue()
+        else:
+            summary = self._sampler.stop()
+        self.profile.seconds = round(time.perf_counter() - self._started, 4)
+        self.profile.summary = summary
+
+
+def profile_mode(header_value: Optional[str]) -> Optional[str]:
+    """Profiling mode requested by the profile header, or None when the request is not profiled"""
+    if not PROFILING_ENABLED or not header_value:
+        return None
+    mode = header_value.strip().lower()
+    if mode in ("1", "true", "yes"):
+        return "sample"
+    return mode if mode in PROFILE_MODES else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests that carry the profile header; other requests pass straight through
+
+    The response gets X-Profile-Id and X-Profile-Url headers; the summary is ready once the body has been sent,
+    so streamed responses are profiled until their last chunk.
+    """
+
+    def __init__(self, app, url_prefix: str = "/api/metrics/profiles"):
+        self.app = app
+        self.url_prefix = url_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        header_name = PROFILE_HEADER.lower().encode()
+        header_value = next((value.decode("latin-1") for name, value in scope["headers"] if name == header_name), None)
+        mode = profile_mode(header_value)
+        if mode is None:
+            return await self.app(scope, receive, send)
+
+        profile = profile_store.start(mode, scope["path"])
+        profiler = RequestProfiler(profile)
+
+        async def send_profiled(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile.profile_id.encode()),
+                    (b"x-profile-url", f"{self.url_prefix}/{profile.profile_id}".encode()),
+                ]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                profiler.finish()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            profiler.finish()
+
+
+def summarize(profile: RequestProfile) -> Dict:
+    return {
+        "profile_id": profile.profile_id,
+        "mode": profile.mode,
+        "path": profile.path,
+        "finished": profile.finished,
+        "seconds": profile.seconds,
+        "summary": profile.summary,
+    }
+
+
+# Profiles of this process, served by /api/metrics/profiles/{id}
+profile_store = ProfileStore()
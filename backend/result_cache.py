@@ -0,0 +1,256 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import datetime, timezone
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlgen import TableSchema
+from value_pools import DEFAULT_POOL_SIZE
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+# Generated outputs can be cached and served again instead of being regenerated
+CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Directory outputs spill to once they leave memory
+DEFAULT_CACHE_DIR = os.getenv("RESULT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "data-generator-cache"))
+
+# Bytes of outputs held in memory, and on disk, before the least recently used are evicted
+DEFAULT_MEMORY_BYTES = int(os.getenv("RESULT_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+DEFAULT_DISK_BYTES = int(os.getenv("RESULT_CACHE_DISK_BYTES", str(2 * 1024 * 1024 * 1024)))
+
+# Each process keeps its spilled outputs in its own directory under the cache directory, named after its pid
+PROCESS_DIR_PREFIX = "process-"
+
+# Outputs larger than this share of the memory budget go straight to disk
+MEMORY_ENTRY_SHARE = 4
+
+# Size of the pieces cached outputs are served in
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def cache_key(schema: TableSchema, output_format: str, compression: str) -> Optional[str]:
+    """Content address of a table's output: the parsed schema with its seed, the format and the day
+
+    Unseeded schemas generate different data every run and are not cached.
+    """
+    if schema.seed is None:
+        return None
+    definition = json.dumps({
+        "table": asdict(schema),
+        "format": output_format,
+        "compression": compression,
+        "value_pool_size": DEFAULT_POOL_SIZE,
+        # Seeded dates and timestamps count back from midnight UTC
+        "day": datetime.now(timezone.utc).date().isoformat(),
+    }, sort_keys=True)
+    return hashlib.sha256(definition.encode()).hexdigest()
+
+
+class ResultCache:
+    """Content-addressed cache of generated outputs
+
+    Recent outputs are held in memory up to a byte budget; the least recently used spill to files in a directory
+    of this process under the cache directory, which has its own budget. Entries only live as long as the process;
+    several processes (uvicorn workers, the CLI) share the cache directory without touching each other's files.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, memory_bytes: int = DEFAULT_MEMORY_BYTES,
+                 disk_bytes: int = DEFAULT_DISK_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        _remove_orphaned_directories(directory)
+        self.directory = tempfile.mkdtemp(prefix=f"{PROCESS_DIR_PREFIX}{os.getpid()}-", dir=directory)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._disk: "OrderedDict[str, int]" = OrderedDict()  # Sizes of the entries on disk
+        self._memory_used = 0
+        self._disk_used = 0
+        self._lock = threading.Lock()
+
+    def open(self, key: Optional[str]) -> Optional[Iterator[bytes]]:
+        """The cached output for key as a stream of pieces, or None on a miss"""
+        if key is None:
+            return None
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                return self._hit("memory", _iter_bytes(data))
+            if key in self._disk:
+                self._disk.move_to_end(key)
+                # Opened under the lock so a concurrent eviction cannot remove the file first; an open file
+                # stays readable after it is unlinked
+                return self._hit("disk", _iter_file(open(self._path(key), "rb")))
+            self.misses += 1
+        registry.increment("result_cache_requests_total", help_text="Result cache lookups, by outcome", result="miss")
+        return None
+
+    def store(self, key: Optional[str], pieces: Iterator[bytes]) -> Iterator[bytes]:
+        """Pass pieces through, caching the output once every piece has been read
+
+        Outputs abandoned part way (cancelled, client gone) are dropped.
+        """
+        if key is None:
+            yield from pieces
+            return
+        buffered: List[bytes] = []
+        buffered_size = 0
+        spill_file = None
+        spill_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex}.partial")
+        completed = False
+        try:
+            for piece in pieces:
+                if spill_file is None and buffered_size + len(piece) > self.memory_bytes // MEMORY_ENTRY_SHARE:
+                    # Too large for memory: keep writing it to disk instead
+                    spill_file = open(spill_path, "wb")
+                    spill_file.writelines(buffered)
+                    buffered = []
+                if spill_file is not None:
+                    spill_file.write(piece)
+                else:
+                    buffered.append(piece)
+                buffered_size += len(piece)
+                yield piece
+            completed = True
+        finally:
+            close = getattr(pieces, "close", None)
+            if close is not None:
+                close()
+            if spill_file is not None:
+                spill_file.close()
+                if completed:
+                    self._add_file(key, spill_path, buffered_size)
+                else:
+                    _remove(spill_path)
+            elif completed:
+                self._add_memory(key, b"".join(buffered))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_used,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            keys = list(self._disk)
+            self._memory.clear()
+            self._disk.clear()
+            self._memory_used = self._disk_used = 0
+        for key in keys:
+            _remove(self._path(key))
+
+    def close(self) -> None:
+        """Drop every entry and this process's cache directory"""
+        self.clear()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _hit(self, tier: str, pieces: Iterator[bytes]) -> Iterator[bytes]:
+        self.hits += 1
+        registry.increment("result_cache_requests_total", help_text="Result cache lookups, by outcome", result=f"{tier}_hit")
+        return pieces
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _add_memory(self, key: str, data: bytes) -> None:
+        spilled: List[Tuple[str, bytes]] = []
+        with self._lock:
+            if key in self._memory or key in self._disk:
+                return
+            self._memory[key] = data
+            self._memory_used += len(data)
+            while self._memory_used > self.memory_bytes:
+                evicted_key, evicted = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted)
+                spilled.append((evicted_key, evicted))
+        # Written outside the lock; the entry misses until its file is in place
+        for spilled_key, spilled_data in spilled:
+            spill_path = os.path.join(self.directory, f".{spilled_key}.{uuid.uuid4().hex}.partial")
+            try:
+                with open(spill_path, "wb") as spill_file:
+                    spill_file.write(spilled_data)
+            except OSError as e:
+                logger.warning(f"Could not spill cached output to disk: {e}")
+                _remove(spill_path)
+                continue
+            registry.increment("result_cache_spills_total", help_text="Cached outputs moved from memory to disk")
+            self._add_file(spilled_key, spill_path, len(spilled_data))
+
+    def _add_file(self, key: str, path: str, size: int) -> None:
+        evicted: List[str] = []
+        with self._lock:
+            if key in self._disk or key in self._memory or size > self.disk_bytes:
+                _remove(path)
+                return
+            os.replace(path, self._path(key))
+            self._disk[key] = size
+            self._disk_used += size
+            while self._disk_used > self.disk_bytes:
+                evicted_key, evicted_size = self._disk.popitem(last=False)
+                self._disk_used -= evicted_size
+                evicted.append(evicted_key)
+        for evicted_key in evicted:
+            registry.increment("result_cache_evictions_total", help_text="Cached outputs deleted from disk")
+            _remove(self._path(evicted_key))
+
+
+def _remove_orphaned_directories(directory: str) -> None:
+    """Delete the cache directories of processes that are no longer running, e.g. after a crash"""
+    for name in os.listdir(directory):
+        if not name.startswith(PROCESS_DIR_PREFIX):
+            continue
+        pid = name[len(PROCESS_DIR_PREFIX):].split("-", 1)[0]
+        if pid.isdigit() and not _is_running(int(pid)):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Running, but owned by another user
+        return True
+    return True
+
+
+def _iter_bytes(data: bytes) -> Iterator[bytes]:
+    view = memoryview(data)
+    for offset in range(0, len(data), READ_CHUNK_SIZE):
+        yield bytes(view[offset:offset + READ_CHUNK_SIZE])
+
+
+def _iter_file(cached_file) -> Iterator[bytes]:
+    with cached_file:
+        while True:
+            piece = cached_file.read(READ_CHUNK_SIZE)
+            if not piece:
+                return
+            yield piece
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
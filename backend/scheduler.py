@@ -0,0 +1,127 @@
+from typing import Dict, Hashable, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+import math
+import os
+import threading
+
+# Rows are generated in the web process or on the worker pool as the measured cost of the schema's rows says is
+# faster; when off, every request of at least MULTIPROCESSING_THRESHOLD rows goes to the pool in fixed chunks
+ADAPTIVE_SCHEDULING = os.getenv("ADAPTIVE_SCHEDULING", "true").lower() in ("1", "true", "yes")
+
+# Rows generated to measure the cost of a schema's rows
+CALIBRATION_ROWS = int(os.getenv("SCHEDULER_CALIBRATION_ROWS", "500"))
+
+# Calibrations each process keeps before the least recently used schema shape is measured again
+MAX_CALIBRATIONS = 256
+
+# Seconds the pool spends handing one chunk to a worker and its result back, besides the rows themselves
+TASK_OVERHEAD_SECONDS = 0.002
+
+# Seconds to start worker processes when no app-wide pool is running
+POOL_START_SECONDS = 0.5
+
+# Least work worth sending to a worker as one chunk, so the per-chunk overhead stays a few percent of it
+MIN_TASK_SECONDS = 0.05
+
+
+@dataclass(frozen=True)
+class RowCost:
+    """Measured seconds per row of a schema shape"""
+    generate_seconds: float  # Generating and rendering (and encoding, when chunks are encoded) one row
+    transfer_seconds: float  # Receiving one generated row from a worker in this process
+
+
+@dataclass(frozen=True)
+class Schedule:
+    """How a request's rows are generated"""
+    parallel: bool  # On the worker pool rather than in this process
+    workers: int  # Worker processes busy at once
+    chunk_rows: int  # Rows generated per chunk (per pool task when parallel)
+    estimated_seconds: Optional[float] = None  # Expected wall time, when the rows were calibrated
+
+
+def choose_schedule(rows: int, cost: RowCost, processes: int, chunks_per_worker: int, max_chunk_rows: int,
+                    block_rows: int, pool_running: bool = True) -> Schedule:
+    """The schedule expected to generate rows in the least wall time
+
+    Chunks sent to the pool cover at least MIN_TASK_SECONDS of work, as few rows as keep chunks_per_worker
+    chunks queued for every worker, and at most max_chunk_rows rows so memory stays bounded. The pool only pays
+    off when its workers' share of the work plus the overhead of the chunks (and of starting the pool) is less
+    than generating every row here; this process still receives every row, which bounds how fast it can go.
+    Chunks are whole multiples of block_rows, so no RNG block is drawn twice.
+    """
+    sequential_seconds = rows * cost.generate_seconds
+    sequential = Schedule(parallel=False, workers=1, chunk_rows=max_chunk_rows, estimated_seconds=sequential_seconds)
+    if processes < 2:
+        return sequential
+
+    min_chunk_rows = math.ceil(MIN_TASK_SECONDS / max(cost.generate_seconds, 1e-9))
+    chunk_rows = min(max(math.ceil(rows / (processes * chunks_per_worker)), min_chunk_rows), max_chunk_rows)
+    chunk_rows = _align(chunk_rows, block_rows)
+    tasks = math.ceil(rows / chunk_rows)
+    workers = min(processes, tasks)
+    if workers < 2:
+        return sequential
+
+    # Every worker runs its share of the chunks one after the other
+    worker_seconds = math.ceil(tasks / workers) * chunk_rows * cost.generate_seconds
+    parallel_seconds = (max(worker_seconds, rows * cost.transfer_seconds) + tasks * TASK_OVERHEAD_SECONDS
+                        + (0.0 if pool_running else POOL_START_SECONDS))
+    if parallel_seconds >= sequential_seconds:
+        return sequential
+    return Schedule(parallel=True, workers=workers, chunk_rows=chunk_rows, estimated_seconds=parallel_seconds)
+
+
+def fixed_schedule(rows: int, processes: int, chunks_per_worker: int, max_chunk_rows: int, block_rows: int,
+                   threshold: int) -> Schedule:
+    """The schedule used without calibration: the pool from threshold rows, split so every worker stays busy"""
+    if rows < threshold:
+        return Schedule(parallel=False, workers=1, chunk_rows=max_chunk_rows)
+    chunk_rows = _align(max(block_rows, min(max_chunk_rows, rows // (processes * chunks_per_worker))), block_rows)
+    return Schedule(parallel=True, workers=min(processes, math.ceil(rows / chunk_rows)), chunk_rows=chunk_rows)
+
+
+def _align(chunk_rows: int, block_rows: int) -> int:
+    return -(-chunk_rows // block_rows) * block_rows
+
+
+class CalibrationCache:
+    """LRU cache of measured row costs, keyed by schema shape: the column types and generators, not their names
+    or the seed, so every table built the same way shares one calibration"""
+
+    def __init__(self, max_entries: int = MAX_CALIBRATIONS):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._costs: "OrderedDict[Hashable, RowCost]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[RowCost]:
+        with self._lock:
+            cost = self._costs.get(key)
+            if cost is None:
+                self.misses += 1
+                return None
+            self._costs.move_to_end(key)
+            self.hits += 1
+            return cost
+
+    def put(self, key: Hashable, cost: RowCost) -> None:
+        with self._lock:
+            self._costs[key] = cost
+            self._costs.move_to_end(key)
+            while len(self._costs) > self.max_entries:
+                self._costs.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._costs), "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._costs.clear()
+
+
+# Row costs measured by this process
+calibration_cache = CalibrationCache()
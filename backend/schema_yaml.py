@@ -0,0 +1,370 @@
+from typing import Dict, Optional
+from datetime import date, datetime
+import os
+import secrets
+import yaml
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlgen import Column, ColumnType, TableSchema, Watermark, DISTRIBUTIONS, VALUE_MODES, parse_column_type
+from datasets import DatasetSchema
+from data_generator import validate_row_ranges, validate_unique_capacity
+from columnar import SEASONAL_CYCLES, value_bounds
+
+# The libyaml-backed loader is several times faster than the pure Python one; not every PyYAML build has it
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Parameters each distribution accepts besides its type
+DISTRIBUTION_PARAMETERS = {
+    "uniform": ("min", "max"),
+    "normal": ("mean", "stddev", "min", "max"),
+    "zipf": ("exponent", "min", "max"),
+    "categorical": ("values", "weights"),
+    "sequence": ("start", "step"),
+    "timeseries": ("start", "end", "seasonality", "amplitude", "trend"),
+}
+
+# Column types the numeric and time distributions apply to
+NUMERIC_TYPES = ("BIGINT", "INT", "SMALLINT", "TINYINT", "DECIMAL", "DOUBLE")
+TEMPORAL_TYPES = ("DATE", "TIMESTAMP")
+
+# Options of an append block
+APPEND_OPTIONS = ("max_key", "time_column", "max_time")
+
+# Bits of a randomly chosen seed, small enough to round-trip through a JavaScript number
+RANDOM_SEED_BITS = 48
+
+
+def load_dataset(yaml_content: str, seed: Optional[int] = None) -> DatasetSchema:
+    """Parse raw YAML text into a DatasetSchema, raising ValueError when it is invalid
+
+    seed, when given, replaces the top-level seed of the YAML.
+    """
+    try:
+        yaml_data = yaml.load(yaml_content, Loader=YAML_LOADER)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML format: {str(e)}")
+    if seed is not None and isinstance(yaml_data, dict):
+        yaml_data['seed'] = seed
+    return parse_yaml_to_dataset(yaml_data)
+
+
+def parse_yaml_to_dataset(yaml_data) -> DatasetSchema:
+    """Convert single-table YAML, or multi-table YAML with a tables list, to a DatasetSchema"""
+    if not isinstance(yaml_data, dict):
+        raise ValueError("YAML must contain a dictionary/object")
+    
+    if 'tables' not in yaml_data:
+        return DatasetSchema(tables=[parse_yaml_to_schema(yaml_data)]).resolve()
+    
+    tables_data = yaml_data.get('tables')
+    if not tables_data or not isinstance(tables_data, list):
+        raise ValueError("tables must be a non-empty list")
+    
+    # Top-level catalog and schema apply to every table that does not set its own
+    tables = [parse_yaml_to_schema(table_data, defaults=yaml_data) for table_data in tables_data]
+    return DatasetSchema(tables=tables, seed=parse_seed(yaml_data.get('seed'))).resolve()
+
+
+def random_seed() -> int:
+    """A fresh seed for pinning an unseeded schema, so later requests can generate the same data"""
+    return secrets.randbits(RANDOM_SEED_BITS)
+
+
+def parse_seed(seed) -> Optional[int]:
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        raise ValueError("seed must be a non-negative integer")
+    return seed
+
+
+def parse_yaml_to_schema(yaml_data, defaults: Optional[dict] = None) -> TableSchema:
+    """Convert YAML data to TableSchema object"""
+    if not isinstance(yaml_data, dict):
+        raise ValueError("YAML must contain a dictionary/object")
+    defaults = defaults or {}
+    
+    # Extract required fields
+    table_name = yaml_data.get('table_name')
+    if not table_name:
+        raise ValueError("table_name is required")
+    
+    columns_data = yaml_data.get('columns', [])
+    if not columns_data:
+        raise ValueError("columns are required")
+    
+    rows = yaml_data.get('rows', 10)  # Default to 10 rows if not specified
+    
+    # Convert columns
+    columns = []
+    for col_data in columns_data:
+        if not isinstance(col_data, dict):
+            raise ValueError("Each column must be a dictionary")
+        
+        name = col_data.get('name')
+        col_type = col_data.get('type')
+        
+        if not name or not col_type:
+            raise ValueError("Column name and type are required")
+        
+        value_mode = col_data.get('value_mode', 'pooled')
+        if value_mode not in VALUE_MODES:
+            raise ValueError(f"Column {name}: value_mode must be one of {', '.join(VALUE_MODES)}")
+        
+        references = col_data.get('references')
+        if references is not None and not isinstance(references, str):
+            raise ValueError(f"Column {name}: references must look like table.column")
+        
+        unique = col_data.get('unique', False)
+        if not isinstance(unique, bool):
+            raise ValueError(f"Column {name}: unique must be true or false")
+        
+        column = Column(
+            name=name,
+            type=col_type,
+            nullable=col_data.get('nullable', True),
+            comment=col_data.get('comment'),
+            primary_key=col_data.get('primary_key', False),
+            value_mode=value_mode,
+            references=references,
+            distribution=parse_distribution(name, parse_column_type(col_type), col_data.get('distribution')),
+            cardinality=col_data.get('cardinality'),
+            unique=unique
+        )
+        validate_value_shape(column)
+        validate_unique(column, rows)
+        columns.append(column)
+    
+    # Create TableSchema
+    schema = TableSchema(
+        table_name=table_name,
+        catalog=yaml_data.get('catalog', defaults.get('catalog', '')),
+        schema=yaml_data.get('schema', defaults.get('schema', '')),
+        columns=columns,
+        rows=rows,
+        seed=parse_seed(yaml_data.get('seed')),
+        append=parse_append(yaml_data.get('append'), columns)
+    )
+    if isinstance(rows, int):
+        validate_row_ranges(schema)
+    
+    return schema
+
+
+def parse_append(append, columns) -> Optional[Watermark]:
+    """Validate an append block: true to read the watermark from the table, or a mapping with any of
+    max_key, time_column and max_time (the ones left out are read from the table)
+
+    The time column defaults to the first TIMESTAMP column, or the first DATE column.
+    """
+    if append is None or append is False:
+        return None
+    if append is True:
+        append = {}
+    if not isinstance(append, dict):
+        raise ValueError(f"append must be true or a mapping with any of {', '.join(APPEND_OPTIONS)}")
+    unknown = sorted(set(append) - set(APPEND_OPTIONS))
+    if unknown:
+        raise ValueError(f"append does not take {', '.join(map(str, unknown))}, expected any of {', '.join(APPEND_OPTIONS)}")
+
+    max_key = append.get('max_key')
+    if max_key is not None:
+        if isinstance(max_key, bool) or not isinstance(max_key, int) or max_key < 0:
+            raise ValueError("append.max_key must be a non-negative integer")
+        if not any(col.primary_key for col in columns):
+            raise ValueError("append.max_key needs a primary key column to continue")
+
+    temporal_columns = {col.name: parse_column_type(col.type).name for col in columns
+                        if parse_column_type(col.type).name in TEMPORAL_TYPES}
+    time_column = append.get('time_column')
+    if time_column is None:
+        time_column = next((name for name, type_name in temporal_columns.items() if type_name == "TIMESTAMP"),
+                           next(iter(temporal_columns), None))
+    elif time_column not in temporal_columns:
+        raise ValueError(f"append.time_column must name a DATE or TIMESTAMP column, '{time_column}' is not one")
+
+    max_time = append.get('max_time')
+    if max_time is not None:
+        if time_column is None:
+            raise ValueError("append.max_time needs a DATE or TIMESTAMP column to continue")
+        max_time = _temporal(time_column, max_time, date_only=temporal_columns[time_column] == "DATE")
+    return Watermark(max_key=max_key, time_column=time_column, max_time=max_time)
+
+
+def parse_distribution(name: str, column_type: ColumnType, distribution) -> Optional[Dict]:
+    """Validate a column's distribution and normalize its parameters to plain numbers, strings and lists"""
+    type_name = column_type.name
+    if distribution is None:
+        return None
+    if isinstance(distribution, str):
+        distribution = {'type': distribution}
+    if not isinstance(distribution, dict):
+        raise ValueError(f"Column {name}: distribution must be a name or a mapping with a type")
+    
+    kind = distribution.get('type')
+    if kind not in DISTRIBUTIONS:
+        raise ValueError(f"Column {name}: distribution type must be one of {', '.join(DISTRIBUTIONS)}")
+    params = {key: value for key, value in distribution.items() if key != 'type'}
+    unknown = sorted(str(key) for key in params if key not in DISTRIBUTION_PARAMETERS[kind])
+    if unknown:
+        raise ValueError(f"Column {name}: unknown {kind} distribution parameters: {', '.join(unknown)}")
+    
+    numeric = type_name in NUMERIC_TYPES
+    if kind in ('uniform', 'normal', 'sequence') and not numeric:
+        raise ValueError(f"Column {name}: the {kind} distribution needs a numeric column")
+    if kind == 'zipf' and (type_name in TEMPORAL_TYPES or type_name == 'BOOLEAN'):
+        raise ValueError(f"Column {name}: the zipf distribution needs a numeric or string column")
+    if kind == 'timeseries' and type_name not in TEMPORAL_TYPES:
+        raise ValueError(f"Column {name}: the timeseries distribution needs a DATE or TIMESTAMP column")
+    
+    if kind == 'uniform':
+        parsed = {'min': _number(name, params, 'min'), 'max': _number(name, params, 'max')}
+    elif kind == 'normal':
+        parsed = {'mean': _number(name, params, 'mean', required=True), 'stddev': _number(name, params, 'stddev', required=True),
+                  'min': _number(name, params, 'min'), 'max': _number(name, params, 'max')}
+        if parsed['stddev'] <= 0:
+            raise ValueError(f"Column {name}: stddev must be positive")
+    elif kind == 'zipf':
+        parsed = {'exponent': _number(name, params, 'exponent', default=1.2)}
+        if parsed['exponent'] <= 0:
+            raise ValueError(f"Column {name}: exponent must be positive")
+        if numeric:
+            parsed['min'] = _number(name, params, 'min', default=1, integer=True)
+            parsed['max'] = _number(name, params, 'max', required=True, integer=True)
+        elif 'min' in params or 'max' in params:
+            raise ValueError(f"Column {name}: a zipf string column skews its value pool and takes no min or max")
+    elif kind == 'categorical':
+        parsed = _parse_categorical(name, type_name, params)
+    elif kind == 'sequence':
+        parsed = {'start': _number(name, params, 'start', default=1, integer=True),
+                  'step': _number(name, params, 'step', default=1, integer=True)}
+        if parsed['step'] < 1:
+            raise ValueError(f"Column {name}: step must be at least 1")
+    else:
+        parsed = _parse_timeseries(name, params)
+    
+    if parsed.get('min') is not None and parsed.get('max') is not None and parsed['min'] > parsed['max']:
+        raise ValueError(f"Column {name}: min cannot exceed max")
+    if numeric:
+        # Draws outside the type's range would be clipped onto its limits, piling up there
+        low, high = value_bounds(type_name, column_type.precision, column_type.scale)
+        for key in ('min', 'max'):
+            if parsed.get(key) is not None and not low <= parsed[key] <= high:
+                raise ValueError(f"Column {name}: {key} {parsed[key]} is outside the {_type_label(column_type)} range of {low:g} to {high:g}")
+    return {'type': kind, **parsed}
+
+
+def _type_label(column_type: ColumnType) -> str:
+    if column_type.name == 'DECIMAL':
+        return f"DECIMAL({column_type.precision}, {column_type.scale})"
+    return column_type.name
+
+
+def validate_value_shape(column: Column) -> None:
+    """Check that a column's distribution and cardinality fit together and with its other options"""
+    name = column.name
+    kind = column.distribution['type'] if column.distribution else None
+    if (column.primary_key or column.references) and (kind or column.cardinality is not None):
+        raise ValueError(f"Column {name}: primary and foreign key columns take no distribution or cardinality")
+    if column.cardinality is None:
+        if kind == 'zipf' and column.value_mode == 'unique':
+            raise ValueError(f"Column {name}: a zipf string column samples a pool, so it cannot use value_mode unique")
+        return
+    if not isinstance(column.cardinality, int) or isinstance(column.cardinality, bool) or column.cardinality < 1:
+        raise ValueError(f"Column {name}: cardinality must be a positive integer")
+    if kind in ('categorical', 'sequence', 'timeseries'):
+        raise ValueError(f"Column {name}: cardinality cannot be combined with the {kind} distribution")
+    if column.value_mode == 'unique':
+        raise ValueError(f"Column {name}: cardinality cannot be combined with value_mode unique")
+
+
+def validate_unique(column: Column, rows: int) -> None:
+    """Check that a unique column can give every row its own value"""
+    if not column.unique or column.primary_key:
+        return
+    name = column.name
+    if column.references:
+        raise ValueError(f"Column {name}: a foreign key column repeats its parent's keys, so it cannot be unique")
+    if column.distribution is not None or column.cardinality is not None:
+        raise ValueError(f"Column {name}: unique cannot be combined with a distribution or cardinality")
+    
+    column_type = parse_column_type(column.type)
+    if column_type.name == 'BOOLEAN':
+        raise ValueError(f"Column {name}: a BOOLEAN column cannot be unique")
+    if not isinstance(rows, int):
+        return
+    validate_unique_capacity(column, rows)
+
+
+def _parse_categorical(name: str, type_name: str, params: Dict) -> Dict:
+    values = params.get('values')
+    if not isinstance(values, list) or not values:
+        raise ValueError(f"Column {name}: a categorical distribution needs a non-empty values list")
+    if type_name in NUMERIC_TYPES:
+        if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            raise ValueError(f"Column {name}: categorical values must be numbers")
+    elif type_name == 'BOOLEAN':
+        if not all(isinstance(value, bool) for value in values):
+            raise ValueError(f"Column {name}: categorical values must be true or false")
+    elif type_name in TEMPORAL_TYPES:
+        values = [_temporal(name, value, date_only=type_name == 'DATE') for value in values]
+    else:
+        values = [str(value) for value in values]
+    
+    weights = params.get('weights')
+    if weights is None:
+        return {'values': values, 'weights': None}
+    if (not isinstance(weights, list) or len(weights) != len(values)
+            or not all(isinstance(weight, (int, float)) and not isinstance(weight, bool) and weight >= 0 for weight in weights)
+            or not sum(weights) > 0):
+        raise ValueError(f"Column {name}: weights must be one non-negative number per value, not all zero")
+    return {'values': values, 'weights': [float(weight) for weight in weights]}
+
+
+def _parse_timeseries(name: str, params: Dict) -> Dict:
+    if 'start' not in params or 'end' not in params:
+        raise ValueError(f"Column {name}: a timeseries distribution needs a start and an end")
+    start = _temporal(name, params['start'])
+    end = _temporal(name, params['end'])
+    if end <= start:
+        raise ValueError(f"Column {name}: end must be after start")
+    
+    seasonality = params.get('seasonality', ['daily', 'weekly'])
+    if isinstance(seasonality, str):
+        seasonality = [seasonality]
+    if not isinstance(seasonality, list) or any(cycle not in SEASONAL_CYCLES for cycle in seasonality):
+        raise ValueError(f"Column {name}: seasonality must list cycles out of {', '.join(SEASONAL_CYCLES)}")
+    
+    amplitude = _number(name, params, 'amplitude', default=0.5)
+    if not 0 <= amplitude <= 1:
+        raise ValueError(f"Column {name}: amplitude must be between 0 and 1")
+    trend = _number(name, params, 'trend', default=0.0)
+    if trend <= -1:
+        raise ValueError(f"Column {name}: trend must be greater than -1")
+    return {'start': start, 'end': end, 'seasonality': list(seasonality), 'amplitude': amplitude, 'trend': trend}
+
+
+def _number(name: str, params: Dict, key: str, default=None, required: bool = False, integer: bool = False):
+    value = params.get(key, default)
+    if value is None:
+        if required:
+            raise ValueError(f"Column {name}: {key} is required")
+        return None
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+        raise ValueError(f"Column {name}: {key} must be {'an integer' if integer else 'a number'}")
+    return value
+
+
+def _temporal(name: str, value, date_only: bool = False) -> str:
+    """A date or timestamp from YAML (parsed or quoted) as an ISO string NumPy reads"""
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Column {name}: '{value}' is not a date or timestamp")
+    if not isinstance(value, (date, datetime)):
+        raise ValueError(f"Column {name}: {value!r} is not a date or timestamp")
+    if date_only:
+        return (value.date() if isinstance(value, datetime) else value).isoformat()
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    return value.replace(tzinfo=None).isoformat(timespec='seconds')
@@ -0,0 +1,199 @@
+from typing import Dict, List, Optional, Tuple
+from dataclasses import asdict, dataclass
+import hashlib
+import json
+import logging
+import os
+import time
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlgen import TableSchema
+from datasets import DatasetSchema
+from writers import iter_output, output_file_info
+
+logger = logging.getLogger(__name__)
+
+# Per-shard manifests live here inside the output directory until a coordinator merges them
+SHARD_MANIFEST_DIR = "_manifests"
+
+# Merged manifest written at the root of the output directory
+MANIFEST_FILE = "manifest.json"
+
+
+@dataclass
+class ShardSpec:
+    """The rows a shard generates: shard index/count of every table, or an explicit range of one table"""
+    index: int = 0
+    count: int = 1
+    start_row: Optional[int] = None  # Explicit [start_row, end_row) range instead of index/count
+    end_row: Optional[int] = None
+    table_name: Optional[str] = None  # Table the explicit range applies to
+
+    @property
+    def label(self) -> str:
+        if self.start_row is not None:
+            return f"{self.table_name}-{self.start_row}-{self.end_row}"
+        return f"{self.index}-of-{self.count}"
+
+    def row_range(self, table: TableSchema) -> Tuple[int, int]:
+        """[start, end) rows of table this shard generates"""
+        if self.start_row is not None:
+            return self.start_row, min(self.end_row, table.rows)
+        return table.rows * self.index // self.count, table.rows * (self.index + 1) // self.count
+
+    def tables(self, dataset: DatasetSchema) -> List[TableSchema]:
+        if self.start_row is None:
+            return dataset.ordered_tables()
+        return [dataset.table(self.table_name)]
+
+
+@dataclass
+class ShardPart:
+    """One output file written by a shard"""
+    table_name: str
+    path: str  # Relative to the output directory
+    start_row: int
+    end_row: int
+    bytes: int
+    sha256: str
+    seconds: float
+
+
+def parse_shard(shard: str) -> ShardSpec:
+    """Parse an `i/N` shard spec, where shard i of N generates the i-th slice of every table"""
+    index, separator, count = shard.partition("/")
+    try:
+        spec = ShardSpec(index=int(index), count=int(count))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{shard}', expected i/N such as 0/4")
+    if not separator or spec.count < 1 or not 0 <= spec.index < spec.count:
+        raise ValueError(f"Invalid shard '{shard}', expected i/N with 0 <= i < N")
+    return spec
+
+
+def parse_row_range(rows: str, table_name: str) -> ShardSpec:
+    """Parse an explicit `START:END` row range (end exclusive) of one table"""
+    start, separator, end = rows.partition(":")
+    try:
+        spec = ShardSpec(start_row=int(start), end_row=int(end), table_name=table_name)
+    except ValueError:
+        raise ValueError(f"Invalid row range '{rows}', expected START:END such as 0:1000000")
+    if not separator or not 0 <= spec.start_row < spec.end_row:
+        raise ValueError(f"Invalid row range '{rows}', expected START:END with 0 <= START < END")
+    return spec
+
+
+def run_shard(dataset: DatasetSchema, spec: ShardSpec, output_dir: str, output_format: str = "sql",
+              compression: str = "none") -> Dict:
+    """Generate the rows of one shard into their own files and write the shard's manifest
+
+    Every table slice goes to {output_dir}/{table}/part-{start}-{end}.{ext}. The manifest records the
+    row range, size and checksum of each part so a coordinator can check the shards cover every table.
+    """
+    extension, _ = output_file_info(output_format, compression)
+    if any(table.seed is None for table in dataset.tables):
+        logger.warning("Schema has no seed, shards generate independent random data instead of slices of one dataset")
+
+    parts = []
+    for table in spec.tables(dataset):
+        start_row, end_row = spec.row_range(table)
+        if end_row <= start_row:
+            continue
+        relative_path = os.path.join(table.table_name, f"part-{start_row:012d}-{end_row:012d}.{extension}")
+        path = os.path.join(output_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        started = time.perf_counter()
+        checksum = hashlib.sha256()
+        size = 0
+        with open(path, "wb") as output_file:
+            for piece in iter_output(table, output_format, compression, start_row=start_row, end_row=end_row):
+                checksum.update(piece)
+                size += len(piece)
+                output_file.write(piece)
+        parts.append(ShardPart(table.table_name, relative_path, start_row, end_row, size, checksum.hexdigest(),
+                               round(time.perf_counter() - started, 3)))
+
+    manifest = {
+        "shard": spec.label,
+        "fingerprint": dataset.fingerprint(),
+        "format": output_format,
+        "compression": compression,
+        "parts": [asdict(part) for part in parts],
+    }
+    _write_json(os.path.join(output_dir, SHARD_MANIFEST_DIR, f"shard-{spec.label}.json"), manifest)
+    return manifest
+
+
+def merge_manifests(dataset: DatasetSchema, output_dir: str) -> Dict:
+    """Combine the shard manifests of output_dir into one manifest, checking every table is fully covered
+
+    Raises ValueError when shards come from a different schema or format, overlap, or leave rows out.
+    """
+    manifest_dir = os.path.join(output_dir, SHARD_MANIFEST_DIR)
+    names = sorted(name for name in os.listdir(manifest_dir) if name.endswith(".json")) if os.path.isdir(manifest_dir) else []
+    if not names:
+        raise ValueError(f"No shard manifests found in {manifest_dir}")
+
+    shards = []
+    for name in names:
+        with open(os.path.join(manifest_dir, name)) as manifest_file:
+            shards.append(json.load(manifest_file))
+
+    fingerprint = dataset.fingerprint()
+    first = shards[0]
+    for shard in shards:
+        if shard["fingerprint"] != fingerprint:
+            raise ValueError(f"Shard {shard['shard']} was generated from a different schema")
+        if (shard["format"], shard["compression"]) != (first["format"], first["compression"]):
+            raise ValueError(f"Shard {shard['shard']} uses a different format or compression")
+
+    parts_by_table: Dict[str, List[Dict]] = {table.table_name: [] for table in dataset.tables}
+    for shard in shards:
+        for part in shard["parts"]:
+            if part["table_name"] not in parts_by_table:
+                raise ValueError(f"Shard {shard['shard']} has rows of table {part['table_name']}, which is not in "
+                                 f"the schema; it was generated from a different schema")
+            parts_by_table[part["table_name"]].append(part)
+
+    tables = []
+    for table in dataset.ordered_tables():
+        parts = sorted(parts_by_table[table.table_name], key=lambda part: part["start_row"])
+        next_row = 0
+        for part in parts:
+            if part["start_row"] < next_row:
+                raise ValueError(f"Table {table.table_name}: shards overlap at row {part['start_row']}")
+            if part["start_row"] > next_row:
+                raise ValueError(f"Table {table.table_name}: rows {next_row}-{part['start_row']} are missing")
+            next_row = part["end_row"]
+        if next_row != table.rows:
+            raise ValueError(f"Table {table.table_name}: rows {next_row}-{table.rows} are missing")
+
+        seconds = sum(part["seconds"] for part in parts)
+        tables.append({
+            "table_name": table.table_name,
+            "rows": table.rows,
+            "bytes": sum(part["bytes"] for part in parts),
+            "rows_per_second": round(table.rows / seconds, 1) if seconds > 0 else None,
+            "parts": parts,
+        })
+
+    manifest = {
+        "fingerprint": fingerprint,
+        "format": first["format"],
+        "compression": first["compression"],
+        "shards": len(shards),
+        "tables": tables,
+    }
+    _write_json(os.path.join(output_dir, MANIFEST_FILE), manifest)
+    return manifest
+
+
+def _write_json(path: str, data: Dict) -> None:
+    """Write JSON atomically so a coordinator never reads a half-written manifest"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "w") as output_file:
+        json.dump(data, output_file, indent=2)
+    os.replace(temporary_path, path)
@@ -0,0 +1,79 @@
+from typing import Union
+from dataclasses import dataclass
+from multiprocessing import resource_tracker, shared_memory
+import os
+
+# Encoded chunks smaller than this are pickled back with the task result; a shared memory segment
+# costs a few system calls, which only pays off for larger buffers
+SHARED_MEMORY_MIN_BYTES = int(os.getenv("SHARED_CHUNK_MIN_BYTES", str(64 * 1024)))
+
+# Chunks are only placed in /dev/shm while it has this many times their size free, since writing
+# past the end of a full tmpfs kills the worker with SIGBUS instead of raising an error
+SHARED_MEMORY_HEADROOM = 4
+
+SHARED_MEMORY_DIR = "/dev/shm"
+
+
+@dataclass(frozen=True)
+class SharedChunk:
+    """An encoded chunk a worker left in a shared memory segment; the receiving process unlinks it"""
+    name: str
+    size: int
+
+
+# What a worker hands back for an encoded chunk: a shared memory reference, or the bytes themselves
+PublishedChunk = Union[SharedChunk, bytes]
+
+
+def publish_chunk(data: bytes) -> PublishedChunk:
+    """Worker side: place an encoded chunk in shared memory so it does not travel through the result pipe"""
+    size = len(data)
+    if size < SHARED_MEMORY_MIN_BYTES or not _has_room(size):
+        return data
+    try:
+        segment = shared_memory.SharedMemory(create=True, size=size)
+    except OSError:
+        return data
+    segment.buf[:size] = data
+    # The parent unlinks the segment, so this process's resource tracker must not reclaim it on exit
+    _untrack(segment)
+    segment.close()
+    return SharedChunk(segment.name, size)
+
+
+def collect_chunk(published: PublishedChunk) -> bytes:
+    """Parent side: read an encoded chunk with a single copy and free its segment"""
+    if isinstance(published, bytes):
+        return published
+    segment = shared_memory.SharedMemory(name=published.name)
+    try:
+        return bytes(segment.buf[:published.size])
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+def discard_chunk(published: PublishedChunk) -> None:
+    """Parent side: free the segment of a chunk that will never be read, e.g. after a client disconnected"""
+    if isinstance(published, bytes):
+        return
+    try:
+        segment = shared_memory.SharedMemory(name=published.name)
+    except FileNotFoundError:
+        return
+    segment.close()
+    segment.unlink()
+
+
+def _has_room(size: int) -> bool:
+    try:
+        stats = os.statvfs(SHARED_MEMORY_DIR)
+    except (OSError, AttributeError):
+        # No /dev/shm (macOS, Windows): shared memory is not backed by a size-limited tmpfs
+        return True
+    return stats.f_bavail * stats.f_frsize >= size * SHARED_MEMORY_HEADROOM
+
+
+def _untrack(segment: shared_memory.SharedMemory) -> None:
+    if os.name == "posix":
+        resource_tracker.unregister(segment._name, "shared_memory")
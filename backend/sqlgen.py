@@ -1,5 +1,40 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+from datetime import date, datetime, timezone
+import re
+
+# Maps type names and their aliases to the canonical type used for generation
+TYPE_ALIASES = {
+    "BIGINT": "BIGINT",
+    "LONG": "BIGINT",
+    "INT": "INT",
+    "INTEGER": "INT",
+    "SMALLINT": "SMALLINT",
+    "SHORT": "SMALLINT",
+    "TINYINT": "TINYINT",
+    "BYTE": "TINYINT",
+    "BOOLEAN": "BOOLEAN",
+    "TIMESTAMP": "TIMESTAMP",
+    "TIMESTAMP_NTZ": "TIMESTAMP",
+    "DATE": "DATE",
+    "DECIMAL": "DECIMAL",
+    "DEC": "DECIMAL",
+    "NUMERIC": "DECIMAL",
+    "DOUBLE": "DOUBLE",
+    "FLOAT": "DOUBLE",
+    "REAL": "DOUBLE",
+    "STRING": "STRING",
+    "VARCHAR": "STRING",
+    "CHAR": "STRING",
+}
+
+# How contextual string values are produced: sampled from a pre-generated pool, or one Faker call per cell
+VALUE_MODES = ("pooled", "unique")
+
+# Value distributions a column can declare instead of uniform draws over its whole type range
+DISTRIBUTIONS = ("uniform", "normal", "zipf", "categorical", "sequence", "timeseries")
+
+TYPE_PATTERN = re.compile(r"^\s*([A-Za-z_]+)\s*(?:\(\s*(\d+)\s*(?:,\s*(\d+)\s*)?\))?\s*$")
 
 
 @dataclass
@@ -10,6 +45,42 @@ class Column:
     nullable: bool = True
     comment: Optional[str] = None
     primary_key: bool = False
+    value_mode: str = "pooled"  # One of VALUE_MODES
+    references: Optional[str] = None  # "table.column" primary key of another table this column points at
+    distribution: Optional[Dict] = None  # {"type": one of DISTRIBUTIONS, **parameters}, validated when parsed
+    cardinality: Optional[int] = None  # Maximum number of distinct values
+    unique: bool = False  # No two rows share a value
+
+
+@dataclass(frozen=True)
+class ForeignKey:
+    """A column reference resolved to the parent table's sequential primary key range"""
+    table_name: str  # Full name of the parent table
+    column: str  # Referenced primary key column
+    start: int  # First key value of the parent table
+    rows: int  # Number of keys the parent table generates
+    string_keys: bool  # Parent keys are rendered as 'ID_001' style strings
+
+
+@dataclass(frozen=True)
+class ColumnType:
+    """A column type parsed into its canonical name and parameters"""
+    name: str  # Canonical type name, or the raw type when it is not recognized
+    precision: Optional[int] = None  # DECIMAL(p, s) precision
+    scale: Optional[int] = None  # DECIMAL(p, s) scale
+    length: Optional[int] = None  # VARCHAR(n)/CHAR(n) maximum length
+
+
+@dataclass(frozen=True)
+class Watermark:
+    """Where an existing table ends; appended rows continue its primary keys and advance its time column"""
+    max_key: Optional[int] = None  # Largest primary key in the table (the counter of 'ID_001' keys); None starts at 1
+    time_column: Optional[str] = None  # DATE or TIMESTAMP column whose values keep increasing past max_time
+    max_time: Optional[str] = None  # Latest value of time_column (ISO); None leaves the column random
+
+    def needs_lookup(self, schema: "TableSchema") -> bool:
+        """Whether a value the table can have is missing, to be read from the table itself"""
+        return (self.max_key is None and schema.primary_key is not None) or (self.max_time is None and self.time_column is not None)
 
 
 @dataclass
@@ -20,6 +91,48 @@ class TableSchema:
     schema: str = ""
     columns: List[Column] = field(default_factory=list)
     rows: int = 0  # Number of rows to generate for INSERT
+    seed: Optional[int] = None  # Fixes the generated data; None draws a fresh seed per run
+    foreign_keys: Dict[str, ForeignKey] = field(default_factory=dict)  # Resolved references by column name
+    append: Optional[Watermark] = None  # Rows continue an existing table instead of starting a new one
+
+    @property
+    def primary_key(self) -> Optional[Column]:
+        return next((col for col in self.columns if col.primary_key), None)
+
+    def generate_watermark_sql(self) -> str:
+        """SELECT of the table's largest primary key and latest time column value, for appending to it"""
+        primary_key, time_column = self.primary_key, self.append.time_column if self.append else None
+        max_key = "NULL"
+        if primary_key is not None:
+            # 'ID_001' keys outgrow their padding, so they are compared by counter rather than as strings
+            max_key = (f"MAX(CAST(SUBSTRING({primary_key.name}, 4) AS BIGINT))"
+                       if parse_column_type(primary_key.type).name == "STRING" else f"MAX({primary_key.name})")
+        return (f"SELECT {max_key}, "
+                f"{f'MAX({time_column})' if time_column else 'NULL'} "
+                f"FROM {build_table_name(self.catalog, self.schema, self.table_name)}")
+
+    def read_watermark(self, row: Optional[Tuple]) -> Watermark:
+        """The append watermark with the values a watermark query returned filled in where they were missing
+
+        An empty table returns NULLs, which leave the table to be generated from its first key.
+        """
+        max_key, max_time = row if row is not None else (None, None)
+        if isinstance(max_key, str):
+            # 'ID_001' style keys
+            digits = re.sub(r"\D", "", max_key)
+            max_key = int(digits) if digits else None
+        if isinstance(max_time, datetime):
+            if max_time.tzinfo is not None:
+                # Generated timestamps are UTC
+                max_time = max_time.astimezone(timezone.utc).replace(tzinfo=None)
+            max_time = max_time.isoformat(timespec="seconds")
+        elif isinstance(max_time, date):
+            max_time = max_time.isoformat()
+        return Watermark(
+            max_key=self.append.max_key if self.append.max_key is not None else max_key,
+            time_column=self.append.time_column,
+            max_time=self.append.max_time if self.append.max_time is not None else max_time,
+        )
 
     def generate_create_table_sql(self) -> str:
         """Generates Databricks SQL CREATE TABLE statement"""
@@ -40,16 +153,14 @@ class TableSchema:
             
             # Add comment if provided
             if col.comment:
-                # Escape single quotes in comments by doubling them
-                escaped_comment = col.comment.replace("'", "''")
-                col_def += f" COMMENT '{escaped_comment}'"
+                col_def += f" COMMENT {quote_sql_string(col.comment)}"
             
             # Track primary key columns
             if col.primary_key:
                 primary_key_columns.append(col.name)
             
-            # Add comma if not the last column or if we have primary keys to add
-            if i < len(self.columns) - 1 or primary_key_columns:
+            # Add comma if not the last column or if we have primary or foreign keys to add
+            if i < len(self.columns) - 1 or primary_key_columns or self.foreign_keys:
                 col_def += ","
             
             sql_parts.append(col_def)
@@ -57,8 +168,18 @@ class TableSchema:
         # Add PRIMARY KEY constraint if we have primary key columns
         if primary_key_columns:
             pk_constraint = f"    PRIMARY KEY ({', '.join(primary_key_columns)})"
+            if self.foreign_keys:
+                pk_constraint += ","
             sql_parts.append(pk_constraint)
         
+        # Add a FOREIGN KEY constraint for every resolved reference
+        fk_constraints = [
+            f"    FOREIGN KEY ({column_name}) REFERENCES {foreign_key.table_name}({foreign_key.column})"
+            for column_name, foreign_key in self.foreign_keys.items()
+        ]
+        if fk_constraints:
+            sql_parts.append(",\n".join(fk_constraints))
+        
         sql_parts.append(");")
         
         return "\n".join(sql_parts)
@@ -76,4 +197,57 @@ def build_table_name(catalog: str, schema: str, table_name: str) -> str:
     
     parts.append(table_name)
     
-    return ".".join(parts) 
\ No newline at end of file
+    return ".".join(parts) 
+
+# Backslash escapes of string literals; Databricks reads a doubled quote as two adjacent literals, not as a quote
+SQL_STRING_ESCAPES = (("\\", "\\\\"), ("'", "\\'"), ("\n", "\\n"), ("\r", "\\r"))
+
+# Joins a column's values while it is escaped in one pass; generated values never contain it
+_COLUMN_SEPARATOR = "\x00"
+
+def escape_sql_string(value: str) -> str:
+    """Escape a value for use inside a single-quoted SQL string literal"""
+    for char, escaped in SQL_STRING_ESCAPES:
+        value = value.replace(char, escaped)
+    return value
+
+def quote_sql_string(value: str) -> str:
+    """A value as a SQL string literal"""
+    return f"'{escape_sql_string(value)}'"
+
+def format_sql_strings(values: Sequence[str]) -> List[str]:
+    """A column of values as SQL string literals
+
+    The column is joined, escaped and split again, so the work is a few C-level passes over one string
+    rather than several calls per value.
+    """
+    if not values:
+        return []
+    joined = _COLUMN_SEPARATOR.join(values)
+    if joined.count(_COLUMN_SEPARATOR) != len(values) - 1:
+        # A value contains the separator itself
+        return [quote_sql_string(value) for value in values]
+    quoted = "'" + escape_sql_string(joined).replace(_COLUMN_SEPARATOR, f"'{_COLUMN_SEPARATOR}'") + "'"
+    return quoted.split(_COLUMN_SEPARATOR)
+
+def parse_column_type(column_type: str) -> ColumnType:
+    """Parse a SQL type such as DECIMAL(10,2) or VARCHAR(50) into a ColumnType"""
+    match = TYPE_PATTERN.match(column_type)
+    if not match:
+        # Complex types (ARRAY<...>, STRUCT<...>, ...) are kept as-is
+        return ColumnType(name=column_type.strip().upper())
+    
+    raw_name, first_param, second_param = match.groups()
+    name = TYPE_ALIASES.get(raw_name.upper(), raw_name.upper())
+    
+    if name == "DECIMAL":
+        precision = int(first_param) if first_param else 10
+        scale = int(second_param) if second_param else (0 if first_param else 2)
+        if scale > precision:
+            raise ValueError(f"Invalid type {column_type}: scale cannot exceed precision")
+        return ColumnType(name=name, precision=precision, scale=scale)
+    
+    if name == "STRING":
+        return ColumnType(name=name, length=int(first_param) if first_param else None)
+    
+    return ColumnType(name=name)
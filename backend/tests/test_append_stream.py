@@ -0,0 +1,40 @@
+import json
+
+from fastapi.testclient import TestClient
+
+import main
+
+APPEND_TABLE = """
+seed: 3
+catalog: c
+schema: s
+table_name: events
+rows: 20
+append: {}
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: n, type: TINYINT, distribution: {type: sequence, start: 0, step: 1}}
+"""
+
+
+def stream(yaml_content):
+    return TestClient(main.app).post("/api/generate-from-yaml/stream",
+                                     json={"yaml_content": yaml_content, "format": "ndjson"})
+
+
+def test_streamed_appends_continue_after_the_watermark_read_from_the_table(monkeypatch):
+    queries = []
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "sqlFetchOne", lambda query: queries.append(query) or (100, None))
+    response = stream(APPEND_TABLE)
+    assert response.status_code == 200
+    assert queries == ["SELECT MAX(id), NULL FROM c.s.events"]
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == list(range(101, 121))
+
+
+def test_streamed_appends_past_a_sequence_range_are_rejected(monkeypatch):
+    monkeypatch.setattr(main, "result_cache", None)
+    monkeypatch.setattr(main, "sqlFetchOne", lambda query: (120, None))
+    response = stream(APPEND_TABLE)
+    assert response.status_code == 400
+    assert "outside the TINYINT range" in response.json()["detail"]
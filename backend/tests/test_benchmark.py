@@ -0,0 +1,48 @@
+import json
+
+import benchmark
+
+
+def test_report_has_one_measured_result_per_case(tmp_path):
+    output = tmp_path / "report.json"
+    benchmark.main(["--benchmarks", "preview", "sequential", "columns", "--shapes", "narrow", "--rows", "2000",
+                    "--output", str(output)])
+    report = json.loads(output.read_text())
+    assert {"commit", "python", "numpy", "cpu_count"} <= set(report["environment"])
+    results = {result["benchmark"]: result for result in report["results"]}
+    assert set(results) == {"preview", "sequential", "columns"}
+    for result in results.values():
+        assert "error" not in result
+        assert result["shape"] == "narrow" and result["rows"] == 2000 and result["columns_count"] == 5
+        assert result["rows_per_second"] > 0 and result["peak_rss_mb"]["main"] > 0
+    assert results["preview"]["output_bytes"] > 0
+    assert [column["name"] for column in results["columns"]["columns"]][0] == "id"
+    assert all(column["generate_ns_per_row"] >= 0 for column in results["columns"]["columns"])
+
+
+def test_cases_are_skipped_or_recorded_as_failed_without_stopping_the_suite(tmp_path, monkeypatch):
+    output = tmp_path / "report.json"
+    monkeypatch.setattr(benchmark, "FULL_SQL_MAX_ROWS", 500)
+    benchmark.main(["--benchmarks", "full_insert_sql", "--shapes", "narrow", "--rows", "1000", "--output", str(output)])
+    [result] = json.loads(output.read_text())["results"]
+    assert "skipped" in result
+
+    failed = benchmark.run_isolated({"benchmark": "preview", "shape": "missing", "rows": 10})
+    assert "KeyError" in failed["error"]
+
+
+def test_baseline_comparison_reports_the_relative_change():
+    results = [
+        {"benchmark": "sequential", "shape": "wide", "rows": 1000, "rows_per_second": 1500.0},
+        {"benchmark": "startup", "shape": "narrow", "rows": 20000, "startup_seconds": 3.0},
+        {"benchmark": "sequential", "shape": "wide", "rows": 5000, "rows_per_second": 900.0},
+    ]
+    baseline = {"results": [
+        {"benchmark": "sequential", "shape": "wide", "rows": 1000, "rows_per_second": 1000.0},
+        {"benchmark": "startup", "shape": "narrow", "rows": 20000, "startup_seconds": 2.0},
+        {"benchmark": "startup", "shape": "narrow", "rows": 20000, "startup_seconds": 4.0},
+    ]}
+    benchmark.compare(results, baseline)
+    assert results[0]["baseline_rows_per_second"] == 1000.0 and results[0]["change"] == 0.5
+    assert results[1]["baseline_startup_seconds"] == 3.0 and results[1]["change"] == 0.0
+    assert "change" not in results[2]
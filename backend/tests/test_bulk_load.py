@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from bulk_load import DatabricksLoadConnection, SQLiteLoadConnection, iter_bulk_load, unique_staging_path
+from schema_yaml import load_dataset
+
+SCHEMA = """
+seed: 5
+table_name: orders
+rows: 2500
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: note, type: STRING}
+  - {name: amount, type: DOUBLE}
+"""
+
+
+def test_repeated_copy_into_loads_stage_their_own_files_and_report_inserted_rows(tmp_path):
+    pytest.importorskip("pyarrow")
+    schema = load_dataset(SCHEMA).tables[0]
+    connection = SQLiteLoadConnection()
+    staging_path = str(tmp_path / "orders.parquet")
+    try:
+        for load in range(2):
+            progress = list(iter_bulk_load(schema, connection, "copy_into", 1000, staging_path, create_table=load == 0))
+            assert progress[-1].stage == "copy"
+            assert progress[-1].rows_loaded == schema.rows
+        assert connection.connection.execute("SELECT COUNT(*) FROM orders").fetchone()[0] == 2 * schema.rows
+    finally:
+        connection.close()
+    # Staged files are removed once loaded
+    assert os.listdir(tmp_path) == []
+
+
+def test_unique_staging_paths_keep_the_directory_and_extension():
+    first, second = unique_staging_path("/Volumes/c/s/v/orders.parquet"), unique_staging_path("/Volumes/c/s/v/orders.parquet")
+    assert first != second
+    assert first.startswith("/Volumes/c/s/v/orders-") and first.endswith(".parquet")
+    assert unique_staging_path("/Volumes/c/s/v/orders").endswith(".parquet")
+
+
+class RecordingCursor:
+    description = [("num_affected_rows",), ("num_inserted_rows",), ("num_skipped_corrupt_files",)]
+
+    def __init__(self, statements):
+        self.statements = statements
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, statement, parameters=None):
+        self.statements.append(statement)
+
+    def fetchone(self):
+        return (7, 7, 0)
+
+
+class RecordingConnection:
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return RecordingCursor(self.statements)
+
+
+def test_databricks_copy_into_quotes_the_path_and_returns_inserted_rows():
+    schema = load_dataset(SCHEMA).tables[0]
+    connection = RecordingConnection()
+    assert DatabricksLoadConnection(connection).copy_into(schema, "/Volumes/c/s/v/it's.parquet") == 7
+    assert "FROM '/Volumes/c/s/v/it\\'s.parquet')" in connection.statements[0]
@@ -0,0 +1,84 @@
+import re
+
+import numpy as np
+import pytest
+
+from columnar import (
+    DATE_RANGE_DAYS,
+    format_booleans,
+    format_dates,
+    format_decimals,
+    format_doubles,
+    format_integers,
+    format_timestamps,
+    sample_booleans,
+    sample_dates,
+    sample_decimal_units,
+    sample_doubles,
+    sample_integers,
+    sample_timestamps,
+)
+from data_generator import _generate_rows_sequential, compile_plan
+from schema_yaml import load_dataset
+
+END_TIME = np.datetime64("2026-03-01T12:00:00", "s")
+
+
+def rng():
+    return np.random.default_rng(0)
+
+
+def test_integers_cover_their_bounds_inclusively():
+    values = sample_integers(rng(), 10_000, 0, 127)
+    assert values.dtype == np.int64
+    assert values.min() == 0 and values.max() == 127
+
+
+def test_temporal_values_fall_within_the_range_before_the_end_time():
+    timestamps = sample_timestamps(rng(), 10_000, END_TIME)
+    assert (timestamps <= END_TIME).all()
+    assert (timestamps >= END_TIME - np.timedelta64(DATE_RANGE_DAYS, "D")).all()
+    dates = sample_dates(rng(), 10_000, END_TIME)
+    assert dates.max() <= np.datetime64("2026-03-01") and dates.min() >= np.datetime64("2026-03-01") - DATE_RANGE_DAYS
+
+
+def test_decimal_units_fit_precision_and_scale():
+    units = sample_decimal_units(rng(), 10_000, 5, 2)
+    assert units.min() >= 1 and units.max() <= 99_999
+    assert all(re.fullmatch(r"\d{1,3}\.\d{2}", text) for text in format_decimals(units, 2))
+    # Fraction digits beyond the random ones are zeros
+    assert format_decimals(np.array([123456789]), 8) == ["123.45678900"]
+    assert format_decimals(np.array([-5, 1205]), 2) == ["-0.05", "12.05"]
+    assert format_decimals(np.array([42]), 0) == ["42"]
+
+
+def test_sql_literals_of_each_type():
+    assert format_integers(np.array([-3, 0, 7])) == ["-3", "0", "7"]
+    assert format_booleans(np.array([True, False])) == ["true", "false"]
+    assert format_dates(np.array(["2026-01-02"], dtype="datetime64[D]")) == ["'2026-01-02'"]
+    assert format_timestamps(np.array(["2026-01-02T03:04:05"], dtype="datetime64[s]")) == ["'2026-01-02 03:04:05'"]
+    assert format_doubles(np.array([1.5, 2.25])) == ["1.5000", "2.2500"]
+    doubles = sample_doubles(rng(), 1000)
+    assert (doubles == np.round(doubles, 4)).all()
+    assert sample_booleans(rng(), 10_000).mean() == pytest.approx(0.5, abs=0.03)
+
+
+def test_columns_of_a_chunk_are_drawn_together_and_transposed_into_rows():
+    schema = load_dataset("""
+seed: 2
+table_name: t
+rows: 5000
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: small, type: TINYINT}
+  - {name: flag, type: BOOLEAN, nullable: false}
+  - {name: day, type: DATE}
+""").tables[0]
+    rows = _generate_rows_sequential(0, 5000, compile_plan(schema))
+    assert [index for index, _ in rows] == list(range(5000))
+    small = [values[1] for _, values in rows]
+    present = [int(value) for value in small if value != "NULL"]
+    assert min(present) >= 0 and max(present) <= 127
+    # Nullable columns are NULL about a tenth of the time, non-nullable ones never
+    assert small.count("NULL") / len(small) == pytest.approx(0.1, abs=0.02)
+    assert {values[2] for _, values in rows} == {"true", "false"}
@@ -0,0 +1,123 @@
+import threading
+
+import pytest
+
+from connection_pool import ConnectionPool
+
+
+class Broken(Exception):
+    pass
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, query, parameters=None):
+        if self.connection.broken:
+            raise Broken(f"connection {self.connection.number} is gone")
+        self.connection.queries.append(query)
+
+    def fetchone(self):
+        return [self.connection.number]
+
+    def fetchall(self):
+        return [[1]]
+
+
+class FakeConnection:
+    """DB-API connection that counts the statements run on it"""
+
+    def __init__(self, number):
+        self.number = number
+        self.queries = []
+        self.broken = False
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connections():
+    return []
+
+
+@pytest.fixture
+def pool(connections):
+    def connect():
+        connections.append(FakeConnection(len(connections)))
+        return connections[-1]
+
+    return ConnectionPool(connect, max_size=2, discard_on=(Broken,), retry_on=lambda: (Broken,))
+
+
+def test_statements_reuse_one_connection(pool, connections):
+    for _ in range(5):
+        pool.execute("INSERT 1")
+    assert pool.fetch_one("SELECT 1") == (0,)
+    assert len(connections) == 1 and len(connections[0].queries) == 6
+    assert pool.stats() == {"max_size": 2, "idle": 1, "in_use": 0, "created": 1, "reconnects": 0}
+
+
+def test_pool_never_opens_more_than_max_size_connections(pool, connections):
+    first, second = pool.acquire(), pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+    pool.release(first)
+    assert pool.acquire(timeout=0.01) is first
+    assert len(connections) == 2
+    pool.release(first)
+    pool.release(second)
+
+
+def test_broken_connections_are_replaced_and_the_statement_retried(pool, connections):
+    pool.execute("INSERT 1")
+    connections[0].broken = True
+    pool.execute("INSERT 2")
+    assert connections[0].closed
+    assert connections[1].queries == ["INSERT 2"]
+    assert pool.stats()["reconnects"] == 1 and pool.stats()["idle"] == 1
+
+
+def test_idle_connections_are_health_checked_and_expired(connections):
+    pool = ConnectionPool(lambda: connections.append(FakeConnection(len(connections))) or connections[-1],
+                          health_check_interval=0, idle_timeout=3600)
+    pool.execute("INSERT 1")
+    connections[0].broken = True
+    pool.execute("INSERT 2")
+    assert connections[0].closed and connections[1].queries == ["INSERT 2"]
+
+    pool.idle_timeout = -1
+    pool.execute("INSERT 3")
+    assert connections[1].closed and connections[2].queries == ["INSERT 3"]
+
+
+def test_threads_share_the_pool(pool, connections):
+    threads = [threading.Thread(target=lambda: [pool.execute("INSERT") for _ in range(20)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(connections) <= 2
+    assert sum(len(connection.queries) for connection in connections) == 80
+
+
+def test_closing_the_pool_closes_idle_and_returned_connections(pool, connections):
+    pool.execute("INSERT 1")
+    borrowed = pool.acquire()
+    other = pool.acquire()
+    pool.release(other)
+    pool.close()
+    assert other.closed and not borrowed.closed
+    pool.release(borrowed)
+    assert borrowed.closed
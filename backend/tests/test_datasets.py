@@ -0,0 +1,99 @@
+import threading
+import time
+
+import pytest
+
+from data_generator import _generate_rows_sequential, compile_plan
+from datasets import generate_dataset_create_sql, run_dataset
+from schema_yaml import load_dataset
+
+DATASET = """
+seed: 12
+tables:
+  - table_name: order_items
+    rows: 3000
+    columns:
+      - {name: id, type: BIGINT, primary_key: true}
+      - {name: order_id, type: BIGINT, references: orders.id, nullable: false}
+      - {name: product_id, type: STRING, references: products.sku, nullable: false}
+  - table_name: orders
+    rows: 400
+    columns:
+      - {name: id, type: BIGINT, primary_key: true}
+      - {name: customer_id, type: BIGINT, references: customers.id, nullable: false}
+  - table_name: customers
+    rows: 50
+    columns:
+      - {name: id, type: BIGINT, primary_key: true}
+  - table_name: products
+    rows: 20
+    columns:
+      - {name: sku, type: STRING, primary_key: true}
+"""
+
+
+def test_foreign_keys_stay_within_the_parent_key_range():
+    dataset = load_dataset(DATASET)
+    items = dataset.table("order_items")
+    rows = [values for _, values in _generate_rows_sequential(0, items.rows, compile_plan(items), row_format="python")]
+    order_ids = {values[1] for values in rows}
+    assert min(order_ids) >= 1 and max(order_ids) <= 400 and len(order_ids) > 300
+    parent_keys = {values[0] for _, values in _generate_rows_sequential(0, 20, compile_plan(dataset.table("products")), row_format="python")}
+    assert {values[2] for values in rows} <= parent_keys
+
+
+def test_tables_are_ordered_parents_first():
+    dataset = load_dataset(DATASET)
+    levels = [sorted(table.table_name for table in level) for level in dataset.generation_levels()]
+    assert levels == [["customers", "products"], ["orders"], ["order_items"]]
+    create_sql = generate_dataset_create_sql(dataset)
+    assert "FOREIGN KEY (order_id) REFERENCES orders(id)" in create_sql[-1]
+
+
+@pytest.mark.parametrize("change, message", [
+    (("customers.id", "order_items.id"), "Tables reference each other in a cycle"),
+    (("orders.id", "invoices.id"), "references unknown table 'invoices'"),
+    (("orders.id", "orders.customer_id"), "'orders.customer_id' is not one"),
+    (("products.sku", "orders.id"), "must have the same kind of type as 'orders.id'"),
+])
+def test_invalid_references_are_rejected(change, message):
+    old, new = change
+    with pytest.raises(ValueError, match=message):
+        load_dataset(DATASET.replace(f"references: {old}", f"references: {new}", 1))
+
+
+def test_run_dataset_starts_tables_once_their_parents_are_done():
+    dataset = load_dataset(DATASET)
+    events = []
+    lock = threading.Lock()
+    running = set()
+    overlapped = []
+
+    def generate_table(table):
+        with lock:
+            events.append(("start", table.table_name))
+            running.add(table.table_name)
+            overlapped.append(len(running) > 1)
+        time.sleep(0.05)
+        with lock:
+            running.discard(table.table_name)
+            events.append(("done", table.table_name))
+
+    run_dataset(dataset, generate_table, max_parallel=2)
+    for child, parent in [("orders", "customers"), ("order_items", "orders"), ("order_items", "products")]:
+        assert events.index(("done", parent)) < events.index(("start", child))
+    # customers and products do not depend on each other
+    assert any(overlapped)
+
+
+def test_run_dataset_raises_the_first_failure_and_skips_its_children():
+    started = []
+
+    def generate_table(table):
+        started.append(table.table_name)
+        if table.table_name == "customers":
+            raise RuntimeError("customers failed")
+
+    with pytest.raises(RuntimeError, match="customers failed"):
+        run_dataset(load_dataset(DATASET), generate_table, max_parallel=1)
+    assert "orders" not in started and "order_items" not in started
@@ -0,0 +1,59 @@
+from functools import lru_cache
+
+import pytest
+
+from data_generator import _iter_chunks_multiprocessing, _iter_chunks_sequential, compile_plan, iter_row_chunks
+from schema_yaml import load_dataset
+from worker_pool import shutdown_shared_pool, start_shared_pool
+
+SCHEMA = """
+seed: {seed}
+table_name: t
+rows: 2500
+columns:
+  - {{name: id, type: BIGINT, primary_key: true}}
+  - {{name: email, type: STRING}}
+  - {{name: company, type: STRING, value_mode: unique}}
+  - {{name: score, type: INT}}
+  - {{name: price, type: 'DECIMAL(8, 2)'}}
+  - {{name: seen, type: TIMESTAMP}}
+  - {{name: tier, type: STRING, distribution: {{type: categorical, values: [gold, silver], weights: [1, 3]}}}}
+"""
+
+
+def table(seed=21):
+    return load_dataset(SCHEMA.format(seed=seed)).tables[0]
+
+
+@lru_cache(maxsize=None)
+def rows(seed=21, chunk_size=2500, start_row=0, end_row=2500):
+    plan = compile_plan(table(seed))
+    return [row for chunk in _iter_chunks_sequential(start_row, end_row, plan, chunk_size, "sql") for row in chunk]
+
+
+def test_the_same_seed_gives_the_same_rows_at_any_chunk_size():
+    expected = rows()
+    for chunk_size in (999, 1000, 1700):
+        assert rows(chunk_size=chunk_size) == expected
+    assert rows(chunk_size=7, end_row=100) == expected[:100]
+
+
+def test_different_seeds_give_different_rows():
+    assert [values[1:] for _, values in rows(seed=1)] != [values[1:] for _, values in rows(seed=2)]
+
+
+def test_any_row_range_is_generated_on_its_own():
+    expected = rows()
+    assert rows(start_row=1234, end_row=2001) == expected[1234:2001]
+    assert [row for chunk in iter_row_chunks(table(), 500, start_row=2100) for row in chunk] == expected[2100:]
+
+
+@pytest.mark.parametrize("processes, chunk_size", [(1, 1000), (2, 1000), (3, 2000)])
+def test_the_same_seed_gives_the_same_rows_at_any_worker_count(processes, chunk_size):
+    plan = compile_plan(table())
+    try:
+        start_shared_pool(processes)
+        pooled = [row for chunk in _iter_chunks_multiprocessing(0, 2500, plan, chunk_size, "sql") for row in chunk]
+    finally:
+        shutdown_shared_pool()
+    assert pooled == rows()
@@ -0,0 +1,106 @@
+import gzip
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from downloads import RangeNotSatisfiable, compressed_file_response, file_response, parse_range
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "rows.csv"
+    path.write_bytes(CONTENT)
+    app = FastAPI()
+
+    @app.get("/file")
+    def get_file(request: Request, delete: bool = False):
+        response = file_response(request, str(path), "text/csv", "rows.csv")
+        if delete:
+            # Evicted between the response being built and its body being sent
+            os.remove(path)
+        return response
+
+    @app.get("/gzip")
+    async def get_gzip(request: Request):
+        return await compressed_file_response(request, str(path), "gzip", "rows.csv")
+
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-9", (0, 9)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=-30", (70, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=90-200", (90, 99)),
+    ("bytes=5-2", None),
+    ("bytes=0-1,5-6", None),
+    ("lines=0-9", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=-0"])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 100)
+
+
+def test_whole_file_is_sent_with_its_length(client):
+    response = client.get("/file")
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["content-length"] == str(len(CONTENT))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-disposition"] == 'attachment; filename="rows.csv"'
+
+
+def test_range_is_answered_with_partial_content(client):
+    response = client.get("/file", headers={"Range": "bytes=1000-1999"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[1000:2000]
+    assert response.headers["content-range"] == f"bytes 1000-1999/{len(CONTENT)}"
+    assert response.headers["content-length"] == "1000"
+
+
+def test_range_past_the_end_is_not_satisfiable(client):
+    response = client.get("/file", headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_if_range_resumes_only_the_same_file(client):
+    etag = client.get("/file").headers["etag"]
+    response = client.get("/file", headers={"Range": "bytes=100-", "If-Range": etag})
+    assert response.status_code == 206 and response.content == CONTENT[100:]
+    # A changed file is sent whole
+    response = client.get("/file", headers={"Range": "bytes=100-", "If-Range": '"stale"'})
+    assert response.status_code == 200 and response.content == CONTENT
+
+
+def test_file_deleted_after_the_response_is_built_is_still_sent(client, tmp_path):
+    response = client.get("/file", params={"delete": True}, headers={"Range": "bytes=10-"})
+    assert response.status_code == 206
+    assert response.content == CONTENT[10:]
+    assert not (tmp_path / "rows.csv").exists()
+
+
+def test_compressed_copy_is_kept_and_serves_ranges(client, tmp_path):
+    first = client.get("/gzip")
+    assert first.status_code == 200
+    assert "content-length" not in first.headers
+    assert gzip.decompress(first.content) == CONTENT
+    # The streamed download is kept as the copy later requests are served from
+    compressed = (tmp_path / "rows.csv.gz").read_bytes()
+    assert compressed == first.content
+
+    response = client.get("/gzip", headers={"Range": "bytes=10-", "If-Range": first.headers["etag"]})
+    assert response.status_code == 206
+    assert response.content == compressed[10:]
+    assert response.headers["content-range"] == f"bytes 10-{len(compressed) - 1}/{len(compressed)}"
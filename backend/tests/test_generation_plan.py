@@ -0,0 +1,60 @@
+import pickle
+
+import pytest
+
+from data_generator import _generate_rows_sequential, compile_plan
+from schema_yaml import load_dataset
+from sqlgen import ColumnType, parse_column_type
+
+
+@pytest.mark.parametrize("column_type, expected", [
+    ("bigint", ColumnType("BIGINT")),
+    ("LONG", ColumnType("BIGINT")),
+    ("Integer", ColumnType("INT")),
+    ("DECIMAL", ColumnType("DECIMAL", precision=10, scale=2)),
+    ("DECIMAL(7)", ColumnType("DECIMAL", precision=7, scale=0)),
+    ("numeric(12, 4)", ColumnType("DECIMAL", precision=12, scale=4)),
+    ("VARCHAR(50)", ColumnType("STRING", length=50)),
+    ("STRING", ColumnType("STRING")),
+    ("ARRAY<INT>", ColumnType("ARRAY<INT>")),
+])
+def test_parse_column_type(column_type, expected):
+    assert parse_column_type(column_type) == expected
+
+
+def test_decimal_scale_cannot_exceed_precision():
+    with pytest.raises(ValueError, match="scale cannot exceed precision"):
+        parse_column_type("DECIMAL(2, 3)")
+
+
+SCHEMA = load_dataset("""
+seed: 8
+table_name: customers
+rows: 200
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: email, type: STRING}
+  - {name: code, type: VARCHAR(5)}
+  - {name: balance, type: 'DECIMAL(6, 3)'}
+  - {name: active, type: BOOLEAN}
+""").tables[0]
+
+
+def test_columns_are_resolved_once_to_their_kind():
+    plan = compile_plan(SCHEMA)
+    assert [column_plan.kind for column_plan in plan.columns] == ["primary_key", "email", "mixed", "DECIMAL", "BOOLEAN"]
+
+
+def test_plans_pickle_to_workers_and_generate_the_same_rows():
+    plan = compile_plan(SCHEMA)
+    copy = pickle.loads(pickle.dumps(plan))
+    assert _generate_rows_sequential(0, 200, copy) == _generate_rows_sequential(0, 200, plan)
+
+
+def test_rendered_values_honour_the_column_types():
+    rows = [values for _, values in _generate_rows_sequential(0, 200, compile_plan(SCHEMA), row_format="python")]
+    assert [values[0] for values in rows] == list(range(1, 201))
+    assert all(values[1] is None or "@" in values[1] for values in rows)
+    assert all(values[2] is None or len(values[2]) <= 5 for values in rows)
+    assert all(values[3] is None or (0 < values[3] < 1000 and round(values[3], 3) == values[3]) for values in rows)
+    assert {values[4] for values in rows} <= {True, False, None}
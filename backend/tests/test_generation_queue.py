@@ -0,0 +1,66 @@
+import asyncio
+import gc
+
+import pytest
+
+from generation_queue import GenerationQueue, QueueFullError
+
+
+def chunks_of(*pieces):
+    yield from pieces
+
+
+def test_dropped_unstarted_streams_free_their_admissions():
+    async def scenario():
+        queue = GenerationQueue(max_concurrent=1, max_queued=1)
+        try:
+            first = queue.stream(chunks_of("a"))
+            second = queue.stream(chunks_of("b"))
+            assert queue.stats()["queued"] == 2
+            with pytest.raises(QueueFullError):
+                queue.stream(chunks_of("c"))
+            del first, second
+            gc.collect()
+            assert queue.stats()["queued"] == 0
+
+            chunks = [chunk async for chunk in queue.stream(chunks_of("d", "e"))]
+            assert chunks == ["d", "e"]
+            assert queue.stats()["queued"] == 0
+            assert queue.stats()["running"] == 0
+        finally:
+            queue.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_closing_unstarted_stream_frees_its_admission_and_closes_the_generator():
+    async def scenario():
+        queue = GenerationQueue(max_concurrent=1, max_queued=0)
+        try:
+            generator = chunks_of("a")
+            stream = queue.stream(generator)
+            await stream.aclose()
+            assert queue.stats()["queued"] == 0
+            assert generator.gi_frame is None
+            assert [chunk async for chunk in stream] == []
+            # Admitted again once the first stream was given back
+            assert [chunk async for chunk in queue.stream(chunks_of("b"))] == ["b"]
+        finally:
+            queue.shutdown()
+
+    asyncio.run(scenario())
+
+
+def test_closing_started_stream_frees_its_slot():
+    async def scenario():
+        queue = GenerationQueue(max_concurrent=1, max_queued=0)
+        try:
+            stream = queue.stream(chunks_of("a", "b", "c"))
+            assert await stream.__anext__() == "a"
+            assert queue.stats()["running"] == 1
+            await stream.aclose()
+            assert queue.stats() == {"running": 0, "queued": 0, "max_concurrent": 1, "max_queued": 0}
+        finally:
+            queue.shutdown()
+
+    asyncio.run(scenario())
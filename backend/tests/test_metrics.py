@@ -0,0 +1,99 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from data_generator import _iter_chunks_multiprocessing, compile_plan
+from metrics import ColumnStatsBuffer, MetricsRegistry, registry
+from profiling import profile_mode
+from schema_yaml import load_dataset
+from worker_pool import shutdown_shared_pool, start_shared_pool
+
+
+def test_counters_render_in_the_prometheus_text_format():
+    metrics = MetricsRegistry()
+    metrics.increment("rows_total", 3, "Rows", kind='say "hi"')
+    metrics.increment("rows_total", 2, kind='say "hi"')
+    metrics.increment("seconds_total", 0.25)
+    assert metrics.render({"queue_depth": 4}) == (
+        "# HELP datagen_rows_total Rows\n"
+        "# TYPE datagen_rows_total counter\n"
+        'datagen_rows_total{kind="say \\"hi\\""} 5\n'
+        "# TYPE datagen_seconds_total counter\n"
+        "datagen_seconds_total 0.25\n"
+        "# TYPE datagen_queue_depth gauge\n"
+        "datagen_queue_depth 4\n"
+    )
+
+
+def test_spans_count_stage_calls_and_seconds():
+    metrics = MetricsRegistry()
+
+    @metrics.timed("parse")
+    def parse():
+        pass
+
+    parse()
+    with pytest.raises(ValueError):
+        with metrics.span("parse"):
+            raise ValueError()
+    snapshot = metrics.snapshot()
+    assert snapshot["stage_calls_total"] == {(("stage", "parse"),): 2}
+    assert snapshot["stage_seconds_total"][(("stage", "parse"),)] >= 0
+
+
+def test_column_stats_are_drained_once():
+    buffer = ColumnStatsBuffer()
+    buffer.record("email", 100, generate_seconds=0.5)
+    buffer.record("email", 50, format_seconds=0.25)
+    assert buffer.drain() == {"email": [150, 0.5, 0.25]}
+    assert buffer.drain() == {}
+
+
+def column_rows(kind):
+    return registry.snapshot().get("column_rows_total", {}).get((("kind", kind),), 0)
+
+
+def test_work_done_on_the_worker_pool_is_counted_here():
+    schema = load_dataset("""
+seed: 1
+table_name: t
+rows: 3000
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: amount, type: DOUBLE}
+""").tables[0]
+    plan = compile_plan(schema)
+    before = column_rows("DOUBLE")
+    try:
+        start_shared_pool(2)
+        for _ in _iter_chunks_multiprocessing(0, 3000, plan, 1000, "sql"):
+            pass
+    finally:
+        shutdown_shared_pool()
+    assert column_rows("DOUBLE") - before == 3000
+
+
+def test_metrics_endpoint_exports_counters_and_gauges():
+    registry.increment("test_requests_total")
+    text = TestClient(main.app).get("/api/metrics").text
+    assert "datagen_test_requests_total" in text
+    assert "# TYPE datagen_generation_queue_running gauge\ndatagen_generation_queue_running 0" in text
+    assert "datagen_connection_pool_max_size" in text and "datagen_jobs_running" in text
+
+
+@pytest.mark.parametrize("header, mode", [(None, None), ("1", "sample"), ("cprofile", "cprofile"), ("bogus", None)])
+def test_profile_header_modes(header, mode):
+    assert profile_mode(header) == mode
+
+
+@pytest.mark.parametrize("mode", ["sample", "cprofile"])
+def test_profiled_requests_link_to_their_summary(mode):
+    client = TestClient(main.app)
+    response = client.get("/api/health", headers={"X-Profile": mode})
+    assert response.status_code == 200
+    profile_url = response.headers["x-profile-url"]
+    assert profile_url.endswith(response.headers["x-profile-id"])
+    profile = client.get(profile_url).json()
+    assert profile["finished"] and profile["path"] == "/api/health" and profile["mode"] == mode
+    assert profile["summary"] is not None
+    assert client.get("/api/metrics/profiles/missing").status_code == 404
@@ -0,0 +1,69 @@
+import asyncio
+import re
+
+from fastapi.testclient import TestClient
+
+import main
+from generation_queue import GenerationQueue
+from jobs import JOB_COMPLETED, JobManager
+from writers import iter_output
+
+YAML = """
+table_name: users
+rows: 20000
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: email, type: STRING}
+  - {name: joined, type: DATE}
+"""
+
+
+def value_rows(sql):
+    return re.findall(r"^\s*(\(\d+,.*\))", sql, re.MULTILINE)
+
+
+def test_preview_returns_a_sample_without_starting_a_job():
+    jobs_before = main.job_manager.stats()
+    response = TestClient(main.app).post("/api/preview", json={"yaml_content": YAML})
+    assert response.status_code == 200
+    preview = response.json()
+    assert preview["create_statements"][0].startswith("CREATE TABLE")
+    assert len(value_rows(preview["insert_sql"])) == 5
+    assert "-- Showing first 5 rows (total: 20000 rows)" in preview["insert_sql"]
+    assert isinstance(preview["seed"], int)
+    assert main.job_manager.stats() == jobs_before
+
+
+def test_jobs_with_the_preview_seed_reproduce_the_previewed_rows_and_share_one_generation(tmp_path):
+    preview = TestClient(main.app).post("/api/preview", json={"yaml_content": YAML}).json()
+    dataset = main.load_dataset_from_yaml(YAML, default_seed=preview["seed"])
+
+    async def scenario():
+        queue = GenerationQueue(max_concurrent=1, max_queued=4)
+        manager = JobManager(queue, output_dir=str(tmp_path))
+        try:
+            def writer(schema, progress):
+                return iter_output(schema, "sql", progress=progress)
+
+            job = manager.submit(dataset, "sql", "none", writer, "sql")
+            # Executing and downloading the same seeded data share the job
+            assert manager.submit(main.load_dataset_from_yaml(YAML, default_seed=preview["seed"]), "sql", "none", writer, "sql") is job
+            while not job.finished:
+                await asyncio.sleep(0.05)
+            return job
+        finally:
+            queue.shutdown()
+
+    job = asyncio.run(scenario())
+    assert job.status == JOB_COMPLETED
+    with open(job.tables[0].output_path) as output:
+        generated = value_rows(output.read())
+    assert len(generated) == 20000
+    assert generated[:5] == value_rows(preview["insert_sql"])
+
+
+def test_unseeded_previews_are_pinned_to_different_seeds():
+    client = TestClient(main.app)
+    first, second = (client.post("/api/preview", json={"yaml_content": YAML}).json() for _ in range(2))
+    assert first["seed"] != second["seed"]
+    assert value_rows(first["insert_sql"]) != value_rows(second["insert_sql"])
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+
+from result_cache import PROCESS_DIR_PREFIX, ResultCache
+
+
+def store(cache, key, data):
+    return b"".join(cache.store(key, iter([data])))
+
+
+def test_starting_another_cache_keeps_the_files_of_a_running_one(tmp_path):
+    # Nothing fits in memory, so every output is written to disk
+    first = ResultCache(str(tmp_path), memory_bytes=0)
+    store(first, "a" * 64, b"cached output")
+    reader = first.open("a" * 64)
+
+    second = ResultCache(str(tmp_path), memory_bytes=0)
+    assert second.directory != first.directory
+    assert b"".join(reader) == b"cached output"
+    assert b"".join(first.open("a" * 64)) == b"cached output"
+
+    second.close()
+    assert b"".join(first.open("a" * 64)) == b"cached output"
+    assert not os.path.exists(second.directory)
+    first.close()
+
+
+def test_directories_of_exited_processes_are_removed(tmp_path):
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    orphan = tmp_path / f"{PROCESS_DIR_PREFIX}{exited.pid}-abc"
+    orphan.mkdir()
+    (orphan / "output").write_bytes(b"left behind")
+    unrelated = tmp_path / "other-files"
+    unrelated.mkdir()
+
+    cache = ResultCache(str(tmp_path))
+    assert not orphan.exists()
+    assert unrelated.exists()
+    cache.close()
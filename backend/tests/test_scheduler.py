@@ -0,0 +1,70 @@
+from data_generator import _row_cost, compile_plan
+from metrics import registry
+from scheduler import MIN_TASK_SECONDS, CalibrationCache, RowCost, choose_schedule, fixed_schedule
+from schema_yaml import load_dataset
+
+
+def test_cheap_rows_stay_in_this_process():
+    schedule = choose_schedule(100_000, RowCost(generate_seconds=1e-7, transfer_seconds=1e-7), 4, 4, 10_000, 1000)
+    assert not schedule.parallel and schedule.workers == 1 and schedule.chunk_rows == 10_000
+
+
+def test_costly_rows_go_to_the_pool_in_aligned_chunks():
+    cost = RowCost(generate_seconds=1e-4, transfer_seconds=1e-6)
+    schedule = choose_schedule(1_000_000, cost, 4, 4, 10_000, 1000)
+    assert schedule.parallel and schedule.workers == 4
+    assert schedule.chunk_rows == 10_000
+    assert schedule.estimated_seconds < 1_000_000 * cost.generate_seconds
+
+    # Fewer rows are split so every worker has chunks queued, but no chunk is shorter than MIN_TASK_SECONDS of work
+    schedule = choose_schedule(40_000, cost, 4, 4, 10_000, 1000)
+    assert schedule.parallel and schedule.chunk_rows == 3000
+    assert schedule.chunk_rows * cost.generate_seconds >= MIN_TASK_SECONDS
+
+
+def test_rows_slower_to_receive_than_to_generate_stay_in_this_process():
+    schedule = choose_schedule(1_000_000, RowCost(generate_seconds=1e-5, transfer_seconds=2e-5), 4, 4, 10_000, 1000)
+    assert not schedule.parallel
+
+
+def test_starting_a_pool_is_only_worth_it_for_enough_work():
+    cost = RowCost(generate_seconds=1e-5, transfer_seconds=1e-7)
+    assert choose_schedule(60_000, cost, 4, 4, 10_000, 1000, pool_running=True).parallel
+    assert not choose_schedule(60_000, cost, 4, 4, 10_000, 1000, pool_running=False).parallel
+
+
+def test_fixed_schedule_uses_the_pool_from_the_threshold():
+    assert not fixed_schedule(999, 4, 4, 10_000, 1000, 1000).parallel
+    schedule = fixed_schedule(1_000_000, 4, 4, 10_000, 1000, 1000)
+    assert schedule.parallel and schedule.workers == 4 and schedule.chunk_rows == 10_000
+    assert fixed_schedule(1500, 4, 4, 10_000, 1000, 1000).chunk_rows == 1000
+
+
+def test_calibration_cache_evicts_the_least_recently_used_shape():
+    cache = CalibrationCache(max_entries=2)
+    cost = RowCost(generate_seconds=1e-5, transfer_seconds=1e-6)
+    cache.put("a", cost)
+    cache.put("b", cost)
+    assert cache.get("a") is cost
+    cache.put("c", cost)
+    assert cache.get("b") is None and cache.get("a") is cost and cache.get("c") is cost
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 1}
+
+
+def column_rows_total():
+    return sum(registry.snapshot().get("column_rows_total", {}).values())
+
+
+def test_calibration_rows_are_not_counted_as_generated():
+    schema = load_dataset("""
+table_name: calibrated
+rows: 50000
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: score, type: TINYINT, distribution: {type: zipf, min: 1, max: 90}}
+""").tables[0]
+    plan = compile_plan(schema)
+    rows_before = column_rows_total()
+    cost = _row_cost(schema, plan)
+    assert cost.generate_seconds > 0
+    assert column_rows_total() == rows_before
@@ -0,0 +1,98 @@
+import pytest
+
+from schema_yaml import load_dataset
+
+TABLE = """
+table_name: t
+rows: 10
+columns:
+  - {{name: c, type: '{type}', distribution: {distribution}}}
+"""
+
+
+def parse(column_type, distribution):
+    return load_dataset(TABLE.format(type=column_type, distribution=distribution)).tables[0].columns[0]
+
+
+@pytest.mark.parametrize("column_type, distribution, message", [
+    ("TINYINT", "{type: zipf, max: 400}", "Column c: max 400 is outside the TINYINT range of -128 to 127"),
+    ("SMALLINT", "{type: uniform, min: -40000}", "Column c: min -40000 is outside the SMALLINT range"),
+    ("INT", "{type: normal, mean: 0, stddev: 1, max: 3000000000}", "Column c: max 3000000000 is outside the INT range"),
+    ("DECIMAL(5, 2)", "{type: uniform, min: 0, max: 1000}", "Column c: max 1000 is outside the DECIMAL(5, 2) range"),
+])
+def test_distribution_bounds_outside_the_type_range_are_rejected(column_type, distribution, message):
+    with pytest.raises(ValueError, match=message.replace("(", r"\(").replace(")", r"\)")):
+        parse(column_type, distribution)
+
+
+@pytest.mark.parametrize("column_type, distribution", [
+    ("TINYINT", "{type: zipf, max: 127}"),
+    ("SMALLINT", "{type: uniform, min: -32768, max: 32767}"),
+    ("DECIMAL(5, 2)", "{type: normal, mean: 10, stddev: 2, min: -999.99, max: 999.99}"),
+    ("DOUBLE", "{type: uniform, min: -1.0e+300, max: 1.0e+300}"),
+])
+def test_distribution_bounds_within_the_type_range_are_accepted(column_type, distribution):
+    assert parse(column_type, distribution).distribution is not None
+
+
+APPEND_TABLE = """
+table_name: t
+rows: 100
+append: {{max_key: {max_key}}}
+columns:
+  - {{name: id, type: BIGINT, primary_key: true}}
+  - {{name: u, type: '{type}', unique: true}}
+"""
+
+
+@pytest.mark.parametrize("column_type, max_key, message", [
+    ("TINYINT", 50, "Column u: TINYINT has 128 distinct values, fewer than the 150 rows"),
+    ("VARCHAR(4)", 950, "Column u: VARCHAR\\(4\\) is too short for 1,050 unique values"),
+])
+def test_appended_unique_columns_count_the_existing_rows(column_type, max_key, message):
+    # 100 rows alone fit either type
+    load_dataset(APPEND_TABLE.format(max_key=0, type=column_type))
+    with pytest.raises(ValueError, match=message):
+        load_dataset(APPEND_TABLE.format(max_key=max_key, type=column_type))
+
+
+def test_compile_plan_checks_unique_columns_against_a_watermark_read_later():
+    from data_generator import compile_plan
+    from sqlgen import Watermark
+
+    schema = load_dataset(APPEND_TABLE.format(max_key=0, type="TINYINT")).tables[0]
+    schema.append = Watermark(max_key=50)
+    with pytest.raises(ValueError, match="fewer than the 150 rows"):
+        compile_plan(schema)
+
+
+def test_decimal_bounds_are_capped_at_what_int64_units_hold():
+    with pytest.raises(ValueError, match=r"Column c: min 100000000000000000 is outside the DECIMAL\(20, 2\) range"):
+        parse("DECIMAL(20, 2)", "{type: uniform, min: 100000000000000000, max: 900000000000000000}")
+    assert parse("DECIMAL(20, 2)", "{type: uniform, min: 1000000000000000, max: 9000000000000000}").distribution
+
+
+SEQUENCE_TABLE = """
+table_name: t
+rows: {rows}
+{append}
+columns:
+  - {{name: id, type: BIGINT, primary_key: true}}
+  - {{name: s, type: TINYINT, distribution: {{type: sequence, start: {start}, step: {step}}}}}
+"""
+
+
+@pytest.mark.parametrize("rows, start, step, append", [
+    (10, 100, 5, ""),
+    (200, 0, 1, ""),
+    (10, 0, 1, "append: {max_key: 120}"),
+])
+def test_sequences_running_past_the_type_range_are_rejected(rows, start, step, append):
+    with pytest.raises(ValueError, match="Column s: a sequence from .* outside the TINYINT range of -128 to 127"):
+        load_dataset(SEQUENCE_TABLE.format(rows=rows, start=start, step=step, append=append))
+
+
+def test_sequences_within_the_type_range_are_accepted():
+    # Values 100..124 with their random gaps below 5 stay under 127
+    assert load_dataset(SEQUENCE_TABLE.format(rows=5, start=100, step=5, append="")).tables[0].columns[1].distribution
+    assert load_dataset(SEQUENCE_TABLE.format(rows=128, start=0, step=1, append="")).tables[0].columns[1].distribution
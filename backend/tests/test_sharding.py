@@ -0,0 +1,71 @@
+import json
+import os
+
+import pytest
+
+from schema_yaml import load_dataset
+from sharding import SHARD_MANIFEST_DIR, merge_manifests, parse_shard, run_shard
+from writers import iter_output
+
+DATASET = """
+seed: 4
+tables:
+  - table_name: customers
+    rows: 2345
+    columns:
+      - {name: id, type: BIGINT, primary_key: true}
+      - {name: email, type: STRING}
+      - {name: created_at, type: TIMESTAMP}
+  - table_name: orders
+    rows: 3001
+    columns:
+      - {name: id, type: BIGINT, primary_key: true}
+      - {name: customer_id, type: BIGINT, references: customers.id}
+      - {name: amount, type: 'DECIMAL(10, 2)'}
+"""
+
+
+def generate_shards(output_dir, output_format="ndjson"):
+    for shard in ("0/2", "1/2"):
+        run_shard(load_dataset(DATASET), parse_shard(shard), str(output_dir), output_format)
+
+
+def read_part(output_dir, part):
+    with open(os.path.join(output_dir, part["path"]), "rb") as part_file:
+        return part_file.read()
+
+
+@pytest.mark.parametrize("output_format", ["ndjson", "csv"])
+def test_merged_shards_match_an_unsharded_run_byte_for_byte(tmp_path, output_format):
+    generate_shards(tmp_path, output_format)
+    dataset = load_dataset(DATASET)
+    manifest = merge_manifests(dataset, str(tmp_path))
+
+    assert [table["table_name"] for table in manifest["tables"]] == ["customers", "orders"]
+    for table in manifest["tables"]:
+        assert len(table["parts"]) == 2
+        pieces = [read_part(tmp_path, part) for part in table["parts"]]
+        if output_format == "csv":
+            # Every part starts with the header row; the unsharded file has it once
+            pieces = pieces[:1] + [piece.split(b"\n", 1)[1] for piece in pieces[1:]]
+        unsharded = b"".join(iter_output(dataset.table(table["table_name"]), output_format, "none"))
+        assert b"".join(pieces) == unsharded
+
+
+def test_merge_rejects_parts_of_tables_missing_from_the_schema(tmp_path):
+    generate_shards(tmp_path)
+    manifest_path = os.path.join(tmp_path, SHARD_MANIFEST_DIR, sorted(os.listdir(tmp_path / SHARD_MANIFEST_DIR))[0])
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+    manifest["parts"][0]["table_name"] = "refunds"
+    with open(manifest_path, "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+
+    with pytest.raises(ValueError, match="refunds, which is not in the schema"):
+        merge_manifests(load_dataset(DATASET), str(tmp_path))
+
+
+def test_merge_rejects_missing_shards(tmp_path):
+    run_shard(load_dataset(DATASET), parse_shard("0/2"), str(tmp_path), "ndjson")
+    with pytest.raises(ValueError, match="Table customers: rows 1172-2345 are missing"):
+        merge_manifests(load_dataset(DATASET), str(tmp_path))
@@ -0,0 +1,86 @@
+import os
+from multiprocessing import shared_memory
+
+import pytest
+
+import shared_chunks
+from data_generator import NDJSONEncoder, _iter_encoded_multiprocessing, _iter_encoded_sequential, compile_plan
+from schema_yaml import load_dataset
+from shared_chunks import SHARED_MEMORY_MIN_BYTES, SharedChunk, collect_chunk, discard_chunk, publish_chunk
+from worker_pool import shutdown_shared_pool, start_shared_pool
+from writers import CSVEncoder
+
+LARGE = bytes(range(256)) * (SHARED_MEMORY_MIN_BYTES // 256 + 1)
+
+
+def segments():
+    return {name for name in os.listdir(shared_chunks.SHARED_MEMORY_DIR) if name.startswith("psm_")}
+
+
+def test_small_chunks_travel_as_bytes():
+    assert publish_chunk(b"row\n") == b"row\n"
+    assert collect_chunk(b"row\n") == b"row\n"
+
+
+def test_large_chunks_round_trip_through_shared_memory_and_are_freed():
+    published = publish_chunk(LARGE)
+    assert isinstance(published, SharedChunk) and published.size == len(LARGE)
+    assert collect_chunk(published) == LARGE
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=published.name)
+
+
+def test_discarded_chunks_are_freed():
+    published = publish_chunk(LARGE)
+    discard_chunk(published)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=published.name)
+    # Discarding twice, or discarding plain bytes, does nothing
+    discard_chunk(published)
+    discard_chunk(b"row\n")
+
+
+def test_chunks_stay_bytes_without_room_in_shared_memory(monkeypatch):
+    monkeypatch.setattr(shared_chunks, "SHARED_MEMORY_HEADROOM", 10 ** 15)
+    assert publish_chunk(LARGE) == LARGE
+
+
+SCHEMA = """
+seed: 14
+table_name: t
+rows: 6000
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: email, type: STRING}
+  - {name: note, type: STRING}
+  - {name: price, type: 'DECIMAL(10, 2)'}
+  - {name: seen, type: TIMESTAMP}
+"""
+
+
+@pytest.fixture(scope="module")
+def pool():
+    try:
+        yield start_shared_pool(2)
+    finally:
+        shutdown_shared_pool()
+
+
+@pytest.mark.parametrize("encoder", [NDJSONEncoder(column_names=("id", "email", "note", "price", "seen")), CSVEncoder()])
+def test_chunks_encoded_in_workers_arrive_intact_and_in_order(pool, encoder):
+    plan = compile_plan(load_dataset(SCHEMA).tables[0])
+    before = segments()
+    pooled = list(_iter_encoded_multiprocessing(0, 6000, plan, 2000, encoder))
+    assert pooled == list(_iter_encoded_sequential(0, 6000, plan, 2000, encoder))
+    assert [chunk_end for chunk_end, _ in pooled] == [2000, 4000, 6000]
+    assert max(len(data) for _, data in pooled) >= SHARED_MEMORY_MIN_BYTES
+    assert segments() == before
+
+
+def test_stopping_early_frees_the_chunks_still_in_flight(pool):
+    plan = compile_plan(load_dataset(SCHEMA).tables[0])
+    before = segments()
+    chunks = _iter_encoded_multiprocessing(0, 6000, plan, 1000, CSVEncoder())
+    next(chunks)
+    chunks.close()
+    assert segments() == before
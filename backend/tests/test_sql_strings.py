@@ -0,0 +1,99 @@
+import pytest
+
+from data_generator import STATEMENT_BREAK, InsertValuesEncoder, iter_insert_sql_bytes
+from schema_yaml import load_dataset
+from sqlgen import escape_sql_string, format_sql_strings, quote_sql_string
+
+# Backslash escapes Databricks reads in single-quoted literals
+UNESCAPES = {"\\": "\\", "'": "'", "n": "\n", "r": "\r"}
+
+TRICKY_VALUES = [
+    "plain",
+    "O'Connor",
+    "''",
+    "back\\slash",
+    "trailing\\",
+    "\\'",
+    "two\nlines",
+    "carriage\r\nreturn",
+    "nul\x00char",
+    "x'),\n    ('y",
+    "",
+    "naïve ☃",
+]
+
+
+def read_literals(sql):
+    """Decode every single-quoted string literal of SQL text, in order"""
+    literals = []
+    index = 0
+    while index < len(sql):
+        if sql[index] != "'":
+            index += 1
+            continue
+        index += 1
+        chars = []
+        while sql[index] != "'":
+            if sql[index] == "\\":
+                chars.append(UNESCAPES[sql[index + 1]])
+                index += 2
+            else:
+                chars.append(sql[index])
+                index += 1
+        literals.append("".join(chars))
+        index += 1
+    return literals
+
+
+@pytest.mark.parametrize("value", TRICKY_VALUES)
+def test_quoted_strings_round_trip(value):
+    literal = quote_sql_string(value)
+    assert read_literals(literal) == [value]
+    # No raw line breaks, so a literal never spans the lines statements are split on
+    assert "\n" not in escape_sql_string(value) and "\r" not in escape_sql_string(value)
+
+
+@pytest.mark.parametrize("values", [
+    TRICKY_VALUES,
+    [value for value in TRICKY_VALUES if "\x00" not in value],
+    ["only"],
+    [],
+])
+def test_formatted_columns_match_quoting_each_value(values):
+    assert format_sql_strings(values) == [quote_sql_string(value) for value in values]
+
+
+@pytest.mark.parametrize("statement_rows", [0, 3])
+def test_insert_values_encoder_emits_literals_that_round_trip(statement_rows):
+    cells = format_sql_strings(TRICKY_VALUES)
+    chunk = [(index, (str(index), cell)) for index, cell in enumerate(cells)]
+    encoder = InsertValuesEncoder(first_row_index=0, header="INSERT INTO t (id, s) VALUES", statement_rows=statement_rows)
+    sql = encoder(chunk).decode("utf-8")
+    assert read_literals(sql) == TRICKY_VALUES
+    statements = sql.split(STATEMENT_BREAK)
+    assert len(statements) == (-(-len(TRICKY_VALUES) // statement_rows) if statement_rows else 1)
+
+
+def test_generated_statements_split_between_rows_only():
+    yaml_values = ", ".join('"' + value.replace("\\", "\\\\").replace("\n", "\\n").replace("\r", "\\r")
+                            .replace("\x00", "\\0").replace('"', '\\"') + '"' for value in TRICKY_VALUES if value)
+    schema = load_dataset(f"""
+seed: 11
+table_name: t
+rows: 300
+columns:
+  - {{name: id, type: BIGINT, primary_key: true}}
+  - {{name: s, type: STRING, nullable: false, distribution: {{type: categorical, values: [{yaml_values}]}}}}
+""").tables[0]
+    sql = b"".join(iter_insert_sql_bytes(schema, chunk_size=100, max_rows=40, max_bytes=600)).decode("utf-8")
+    literals = read_literals(sql)
+    assert len(literals) == schema.rows
+    assert set(literals) <= set(TRICKY_VALUES)
+    statements = sql.split(STATEMENT_BREAK)
+    # Split by bytes as well as every 40 rows
+    assert len(statements) > schema.rows // 40
+    for statement in statements:
+        # Every statement is complete on its own: its literals decode and its rows are whole
+        assert statement.lstrip().startswith("INSERT INTO t")
+        assert all(value in TRICKY_VALUES for value in read_literals(statement))
+        assert len(statement.encode("utf-8")) <= 600 + len(STATEMENT_BREAK)
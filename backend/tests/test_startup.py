@@ -0,0 +1,63 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import benchmark
+from connection_pool import ConnectionPool
+from worker_pool import GeneratorPool, worker_context
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def loaded_after(statement):
+    """Whether Faker and the Databricks connector are imported after running statement in a fresh interpreter"""
+    completed = subprocess.run(
+        [sys.executable, "-c", f"import sys; {statement}; "
+         "print('faker' in sys.modules, any(name.startswith('databricks') for name in sys.modules))"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return completed.stdout.split()
+
+
+def test_importing_the_app_loads_neither_faker_nor_the_connector():
+    assert loaded_after("import main") == ["False", "False"]
+
+
+def test_faker_is_imported_by_the_first_generation():
+    assert loaded_after("import main; from worker_pool import get_worker_faker; get_worker_faker()")[0] == "True"
+
+
+def test_connection_errors_are_resolved_on_first_use():
+    resolved = []
+
+    def error_types():
+        resolved.append(True)
+        return (ConnectionError,)
+
+    pool = ConnectionPool(lambda: None, discard_on=error_types, retry_on=error_types)
+    assert resolved == []
+    assert pool.discard_on == (ConnectionError,) and pool.retry_on == (ConnectionError,)
+    assert pool.discard_on == (ConnectionError,)
+    assert len(resolved) == 2
+
+
+def worker_modules(_):
+    # Nothing but the fork server's preload imports worker_preload
+    return "worker_preload" in sys.modules, "faker" in sys.modules
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="the fork server is the default start method on Linux")
+def test_workers_are_forked_from_a_preloaded_server():
+    assert worker_context().get_start_method() == "forkserver"
+    with GeneratorPool(processes=1) as pool:
+        assert list(pool.imap(worker_modules, range(2))) == [(True, True), (True, True)]
+
+
+def test_startup_benchmark_times_a_cold_app():
+    result = benchmark.run_isolated({"benchmark": "startup", "shape": "narrow", "rows": 2000, "processes": 1})
+    assert "error" not in result
+    steps = ["import_seconds", "lifespan_seconds", "first_health_seconds", "first_preview_seconds", "first_generation_seconds"]
+    assert all(result[step] >= 0 for step in steps)
+    assert result["startup_seconds"] >= sum(result[step] for step in steps) * 0.99
@@ -0,0 +1,62 @@
+import json
+import re
+
+from data_generator import INSERT_MAX_ROWS, generate_full_insert_sql, iter_insert_sql, iter_insert_sql_bytes, iter_ndjson
+from schema_yaml import load_dataset
+
+SCHEMA = """
+seed: 4
+table_name: t
+rows: {rows}
+columns:
+  - {{name: id, type: BIGINT, primary_key: true}}
+  - {{name: name, type: STRING}}
+  - {{name: amount, type: 'DECIMAL(10, 2)'}}
+"""
+
+
+def table(rows):
+    return load_dataset(SCHEMA.format(rows=rows)).tables[0]
+
+
+def row_ids(sql):
+    return [int(key) for key in re.findall(r"^\s*\((\d+),", sql, re.MULTILINE)]
+
+
+def test_insert_sql_streams_one_chunk_of_rows_at_a_time_in_row_order():
+    schema = table(2500)
+    progress = []
+    pieces = list(iter_insert_sql(schema, chunk_size=1000, progress=progress.append))
+    assert pieces[0].startswith("INSERT INTO t (") and pieces[-1] == "\n;"
+    assert [len(row_ids(piece)) for piece in pieces[1:-1]] == [1000, 1000, 500]
+    assert progress == [1000, 2000, 2500]
+    assert row_ids("".join(pieces)) == list(range(1, 2501))
+    assert "".join(pieces) == generate_full_insert_sql(schema)
+
+
+def test_streams_only_generate_the_chunks_that_are_read():
+    # Reading the start of a very large table holds one chunk, never the whole output
+    progress = []
+    pieces = iter_ndjson(table(10_000_000), chunk_size=1000, progress=progress.append)
+    first = [json.loads(line)["id"] for line in next(pieces).splitlines()]
+    second = [json.loads(line)["id"] for line in next(pieces).splitlines()]
+    pieces.close()
+    assert first == list(range(1, 1001)) and second == list(range(1001, 2001))
+    assert progress == [1000]
+
+
+def test_row_ranges_stream_the_same_rows_as_the_whole_table():
+    schema = table(3000)
+    whole = list(iter_ndjson(schema, chunk_size=1000))
+    part = list(iter_ndjson(schema, chunk_size=700, start_row=1000, end_row=2000))
+    assert "".join(part) == whole[1]
+
+
+def test_long_inserts_are_split_into_statements_within_the_size_limit():
+    schema = table(3000)
+    sql = b"".join(iter_insert_sql_bytes(schema, chunk_size=1000, max_rows=INSERT_MAX_ROWS, max_bytes=20_000)).decode()
+    statements = sql.split("\n;\n\n")
+    assert len(statements) > 1
+    assert all(len((statement + "\n;").encode()) <= 20_000 for statement in statements)
+    assert all(statement.startswith("INSERT INTO t (") for statement in statements)
+    assert row_ids(sql) == list(range(1, 3001))
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from columnar import INTEGER_RANGES, feistel_key, permute_indexes, sample_unique_integers, unique_uuids
+from data_generator import compile_plan
+from schema_yaml import load_dataset
+from worker_pool import get_worker_faker
+
+KEY = feistel_key(np.array([7, 11], dtype=np.uint64))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 127, 128, 1000, 4097, 65537])
+def test_permutation_is_a_bijection_on_its_domain(size):
+    permuted = permute_indexes(np.arange(size, dtype=np.uint64), size, KEY)
+    assert permuted.dtype == np.uint64
+    assert np.array_equal(np.sort(permuted), np.arange(size, dtype=np.uint64))
+
+
+def test_permutation_depends_on_the_key_only_through_its_round_keys():
+    indexes = np.arange(1000, dtype=np.uint64)
+    other_key = feistel_key(np.array([7, 12], dtype=np.uint64))
+    assert not np.array_equal(permute_indexes(indexes, 1000, KEY), permute_indexes(indexes, 1000, other_key))
+    assert np.array_equal(permute_indexes(indexes, 1000, KEY), permute_indexes(indexes.copy(), 1000, KEY))
+
+
+def test_permutation_of_chunks_matches_the_whole_range():
+    size = 10_000
+    whole = permute_indexes(np.arange(size, dtype=np.uint64), size, KEY)
+    bounds = [0, 1, 999, 1000, 3333, 7001, size]
+    chunks = [permute_indexes(np.arange(start, end, dtype=np.uint64), size, KEY) for start, end in zip(bounds, bounds[1:])]
+    assert np.array_equal(np.concatenate(chunks), whole)
+
+
+@pytest.mark.parametrize("type_name", ["TINYINT", "SMALLINT"])
+def test_unique_integers_fill_small_types_exactly(type_name):
+    low, high = INTEGER_RANGES[type_name]
+    values = sample_unique_integers(0, high - low + 1, low, high, KEY)
+    assert np.array_equal(np.sort(values), np.arange(low, high + 1))
+
+
+def test_unique_bigints_span_the_full_range_without_repeats():
+    low, high = INTEGER_RANGES["BIGINT"]
+    values = np.concatenate([sample_unique_integers(start, 5000, low, high, KEY) for start in (0, 5000, 10**12)])
+    assert values.dtype == np.int64
+    assert len(np.unique(values)) == len(values)
+
+
+def test_unique_uuids_do_not_repeat_across_row_ranges():
+    rng = np.random.default_rng(0)
+    uuids = unique_uuids(rng, 0, 5000, KEY) + unique_uuids(rng, 5000, 5000, KEY)
+    assert len(set(uuids)) == len(uuids)
+    assert all(uuid[14] == "4" and uuid[19] in "89ab" for uuid in uuids)
+
+
+UNIQUE_TABLE = """
+seed: 21
+table_name: t
+rows: 5000
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: small, type: SMALLINT, unique: true, nullable: false}
+  - {name: amount, type: 'DECIMAL(6, 2)', unique: true, nullable: false}
+  - {name: ratio, type: DOUBLE, unique: true, nullable: false}
+  - {name: seen_at, type: TIMESTAMP, unique: true, nullable: false}
+  - {name: email, type: STRING, unique: true, nullable: false}
+  - {name: city, type: 'VARCHAR(40)', unique: true, nullable: false}
+  - {name: uuid, type: STRING, unique: true, nullable: false}
+"""
+
+
+def render(plan, ranges):
+    faker = get_worker_faker()
+    return [values for start, end in ranges for _, values in plan.render_rows(faker, start, end, "python")]
+
+
+def test_unique_columns_stay_distinct_across_chunk_boundaries_and_row_ranges():
+    schema = load_dataset(UNIQUE_TABLE).tables[0]
+    plan = compile_plan(schema)
+    whole = render(plan, [(0, schema.rows)])
+    # Chunks that do not line up with the 1,000-row RNG blocks, generated out of order
+    bounds = [0, 1, 999, 1001, 2500, 4999, schema.rows]
+    ranges = list(zip(bounds, bounds[1:]))
+    parts = {row_range: render(plan, [row_range]) for row_range in reversed(ranges)}
+    assert [row for row_range in ranges for row in parts[row_range]] == whole
+
+    unique_columns = [index for index, col in enumerate(schema.columns) if col.unique or col.primary_key]
+    for index in unique_columns:
+        column = [row[index] for row in whole]
+        assert len(set(column)) == schema.rows, schema.columns[index].name
@@ -0,0 +1,60 @@
+from itertools import count
+
+from data_generator import _generate_rows_sequential, compile_plan
+from schema_yaml import load_dataset
+from value_pools import ValuePoolCache, build_value_pool, value_pool_cache
+
+
+def test_pools_hold_distinct_values_only():
+    values = iter(["a", "b", "a", "c", "b"])
+    assert build_value_pool(lambda: next(values), 5).tolist() == ["a", "b", "c"]
+
+
+def test_pool_cache_builds_each_pool_once_and_evicts_the_least_recently_used():
+    calls = count()
+
+    def producer():
+        return f"value-{next(calls)}"
+
+    cache = ValuePoolCache(max_pools=2)
+    first = cache.get("a", 10, producer)
+    assert len(first) == 10 and cache.get("a", 10, producer) is first
+    assert next(calls) == 10  # Only the miss called the producer
+    cache.get("b", 10, producer)
+    cache.get("a", 10, producer)
+    cache.get("c", 10, producer)
+    assert (cache.hits, cache.misses) == (2, 3)
+    # "b" was least recently used
+    assert cache.get("b", 10, producer) is not None and cache.misses == 4
+
+
+SCHEMA = """
+seed: 9
+table_name: t
+rows: {rows}
+columns:
+  - {{name: id, type: BIGINT, primary_key: true}}
+  - {{name: city, type: STRING, nullable: false}}
+  - {{name: company, type: STRING, nullable: false, value_mode: unique}}
+"""
+
+
+def column_values(rows, value_pool_size):
+    schema = load_dataset(SCHEMA.format(rows=rows)).tables[0]
+    plan = compile_plan(schema, value_pool_size=value_pool_size)
+    rows = _generate_rows_sequential(0, schema.rows, plan, row_format="python")
+    return [values[1] for _, values in rows], [values[2] for _, values in rows]
+
+
+def test_tables_larger_than_a_pool_draw_their_strings_from_it():
+    cities, companies = column_values(2000, 50)
+    assert len(set(cities)) <= 50
+    # value_mode: unique columns keep calling Faker per cell
+    assert len(set(companies)) > 50
+
+
+def test_tables_smaller_than_a_pool_do_not_build_one():
+    misses = value_pool_cache.misses
+    cities, _ = column_values(40, 50)
+    assert value_pool_cache.misses == misses
+    assert len(cities) == 40
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from data_generator import _iter_chunks_multiprocessing, _iter_chunks_sequential, compile_plan
+from schema_yaml import load_dataset
+from worker_pool import GeneratorPool, get_shared_pool, shutdown_shared_pool, start_shared_pool
+
+
+def worker_pid(task):
+    return task, os.getpid()
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with GeneratorPool(processes=2, chunks_per_worker=2) as pool:
+        yield pool
+
+
+def test_imap_keeps_task_order_across_windows(pool):
+    results = list(pool.imap(worker_pid, range(25)))
+    assert [task for task, _ in results] == list(range(25))
+    assert pool.stats() == {"processes": 2, "chunks_in_flight": 0}
+
+
+def test_workers_are_reused_by_later_requests(pool):
+    first = {pid for _, pid in pool.imap(worker_pid, range(20))}
+    second = {pid for _, pid in pool.imap(worker_pid, range(20))}
+    assert os.getpid() not in first
+    # No worker was started for the second request
+    assert len(first | second) <= pool.processes
+
+
+def test_closing_an_iteration_early_discards_the_submitted_results(pool):
+    discarded = []
+    results = pool.imap(worker_pid, range(20), discard=discarded.append)
+    assert next(results)[0] == 0
+    results.close()
+    # Both windows of chunk_count tasks were in flight; everything but the result handed back is discarded
+    assert sorted(task for task, _ in discarded) == list(range(1, 8))
+    assert pool.stats()["chunks_in_flight"] == 0
+
+
+def test_the_shared_pool_is_started_once_and_generates_the_same_rows():
+    schema = load_dataset("""
+seed: 6
+table_name: t
+rows: 5000
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: city, type: STRING}
+  - {name: amount, type: DOUBLE}
+""").tables[0]
+    plan = compile_plan(schema)
+    try:
+        shared = start_shared_pool(2)
+        assert start_shared_pool(2) is shared and get_shared_pool() is shared
+        pooled = [row for chunk in _iter_chunks_multiprocessing(0, 5000, plan, 1000, "sql") for row in chunk]
+    finally:
+        shutdown_shared_pool()
+    assert get_shared_pool() is None
+    assert pooled == [row for chunk in _iter_chunks_sequential(0, 5000, plan, 5000, "sql") for row in chunk]
+
+
+def test_a_pool_that_is_not_running_refuses_work():
+    with pytest.raises(RuntimeError, match="not running"):
+        next(GeneratorPool(processes=1).imap(worker_pid, range(1)))
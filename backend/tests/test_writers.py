@@ -0,0 +1,69 @@
+import csv
+import io
+import json
+from decimal import Decimal
+
+import pytest
+
+from schema_yaml import load_dataset
+from writers import iter_output
+
+SCHEMA = """
+seed: 11
+table_name: t
+rows: 1500
+columns:
+  - {name: id, type: BIGINT, primary_key: true}
+  - {name: name, type: STRING}
+  - {name: flag, type: BOOLEAN}
+  - {name: small, type: SMALLINT}
+  - {name: ratio, type: DOUBLE}
+  - {name: created, type: TIMESTAMP}
+  - {name: day, type: DATE}
+  - {name: price, type: 'DECIMAL(10, 2)'}
+  - {name: rate, type: 'DECIMAL(38, 18)', nullable: false, distribution: {type: uniform, min: -10000, max: 10000}}
+  - {name: total, type: 'DECIMAL(20, 2)', nullable: false, distribution: {type: uniform, min: 1000000000000000, max: 9000000000000000}}
+"""
+
+
+def read_parquet(schema):
+    import pyarrow.parquet as pq
+
+    return pq.read_table(io.BytesIO(b"".join(iter_output(schema, "parquet", chunk_size=1000)))).to_pylist()
+
+
+def test_parquet_csv_and_ndjson_writers_agree_on_values():
+    pytest.importorskip("pyarrow")
+    schema = load_dataset(SCHEMA).tables[0]
+    parquet_rows = read_parquet(schema)
+    csv_rows = list(csv.DictReader(io.StringIO(b"".join(iter_output(schema, "csv", chunk_size=1000)).decode())))
+    ndjson_rows = [json.loads(line) for line in b"".join(iter_output(schema, "ndjson", chunk_size=1000)).decode().splitlines()]
+    assert len(parquet_rows) == len(csv_rows) == len(ndjson_rows) == schema.rows
+
+    for parquet_row, csv_row, ndjson_row in zip(parquet_rows, csv_rows, ndjson_rows):
+        for name, value in parquet_row.items():
+            if value is None:
+                assert csv_row[name] == "" and ndjson_row[name] is None
+            elif isinstance(value, bool):
+                assert csv_row[name] == str(value).lower() and ndjson_row[name] is value
+            elif isinstance(value, Decimal):
+                if name != "total":  # Text output carries decimals as floats, which round the largest ones
+                    assert Decimal(csv_row[name]) == value and Decimal(str(ndjson_row[name])) == value
+            elif name == "created":
+                assert csv_row[name] == ndjson_row[name] == value.strftime("%Y-%m-%d %H:%M:%S")
+            elif name == "day":
+                assert csv_row[name] == ndjson_row[name] == value.isoformat()
+            elif isinstance(value, float):
+                assert float(csv_row[name]) == ndjson_row[name] == value
+            else:
+                assert csv_row[name] == str(ndjson_row[name]) == str(value)
+
+
+def test_parquet_decimals_match_their_sql_literals_exactly():
+    pytest.importorskip("pyarrow")
+    schema = load_dataset(SCHEMA).tables[0]
+    sql = b"".join(iter_output(schema, "sql", chunk_size=1000)).decode()
+    for row in read_parquet(schema)[:50]:
+        # DECIMAL(38, 18) values hold six random digits, padded with zeros rather than float noise
+        assert row["rate"] == row["rate"].quantize(Decimal("1e-6"))
+        assert f", {row['rate']}, {row['total']})" in sql
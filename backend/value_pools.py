@@ -0,0 +1,57 @@
+from typing import Callable, Hashable
+from collections import OrderedDict
+import os
+import threading
+import numpy as np
+
+# Number of distinct values pre-generated per contextual kind and locale
+DEFAULT_POOL_SIZE = int(os.getenv("VALUE_POOL_SIZE", "10000"))
+
+# Maximum number of pools kept per process before the least recently used one is evicted
+DEFAULT_MAX_POOLS = int(os.getenv("VALUE_POOL_MAX_POOLS", "64"))
+
+
+def build_value_pool(producer: Callable[[], str], pool_size: int) -> np.ndarray:
+    """Pre-generate up to pool_size distinct values from a producer"""
+    # Small domains (states, statuses, ...) simply end up with fewer distinct values
+    distinct_values = dict.fromkeys(producer() for _ in range(pool_size))
+    return np.array(list(distinct_values), dtype=object)
+
+
+class ValuePoolCache:
+    """LRU cache of pre-generated value pools, keyed by locale and contextual kind"""
+
+    def __init__(self, max_pools: int = DEFAULT_MAX_POOLS):
+        self.max_pools = max_pools
+        self.hits = 0
+        self.misses = 0
+        self._pools: "OrderedDict[Hashable, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, pool_size: int, producer: Callable[[], str]) -> np.ndarray:
+        """Returns the pool for key, building it from producer on a miss"""
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is not None:
+                self._pools.move_to_end(key)
+                self.hits += 1
+                return pool
+
+        # Build outside the lock so other kinds are not blocked while Faker runs
+        pool = build_value_pool(producer, pool_size)
+
+        with self._lock:
+            self.misses += 1
+            self._pools[key] = pool
+            self._pools.move_to_end(key)
+            while len(self._pools) > self.max_pools:
+                self._pools.popitem(last=False)
+        return pool
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pools.clear()
+
+
+# Pools owned by the current process (each worker process builds its own)
+value_pool_cache = ValuePoolCache()
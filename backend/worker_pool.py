@@ -0,0 +1,181 @@
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional
+from itertools import islice
+import multiprocessing as mp
+import os
+import threading
+
+from metrics import column_stats
+
+if TYPE_CHECKING:
+    from faker import Faker
+
+# Default number of chunks queued per worker process
+DEFAULT_CHUNKS_PER_WORKER = 2
+
+# Locale of every Faker instance; only this locale's providers are loaded
+FAKER_LOCALE = os.getenv("FAKER_LOCALE", "en_US")
+
+# How worker processes are started. The fork server is a clean single-threaded process that has already imported
+# the generator and built Faker (see worker_preload), so each worker is forked from it ready to go, without copying
+# the web process's threads and memory; platforms without it fall back to their default
+WORKER_START_METHOD = os.getenv("GENERATOR_START_METHOD", "forkserver")
+
+# Modules the fork server imports before forking any worker
+FORKSERVER_PRELOAD = ["worker_preload"]
+
+# Faker instances owned by the current thread; generation reseeds them, so threads must not share one
+_worker_state = threading.local()
+
+
+def _init_worker() -> None:
+    """Pool initializer: build the worker's Faker instance once instead of once per chunk"""
+    get_worker_faker()
+    # Forked workers inherit the parent's unreported column timings; only their own work is reported back
+    column_stats.drain()
+
+
+def get_worker_faker() -> "Faker":
+    """Returns the Faker instance of the current worker process or thread"""
+    worker_fake = getattr(_worker_state, "faker", None)
+    if worker_fake is None:
+        # Imported on first use: the web process does not need Faker until it generates something
+        from faker import Faker
+
+        # Threads and processes not started by GeneratorPool build theirs on first use
+        worker_fake = _worker_state.faker = Faker(FAKER_LOCALE)
+    return worker_fake
+
+
+def worker_context():
+    """Multiprocessing context worker processes are started with"""
+    if WORKER_START_METHOD not in mp.get_all_start_methods():
+        return mp.get_context()
+    context = mp.get_context(WORKER_START_METHOD)
+    if WORKER_START_METHOD == "forkserver":
+        context.set_forkserver_preload(FORKSERVER_PRELOAD)
+    return context
+
+
+class GeneratorPool:
+    """Long-lived process pool shared across generation requests"""
+
+    def __init__(self, processes: Optional[int] = None, chunks_per_worker: int = DEFAULT_CHUNKS_PER_WORKER):
+        self.processes = processes or mp.cpu_count()
+        self.chunks_per_worker = chunks_per_worker
+        self._pool = None
+        self._in_flight = 0  # Chunks submitted to the workers and not yet handed back
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._pool is not None
+
+    @property
+    def chunk_count(self) -> int:
+        """Number of chunks a dataset is split into so that every worker stays busy"""
+        return self.processes * self.chunks_per_worker
+
+    def start(self) -> "GeneratorPool":
+        """Start the worker processes; each one builds its Faker instance in the initializer"""
+        if self._pool is None:
+            self._pool = worker_context().Pool(processes=self.processes, initializer=_init_worker)
+        return self
+
+    def shutdown(self) -> None:
+        """Stop the worker processes and wait for them to exit"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def imap(self, func: Callable, tasks: Iterable, discard: Optional[Callable[[Any], None]] = None) -> Iterator:
+        """Ordered imap over tasks that keeps at most two windows of chunk_count tasks in flight
+
+        When the iteration is closed early, discard (if given) is called with the result of every task
+        already submitted, for results that hold resources such as shared memory segments.
+        """
+        if self._pool is None:
+            raise RuntimeError("Generator pool is not running")
+
+        task_iterator = iter(tasks)
+        outstanding = 0
+        current = following = None
+
+        def submit(window: List) -> Iterator:
+            nonlocal outstanding
+            outstanding += len(window)
+            self._track_in_flight(len(window))
+            return self._pool.imap(func, window)
+
+        try:
+            current = submit(list(islice(task_iterator, self.chunk_count)))
+            while True:
+                # Queue the next window before draining the current one so the workers never sit idle
+                next_window = list(islice(task_iterator, self.chunk_count))
+                following = submit(next_window) if next_window else None
+                for result in current:
+                    outstanding -= 1
+                    self._track_in_flight(-1)
+                    yield result
+                if following is None:
+                    return
+                current = following
+        finally:
+            if discard is not None and outstanding:
+                for results in (current, following):
+                    if results is not None:
+                        _drain(results, discard)
+            # Chunks of an abandoned iteration no longer count as queued work
+            self._track_in_flight(-outstanding)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"processes": self.processes if self.running else 0, "chunks_in_flight": self._in_flight}
+
+    def _track_in_flight(self, change: int) -> None:
+        with self._lock:
+            self._in_flight += change
+
+    def __enter__(self) -> "GeneratorPool":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+
+def _drain(results: Iterator, discard: Callable[[Any], None]) -> None:
+    """Wait for the remaining results of an imap window and hand each one to discard"""
+    while True:
+        try:
+            result = next(results)
+        except StopIteration:
+            return
+        except Exception:
+            # A failed task has no result to discard
+            continue
+        discard(result)
+
+
+# Pool shared by the whole app, started and stopped with the FastAPI app lifespan
+_shared_pool: Optional[GeneratorPool] = None
+
+
+def start_shared_pool(processes: Optional[int] = None, chunks_per_worker: int = DEFAULT_CHUNKS_PER_WORKER) -> GeneratorPool:
+    """Start the app-wide generator pool"""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = GeneratorPool(processes, chunks_per_worker).start()
+    return _shared_pool
+
+
+def get_shared_pool() -> Optional[GeneratorPool]:
+    """Returns the app-wide generator pool, or None when it has not been started"""
+    return _shared_pool
+
+
+def shutdown_shared_pool() -> None:
+    """Stop the app-wide generator pool"""
+    global _shared_pool
+    if _shared_pool is not None:
+        _shared_pool.shutdown()
+        _shared_pool = None
@@ -0,0 +1,15 @@
+"""Imported by the generator pool's fork server before it forks any worker
+
+Workers are forked from the server with the generator modules already imported and Faker already built for the
+configured locale, so a new worker is ready for its first chunk without importing anything itself.
+"""
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import data_generator  # noqa: F401
+import writers  # noqa: F401
+from worker_pool import get_worker_faker
+
+# Built on the fork server's main thread, which is the thread every worker is forked from
+get_worker_faker()
@@ -0,0 +1,261 @@
+from typing import Callable, Dict, Iterator, List, Optional
+from dataclasses import dataclass
+import csv
+import io
+import zlib
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from sqlgen import TableSchema, parse_column_type
+from data_generator import (
+    STREAM_CHUNK_SIZE,
+    ChunkEncoder,
+    RowChunk,
+    iter_encoded_chunks,
+    iter_insert_sql_bytes,
+    iter_ndjson_bytes,
+    iter_row_chunks,
+)
+
+# Stream compression applied to text formats; Parquet uses it as its internal column codec instead
+COMPRESSIONS = ("none", "gzip", "zstd")
+
+# gzip output is flushed per chunk at this level (6 is zlib's default speed/size trade-off)
+GZIP_LEVEL = 6
+
+Progress = Optional[Callable[[int], None]]
+
+
+class OutputWriter:
+    """Encodes the chunked row stream of a schema into one output format"""
+    extension = ""
+    media_type = "application/octet-stream"
+    compresses_internally = False  # True when the format applies compression itself instead of a stream codec
+
+    def iter_bytes(self, schema: TableSchema, compression: str = "none", chunk_size: int = STREAM_CHUNK_SIZE,
+                   progress: Progress = None, start_row: int = 0, end_row: Optional[int] = None) -> Iterator[bytes]:
+        raise NotImplementedError
+
+
+class TextWriter(OutputWriter):
+    """Writer for UTF-8 text formats, optionally stream-compressed
+
+    Chunks are encoded by the workers that generate them, so the rows reach this process as finished bytes.
+    """
+
+    def iter_encoded(self, schema: TableSchema, chunk_size: int, progress: Progress, start_row: int, end_row: Optional[int]) -> Iterator[bytes]:
+        raise NotImplementedError
+
+    def iter_bytes(self, schema: TableSchema, compression: str = "none", chunk_size: int = STREAM_CHUNK_SIZE,
+                   progress: Progress = None, start_row: int = 0, end_row: Optional[int] = None) -> Iterator[bytes]:
+        yield from compress_stream(self.iter_encoded(schema, chunk_size, progress, start_row, end_row), compression)
+
+
+class SQLWriter(TextWriter):
+    extension = "sql"
+    media_type = "application/sql"
+
+    def iter_encoded(self, schema: TableSchema, chunk_size: int, progress: Progress, start_row: int, end_row: Optional[int]) -> Iterator[bytes]:
+        return iter_insert_sql_bytes(schema, chunk_size, progress=progress, start_row=start_row, end_row=end_row)
+
+
+@dataclass(frozen=True)
+class CSVEncoder(ChunkEncoder):
+    """Rows as CSV lines; NULL is written as an empty field, booleans as true/false like Spark's CSV writer"""
+    row_format = "python"
+    stage = "csv_encoding"
+
+    def __call__(self, chunk: RowChunk) -> bytes:
+        return encode_csv_rows(
+            ["" if value is None else ("true" if value else "false") if isinstance(value, bool) else value for value in row_values]
+            for _, row_values in chunk
+        ).encode("utf-8")
+
+
+def encode_csv_rows(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue()
+
+
+class CSVWriter(TextWriter):
+    extension = "csv"
+    media_type = "text/csv"
+
+    def iter_encoded(self, schema: TableSchema, chunk_size: int, progress: Progress, start_row: int, end_row: Optional[int]) -> Iterator[bytes]:
+        yield encode_csv_rows([[col.name for col in schema.columns]]).encode("utf-8")
+        yield from iter_encoded_chunks(schema, CSVEncoder(), chunk_size, progress, start_row, end_row)
+
+
+class NDJSONWriter(TextWriter):
+    extension = "ndjson"
+    media_type = "application/x-ndjson"
+
+    def iter_encoded(self, schema: TableSchema, chunk_size: int, progress: Progress, start_row: int, end_row: Optional[int]) -> Iterator[bytes]:
+        return iter_ndjson_bytes(schema, chunk_size, progress=progress, start_row=start_row, end_row=end_row)
+
+
+class ParquetWriter(OutputWriter):
+    """Parquet via pyarrow, one row group per chunk, flushed to the stream as each row group is written"""
+    extension = "parquet"
+    media_type = "application/vnd.apache.parquet"
+    compresses_internally = True
+
+    def iter_bytes(self, schema: TableSchema, compression: str = "none", chunk_size: int = STREAM_CHUNK_SIZE,
+                   progress: Progress = None, start_row: int = 0, end_row: Optional[int] = None) -> Iterator[bytes]:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        arrow_schema = pa.schema([(col.name, arrow_type(col.type)) for col in schema.columns])
+        sink = _DrainableSink()
+        with pq.ParquetWriter(sink, arrow_schema, compression=compression) as writer:
+            for chunk in iter_row_chunks(schema, chunk_size, row_format="arrow", progress=progress,
+                                         start_row=start_row, end_row=end_row):
+                columns = list(zip(*(row_values for _, row_values in chunk)))
+                writer.write_table(pa.Table.from_arrays(
+                    [_arrow_array(values, field.type) for values, field in zip(columns, arrow_schema)],
+                    schema=arrow_schema
+                ))
+                yield sink.drain()
+        # Closing the writer appends the footer
+        yield sink.drain()
+
+
+def arrow_type(column_type: str):
+    """Arrow type a column is written as in Parquet output"""
+    import pyarrow as pa
+
+    parsed = parse_column_type(column_type)
+    if parsed.name == "BIGINT":
+        return pa.int64()
+    if parsed.name == "INT":
+        return pa.int32()
+    if parsed.name == "SMALLINT":
+        return pa.int16()
+    if parsed.name == "TINYINT":
+        return pa.int8()
+    if parsed.name == "BOOLEAN":
+        return pa.bool_()
+    if parsed.name == "DOUBLE":
+        return pa.float64()
+    if parsed.name == "DECIMAL":
+        return pa.decimal128(parsed.precision, parsed.scale)
+    if parsed.name == "DATE":
+        return pa.date32()
+    if parsed.name == "TIMESTAMP":
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def _arrow_array(values, target_type):
+    """Builds an Arrow array from generated "arrow" row values, parsing temporal and decimal strings with Arrow casts"""
+    import pyarrow as pa
+    import pyarrow.types as types
+
+    if types.is_timestamp(target_type) or types.is_date(target_type) or types.is_decimal(target_type):
+        return pa.array(values, type=pa.string()).cast(target_type)
+    return pa.array(values, type=target_type)
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file object that hands out what has been written since the last drain"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._parts.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def compress_stream(pieces: Iterator[bytes], compression: str) -> Iterator[bytes]:
+    """Compresses a byte stream piece by piece, so the whole output never has to be held in memory"""
+    if compression == "none":
+        yield from pieces
+        return
+
+    if compression == "gzip":
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    elif compression == "zstd":
+        import zstandard
+        compressor = zstandard.ZstdCompressor().compressobj()
+    else:
+        raise ValueError(f"Unsupported compression '{compression}', expected one of: {', '.join(COMPRESSIONS)}")
+
+    for piece in pieces:
+        compressed = compressor.compress(piece)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _pyarrow_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _zstandard_available() -> bool:
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+# Output writers by format name; Parquet is only offered when pyarrow is installed
+OUTPUT_WRITERS: Dict[str, OutputWriter] = {
+    "sql": SQLWriter(),
+    "csv": CSVWriter(),
+    "ndjson": NDJSONWriter(),
+}
+if _pyarrow_available():
+    OUTPUT_WRITERS["parquet"] = ParquetWriter()
+
+# File suffix and media type of each stream compression
+COMPRESSION_SUFFIXES = {"gzip": ("gz", "application/gzip"), "zstd": ("zst", "application/zstd")}
+
+
+def get_writer(output_format: str, compression: str = "none") -> OutputWriter:
+    """Look up the writer for a format, validating the requested compression"""
+    writer = OUTPUT_WRITERS.get(output_format)
+    if writer is None:
+        raise ValueError(f"Unsupported format '{output_format}', expected one of: {', '.join(OUTPUT_WRITERS)}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unsupported compression '{compression}', expected one of: {', '.join(COMPRESSIONS)}")
+    if compression == "zstd" and not writer.compresses_internally and not _zstandard_available():
+        raise ValueError("zstd compression requires the zstandard package")
+    return writer
+
+
+def output_file_info(output_format: str, compression: str = "none"):
+    """File extension and media type of a format written with the given compression"""
+    writer = get_writer(output_format, compression)
+    if compression == "none" or writer.compresses_internally:
+        return writer.extension, writer.media_type
+    suffix, media_type = COMPRESSION_SUFFIXES[compression]
+    return f"{writer.extension}.{suffix}", media_type
+
+
+def iter_output(schema: TableSchema, output_format: str, compression: str = "none", chunk_size: int = STREAM_CHUNK_SIZE,
+                progress: Progress = None, start_row: int = 0, end_row: Optional[int] = None) -> Iterator[bytes]:
+    """Yields the schema's generated rows encoded in output_format, chunk by chunk, optionally for a row range only"""
+    return get_writer(output_format, compression).iter_bytes(schema, compression, chunk_size, progress, start_row, end_row)
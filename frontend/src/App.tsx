@@ -15,10 +15,61 @@ interface GenerateFromYAMLResponse {
   success: boolean
   create_sql?: string
   insert_sql?: string
-  full_insert_sql?: string
   error?: string
 }
 
+interface JobTableStatus {
+  table_name: string
+  rows_done: number
+  total_rows: number
+  output_bytes: number
+  result_url: string
+}
+
+interface JobStatus {
+  job_id: string
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled'
+  format: string
+  rows_done: number
+  total_rows: number
+  rows_per_second?: number
+  eta_seconds?: number
+  output_bytes: number
+  error?: string
+  result_url?: string
+  tables: JobTableStatus[]
+}
+
+// One line of the /api/bulk-load NDJSON stream: progress after a batch, then a final success or error line
+interface BulkLoadLine {
+  table_name?: string
+  stage?: 'insert' | 'staged' | 'copy'
+  rows_loaded?: number
+  total_rows?: number
+  success?: boolean
+  error?: string
+}
+
+interface PreviewResponse extends GenerateFromYAMLResponse {
+  create_statements?: string[]
+  seed?: number
+}
+
+interface CreateJobResponse extends PreviewResponse {
+  job?: JobStatus
+}
+
+// Milliseconds between job progress polls
+const JOB_POLL_INTERVAL = 1000
+
+// Downloads are gzip-compressed by the server; the browser can resume them since the server answers byte ranges
+const DOWNLOAD_COMPRESSION = 'gzip'
+
+const isJobActive = (job: JobStatus | null) => job?.status === 'queued' || job?.status === 'running'
+
+// Rows per INSERT statement of a server-side load
+const LOAD_BATCH_SIZE = 1000
+
 function App() {
   
 
@@ -50,11 +101,15 @@ columns:
     type: TIMESTAMP
     nullable: false`)
   const [generateLoading, setGenerateLoading] = useState(false)
-  const [generatedSQL, setGeneratedSQL] = useState<GenerateFromYAMLResponse | null>(null)
+  const [generatedSQL, setGeneratedSQL] = useState<PreviewResponse | null>(null)
+  const [previewedYaml, setPreviewedYaml] = useState('')
+  const [job, setJob] = useState<JobStatus | null>(null)
+  const [downloadLoading, setDownloadLoading] = useState(false)
   const [createLoading, setCreateLoading] = useState(false)
   const [insertLoading, setInsertLoading] = useState(false)
   const [createResponse, setCreateResponse] = useState<SQLQueryResponse | null>(null)
   const [insertResponse, setInsertResponse] = useState<SQLQueryResponse | null>(null)
+  const [loadProgress, setLoadProgress] = useState<BulkLoadLine | null>(null)
 
 
 
@@ -71,9 +126,11 @@ columns:
 
     setGenerateLoading(true)
     setGeneratedSQL(null)
+    setJob(null)
 
     try {
-      const response = await fetch('/api/generate-from-yaml', {
+      // Only the CREATE statements and a few sample rows; the full data is generated when it is first needed
+      const response = await fetch('/api/preview', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
@@ -81,8 +138,18 @@ columns:
         body: JSON.stringify({ yaml_content: yamlContent }),
       })
 
-      const result: GenerateFromYAMLResponse = await response.json()
+      if (!response.ok) {
+        const detail = await response.json()
+        setGeneratedSQL({
+          success: false,
+          error: detail.detail || `Request failed with status ${response.status}`
+        })
+        return
+      }
+
+      const result: PreviewResponse = await response.json()
       setGeneratedSQL(result)
+      setPreviewedYaml(yamlContent)
     } catch (error) {
       setGeneratedSQL({
         success: false,
@@ -93,6 +160,53 @@ columns:
     }
   }
 
+  // Generate the full data of the previewed schema, with the preview's seed so it contains the previewed rows.
+  // The server hands back the existing job when the same schema and seed were already generated.
+  const ensureJob = async (): Promise<JobStatus> => {
+    if (job?.status === 'completed') return job
+
+    const response = await fetch('/api/jobs', {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+      },
+      body: JSON.stringify({ yaml_content: previewedYaml, format: 'sql', seed: generatedSQL?.seed }),
+    })
+    const result: CreateJobResponse = await response.json()
+    if (!response.ok || !result.job) {
+      throw new Error(result.error || (result as { detail?: string }).detail || `Request failed with status ${response.status}`)
+    }
+
+    // Poll the job until it finishes instead of holding one long request open
+    let status: JobStatus = result.job
+    setJob(status)
+    while (isJobActive(status)) {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL))
+      const statusResponse = await fetch(`/api/jobs/${status.job_id}`)
+      status = await statusResponse.json()
+      setJob(status)
+    }
+    return status
+  }
+
+  // Run statements one at a time (the warehouse executes a single statement per request), stopping at the first failure
+  const executeStatements = async (statements: string[]): Promise<SQLQueryResponse> => {
+    let result: SQLQueryResponse = { success: false, message: 'Execution failed', error: 'No SQL to execute' }
+    for (const statement of statements) {
+      const response = await fetch('/api/execute-sql', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ query: statement }),
+      })
+
+      result = await response.json()
+      if (!result.success) break
+    }
+    return result
+  }
+
   const executeCreateSQL = async () => {
     if (!generatedSQL?.create_sql) {
       setCreateResponse({
@@ -107,15 +221,8 @@ columns:
     setCreateResponse(null)
 
     try {
-      const response = await fetch('/api/execute-sql', {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({ query: generatedSQL.create_sql }),
-      })
-
-      const result: SQLQueryResponse = await response.json()
+      // Multi-table schemas come with one CREATE statement per table, parents first
+      const result = await executeStatements(generatedSQL.create_statements || [generatedSQL.create_sql])
       setCreateResponse(result)
     } catch (error) {
       setCreateResponse({
@@ -129,10 +236,7 @@ columns:
   }
 
   const executeInsertSQL = async () => {
-    // Use full_insert_sql for execution, fallback to insert_sql if not available
-    const sqlToExecute = generatedSQL?.full_insert_sql || generatedSQL?.insert_sql;
-    
-    if (!sqlToExecute) {
+    if (!generatedSQL?.insert_sql) {
       setInsertResponse({
         success: false,
         message: 'Execution failed',
@@ -143,23 +247,59 @@ columns:
 
     setInsertLoading(true)
     setInsertResponse(null)
+    setLoadProgress(null)
 
     try {
-      const response = await fetch('/api/execute-sql', {
+      // The server generates the rows and loads them batch by batch, parents first, reporting progress as NDJSON;
+      // the preview's seed makes the loaded rows match the previewed ones
+      const response = await fetch('/api/bulk-load', {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ query: sqlToExecute }),
+        body: JSON.stringify({
+          yaml_content: previewedYaml,
+          seed: generatedSQL.seed,
+          method: 'multirow',
+          batch_size: LOAD_BATCH_SIZE,
+        }),
       })
-
-      const result: SQLQueryResponse = await response.json()
-      setInsertResponse(result)
+      if (!response.ok || !response.body) {
+        const detail = await response.json().catch(() => ({}))
+        throw new Error(detail.detail || `Request failed with status ${response.status}`)
+      }
+
+      const reader = response.body.getReader()
+      const decoder = new TextDecoder()
+      let buffered = ''
+      let last: BulkLoadLine | null = null
+      for (;;) {
+        const { value, done } = await reader.read()
+        if (done) break
+        buffered += decoder.decode(value, { stream: true })
+        const lines = buffered.split('\n')
+        buffered = lines.pop() ?? ''
+        for (const line of lines) {
+          if (!line.trim()) continue
+          last = JSON.parse(line) as BulkLoadLine
+          if (last.success === undefined) setLoadProgress(last)
+        }
+      }
+
+      if (last?.success) {
+        setInsertResponse({ success: true, message: `Loaded ${(last.rows_loaded ?? 0).toLocaleString()} rows` })
+      } else {
+        setInsertResponse({
+          success: false,
+          message: 'INSERT execution failed',
+          error: last?.error || 'The load ended without reporting a result'
+        })
+      }
     } catch (error) {
       setInsertResponse({
         success: false,
         message: 'INSERT execution failed',
-        error: `Network error: ${error}`
+        error: `${error}`
       })
     } finally {
       setInsertLoading(false)
@@ -180,18 +320,53 @@ columns:
     URL.revokeObjectURL(url)
   }
 
-  const downloadInsertSQL = () => {
-    if (!generatedSQL?.full_insert_sql) return
-    
-    const blob = new Blob([generatedSQL.full_insert_sql], { type: 'text/sql' })
-    const url = URL.createObjectURL(blob)
-    const link = document.createElement('a')
-    link.href = url
-    link.download = 'insert_data.sql'
-    document.body.appendChild(link)
-    link.click()
-    document.body.removeChild(link)
-    URL.revokeObjectURL(url)
+  const downloadInsertSQL = async () => {
+    if (!generatedSQL?.success) return
+
+    setDownloadLoading(true)
+    try {
+      const fullData = await ensureJob()
+      if (fullData.status !== 'completed') return
+
+      // Link straight to each table's output file, so the browser streams it to disk instead of holding it in memory
+      for (const table of fullData.tables) {
+        const link = document.createElement('a')
+        link.href = `${table.result_url}&compression=${DOWNLOAD_COMPRESSION}`
+        link.download = `${table.table_name}.sql.gz`
+        document.body.appendChild(link)
+        link.click()
+        document.body.removeChild(link)
+      }
+    } catch (error) {
+      console.error('Failed to generate the full data', error)
+    } finally {
+      setDownloadLoading(false)
+    }
+  }
+
+  const cancelJob = async () => {
+    if (!isJobActive(job)) return
+
+    try {
+      const response = await fetch(`/api/jobs/${job!.job_id}`, { method: 'DELETE' })
+      setJob(await response.json())
+    } catch (error) {
+      console.error('Failed to cancel job', error)
+    }
+  }
+
+  const formatLoadProgress = (progress: BulkLoadLine) => {
+    const table = progress.table_name ? `${progress.table_name}: ` : ''
+    const stage = progress.stage === 'staged' ? 'staged' : 'loaded'
+    return `${table}${(progress.rows_loaded ?? 0).toLocaleString()} / ${(progress.total_rows ?? 0).toLocaleString()} rows ${stage}`
+  }
+
+  const formatJobProgress = (status: JobStatus) => {
+    const progress = `${status.rows_done.toLocaleString()} / ${status.total_rows.toLocaleString()} rows`
+    if (status.status !== 'running') return `${status.status}: ${progress}`
+    const rate = status.rows_per_second ? `, ${Math.round(status.rows_per_second).toLocaleString()} rows/s` : ''
+    const eta = status.eta_seconds != null ? `, ETA ${Math.ceil(status.eta_seconds)}s` : ''
+    return `${status.status}: ${progress}${rate}${eta}`
   }
 
 
@@ -289,6 +464,25 @@ columns:
                   </pre>
                 </div>
                 
+                {/* Generation Job Progress */}
+                {job && (
+                  <div className={`sql-result ${job.status === 'failed' ? 'error' : 'success'}`}>
+                    <strong>Full data:</strong> {formatJobProgress(job)}
+                    {job.error && (
+                      <div className="error-details">
+                        <pre>{job.error}</pre>
+                      </div>
+                    )}
+                  </div>
+                )}
+
+                {/* Server-side Load Progress */}
+                {insertLoading && loadProgress && (
+                  <div className="sql-result success">
+                    <strong>Loading:</strong> {formatLoadProgress(loadProgress)}
+                  </div>
+                )}
+
                 {/* INSERT Response */}
                 {insertResponse && (
                   <div className={`sql-result ${insertResponse.success ? 'success' : 'error'}`}>
@@ -303,7 +497,7 @@ columns:
 
                                   <button
                     onClick={executeInsertSQL}
-                    disabled={insertLoading || (!generatedSQL?.insert_sql && !generatedSQL?.full_insert_sql)}
+                    disabled={insertLoading || downloadLoading || !generatedSQL?.insert_sql}
                     className="execute-btn insert-btn"
                   >
                   {insertLoading ? 'Running...' : 'Run INSERT'}
@@ -311,11 +505,20 @@ columns:
                 
                 <button
                   onClick={downloadInsertSQL}
-                  disabled={!generatedSQL?.full_insert_sql}
+                  disabled={downloadLoading || insertLoading || !generatedSQL?.success}
                   className="download-btn"
                 >
-                  Download INSERT
+                  {downloadLoading ? 'Generating...' : 'Download INSERT'}
                 </button>
+
+                {isJobActive(job) && (
+                  <button
+                    onClick={cancelJob}
+                    className="download-btn"
+                  >
+                    Cancel Generation
+                  </button>
+                )}
               </div>
 
             </div>